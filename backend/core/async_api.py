@@ -0,0 +1,87 @@
+"""
+Outils communs des vues asynchrones (ASGI) en lecture seule.
+
+Les vues async n'utilisent pas DRF (APIView est synchrone) : elles lisent
+via l'ORM async (aiterator, aget, aaggregate...) et rendent le JSON avec
+le même JSONRenderer que les vues @api_view, pour un format identique.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .pagination import KeysetPagination, apres, decoder_curseur, encoder_curseur
+
+_renderer = JSONRenderer()
+
+
+def reponse_json(data, status=200):
+    return HttpResponse(
+        _renderer.render(data), status=status, content_type='application/json'
+    )
+
+
+def non_trouve(modele):
+    """Même corps 404 que get_object_or_404 sous DRF."""
+    return reponse_json(
+        {'detail': f'No {modele._meta.object_name} matches the given query.'}, status=404
+    )
+
+
+def taille_page(request):
+    """Même règle que KeysetPagination : ?page_size=<n> plafonné, ou 'all'."""
+    valeur = request.GET.get(KeysetPagination.page_size_query_param)
+    if valeur == KeysetPagination.all_value:
+        return None
+    try:
+        taille = int(valeur)
+        if taille > 0:
+            return min(taille, KeysetPagination.max_page_size)
+    except (TypeError, ValueError):
+        pass
+    return settings.REST_FRAMEWORK['PAGE_SIZE']
+
+
+async def apaginer(request, queryset, serializer, ordering=('-id',)):
+    """
+    Équivalent async de core.pagination.paginer pour un FastListSerializer.
+
+    Pagination keyset vers l'avant sur `ordering` (qui doit se terminer par
+    une clé unique) : {next, previous, results}. ?page_size=all renvoie la
+    liste complète lue par aiterator().
+    """
+    champs = [champ.lstrip('-') for champ in ordering]
+    lignes = serializer.values(queryset).order_by(*ordering)
+    manquants = [champ for champ in champs if champ not in serializer.lookups]
+    if manquants:
+        lignes = lignes.values(*serializer.lookups, *manquants)
+
+    taille = taille_page(request)
+    if taille is None:
+        return reponse_json(serializer.serialize([ligne async for ligne in lignes.aiterator()]))
+
+    curseur = request.GET.get('cursor')
+    if curseur:
+        position = decoder_curseur(curseur)
+        if not isinstance(position, list) or len(position) != len(champs):
+            return reponse_json({'detail': 'Invalid cursor'}, status=404)
+        lignes = lignes.filter(apres(ordering, position))
+
+    page = [ligne async for ligne in lignes[:taille + 1]]
+    suivant = None
+    if len(page) > taille:
+        page = page[:taille]
+        url = request.build_absolute_uri()
+        position = [page[-1][champ] for champ in champs]
+        suivant = replace_query_param(url, 'cursor', encoder_curseur(position))
+
+    precedent = None
+    if curseur:
+        # Retour au début (la pagination async n'avance que vers l'avant)
+        precedent = remove_query_param(request.build_absolute_uri(), 'cursor')
+
+    return reponse_json({
+        'next': suivant,
+        'previous': precedent,
+        'results': serializer.serialize(page),
+    })
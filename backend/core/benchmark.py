@@ -0,0 +1,235 @@
+"""
+Banc de mesure des routes HTTP (latence, requêtes SQL, mémoire).
+
+Chaque route de location_voiture/urls.py est appelée en processus via le
+client de test Django. Les écritures sont exécutées dans une transaction
+annulée, pour que toutes les répétitions mesurent la même base.
+"""
+import logging
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reservations.models import Reservation
+from transactions.models import Transaction
+
+# (nom, méthode, chemin, corps JSON) ; les {clés} sont remplies par cibles()
+ROUTES = [
+    ('dashboard', 'get', '/', None),
+    ('dashboard-api', 'get', '/api/dashboard/', None),
+    ('admin-transactions', 'get', '/admin/transactions/transaction/', None),
+    ('voitures-liste', 'get', '/api/voitures/', None),
+    ('voitures-liste-complete', 'get', '/api/voitures/?page_size=all', None),
+    ('voitures-disponibles', 'get', '/api/voitures/disponibles/?debut={aujourdhui}&fin={semaine}', None),
+    ('voiture-detail', 'get', '/api/voitures/{voiture}/', None),
+    ('voiture-creer', 'post', '/api/voitures/', {
+        'matricule': 'BENCH 0001', 'marque': 'Toyota', 'modele': 'Yaris',
+        'prix_jour': '120.00', 'kilometrage': 1000, 'statut': 'disponible',
+    }),
+    ('voiture-modifier', 'put', '/api/voitures/{voiture}/', {
+        'matricule': '{matricule}', 'marque': 'Toyota', 'modele': 'Yaris',
+        'prix_jour': '125.00', 'kilometrage': 2000, 'statut': 'disponible',
+    }),
+    ('voiture-supprimer', 'delete', '/api/voitures/{voiture}/', None),
+    ('reservations-liste', 'get', '/api/reservations/', None),
+    ('reservations-liste-complete', 'get', '/api/reservations/?page_size=all', None),
+    ('reservation-detail', 'get', '/api/reservations/{reservation}/', None),
+    ('reservation-creer', 'post', '/api/reservations/', {
+        'voiture_id': '{voiture}', 'nom_client': 'Client Bench', 'telephone': '22000000',
+        'date_debut': '{libre_debut}', 'date_fin': '{libre_fin}',
+    }),
+    ('reservation-modifier', 'put', '/api/reservations/{reservation}/', {
+        'voiture_id': '{voiture}', 'nom_client': 'Client Bench', 'telephone': '22000000',
+        'date_debut': '{libre_debut}', 'date_fin': '{libre_fin}',
+    }),
+    ('reservation-supprimer', 'delete', '/api/reservations/{reservation}/', None),
+    ('transactions-liste', 'get', '/api/transactions/', None),
+    ('transactions-recherche', 'get', '/api/transactions/?search=Revenue', None),
+    ('transaction-detail', 'get', '/api/transactions/{transaction}/', None),
+    ('transaction-creer', 'post', '/api/transactions/', {
+        'type': 'DEPENSE', 'categorie': 'CARBURANT', 'montant': '75.00',
+        'voiture': '{voiture}', 'description': 'Bench',
+    }),
+    ('transaction-modifier', 'patch', '/api/transactions/{transaction}/', {'montant': '80.00'}),
+    ('transaction-supprimer', 'delete', '/api/transactions/{transaction}/', None),
+    ('transactions-summary', 'get', '/api/transactions/summary/', None),
+    ('transactions-monthly-stats', 'get', '/api/transactions/monthly-stats/', None),
+    ('transactions-by-voiture', 'get', '/api/transactions/by-voiture/{voiture}/', None),
+    ('transactions-export', 'get', '/api/transactions/export/?format=ndjson', None),
+]
+
+ECRITURES = {'post', 'put', 'patch', 'delete'}
+
+
+class _Annuler(Exception):
+    pass
+
+
+def cibles():
+    """
+    Identifiants réels utilisés pour remplir les chemins de ROUTES.
+
+    Les écritures visent ces lignes existantes (la voiture et la dernière
+    réservation, la dernière transaction) : annulées à chaque appel, elles
+    retrouvent la même base. Les réservations écrites tombent dans une
+    fenêtre libre pour toutes les voitures, après la dernière fin connue.
+    """
+    reservation = Reservation.objects.select_related('voiture').order_by('-id').first()
+    transaction_ = Transaction.objects.order_by('-id').first()
+    aujourdhui = timezone.localdate()
+    derniere_fin = Reservation.objects.aggregate(fin=Max('date_fin'))['fin']
+    libre = max(derniere_fin or timezone.now(), timezone.now()) + timedelta(days=1)
+    return {
+        'voiture': reservation.voiture_id if reservation else 0,
+        'matricule': reservation.voiture.matricule if reservation else '',
+        'reservation': reservation.pk if reservation else 0,
+        'transaction': transaction_.pk if transaction_ else 0,
+        'aujourdhui': aujourdhui.isoformat(),
+        'semaine': (aujourdhui + timedelta(days=7)).isoformat(),
+        'libre_debut': libre.isoformat(),
+        'libre_fin': (libre + timedelta(days=3)).isoformat(),
+    }
+
+
+def _remplir(valeur, valeurs):
+    if isinstance(valeur, dict):
+        return {cle: _remplir(v, valeurs) for cle, v in valeur.items()}
+    return valeur.format(**valeurs) if isinstance(valeur, str) else valeur
+
+
+def _appeler(client, methode, chemin, corps):
+    """Exécute une requête complète (y compris un contenu en streaming)."""
+    envoyer = getattr(client, methode)
+    if corps is None:
+        reponse = envoyer(chemin)
+    else:
+        reponse = envoyer(chemin, corps, content_type='application/json')
+    if reponse.streaming:
+        for _ in reponse.streaming_content:
+            pass
+    return reponse
+
+
+def _executer(client, methode, chemin, corps):
+    if methode not in ECRITURES:
+        return _appeler(client, methode, chemin, corps)
+    reponse = None
+    try:
+        with transaction.atomic():
+            reponse = _appeler(client, methode, chemin, corps)
+            raise _Annuler
+    except _Annuler:
+        pass
+    return reponse
+
+
+def _percentile(valeurs, p):
+    valeurs = sorted(valeurs)
+    rang = (len(valeurs) - 1) * p
+    bas = int(rang)
+    haut = min(bas + 1, len(valeurs) - 1)
+    return valeurs[bas] + (valeurs[haut] - valeurs[bas]) * (rang - bas)
+
+
+def mesurer_route(client, methode, chemin, corps=None, repetitions=20):
+    """
+    Mesure une route : p50/p95 (ms), nombre de requêtes SQL et pic mémoire
+    Python (Ko, tracemalloc, sur un appel séparé pour ne pas fausser les
+    temps). Les caches sont vidés avant la série : le premier appel est
+    froid, les suivants reflètent le comportement en régime établi.
+    """
+    for cache in caches.all():
+        cache.clear()
+
+    with CaptureQueriesContext(connection) as requetes:
+        reponse = _executer(client, methode, chemin, corps)
+    nb_requetes = len(requetes)
+
+    durees = []
+    for _ in range(repetitions):
+        depart = time.perf_counter()
+        _executer(client, methode, chemin, corps)
+        durees.append((time.perf_counter() - depart) * 1000)
+
+    tracemalloc.start()
+    try:
+        _executer(client, methode, chemin, corps)
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'statut': reponse.status_code,
+        'p50_ms': round(statistics.median(durees), 3),
+        'p95_ms': round(_percentile(durees, 0.95), 3),
+        'requetes': nb_requetes,
+        'memoire_ko': round(pic / 1024, 1),
+    }
+
+
+def mesurer_routes(client, repetitions=20, routes=ROUTES):
+    """Mesure toutes les routes sur la base courante : {nom: mesures}."""
+    valeurs = cibles()
+    # Les 4xx/5xx sont relevés dans 'statut' : inutile de les journaliser à chaque appel
+    journal = logging.getLogger('django.request')
+    niveau = journal.level
+    journal.setLevel(logging.CRITICAL)
+    try:
+        return {
+            nom: mesurer_route(
+                client, methode, _remplir(chemin, valeurs), _remplir(corps, valeurs), repetitions
+            )
+            for nom, methode, chemin, corps in routes
+        }
+    finally:
+        journal.setLevel(niveau)
+
+
+def comparer(reference, actuel, tolerance=0.30, tolerance_memoire=0.30,
+             tolerance_requetes=0, plancher_ms=2.0):
+    """
+    Compare deux jeux de résultats {taille: {route: mesures}}.
+
+    Régression si, pour une même taille et une même route :
+    - le p95 dépasse la référence de plus de `tolerance` (et d'au moins
+      `plancher_ms`, pour ignorer le bruit sur les routes très rapides) ;
+    - le nombre de requêtes SQL augmente de plus de `tolerance_requetes` ;
+    - le pic mémoire dépasse la référence de plus de `tolerance_memoire` ;
+    - une route qui répondait en 2xx/3xx ne le fait plus.
+
+    Renvoie la liste des régressions (messages), vide si tout va bien.
+    """
+    regressions = []
+    for taille, routes in actuel.items():
+        for nom, mesure in routes.items():
+            base = reference.get(taille, {}).get(nom)
+            if base is None:
+                continue
+            prefixe = f'[{taille}] {nom}'
+
+            if base['statut'] < 400 <= mesure['statut']:
+                regressions.append(f"{prefixe}: statut {base['statut']} -> {mesure['statut']}")
+
+            limite = max(base['p95_ms'] * (1 + tolerance), base['p95_ms'] + plancher_ms)
+            if mesure['p95_ms'] > limite:
+                regressions.append(
+                    f"{prefixe}: p95 {base['p95_ms']:.1f} -> {mesure['p95_ms']:.1f} ms"
+                )
+
+            if mesure['requetes'] > base['requetes'] + tolerance_requetes:
+                regressions.append(
+                    f"{prefixe}: requêtes {base['requetes']} -> {mesure['requetes']}"
+                )
+
+            if mesure['memoire_ko'] > base['memoire_ko'] * (1 + tolerance_memoire):
+                regressions.append(
+                    f"{prefixe}: mémoire {base['memoire_ko']:.0f} -> {mesure['memoire_ko']:.0f} Ko"
+                )
+    return regressions
@@ -0,0 +1,43 @@
+"""
+Reprise des écritures en conflit de verrou SQLite.
+
+« database is locked » (SQLITE_BUSY, verrou d'écriture tenu par une autre
+connexion) ou « database table is locked » (cache partagé) : la
+transaction entière est rejouée après une attente aléatoire croissante.
+"""
+import random
+import time
+from functools import wraps
+
+from django.db import OperationalError, connection, transaction
+
+TENTATIVES = 8
+ATTENTE_INITIALE = 0.005  # secondes
+
+
+def est_verrouillee(erreur):
+    return 'locked' in str(erreur)
+
+
+def reessayer_si_verrouillee(fonction):
+    """
+    Exécute `fonction` dans sa propre transaction, rejouée en cas de
+    verrou. Dans une transaction déjà ouverte, elle s'exécute dans un
+    point de sauvegarde (annulé si elle échoue) sans reprise : seule la
+    transaction la plus externe peut être rejouée.
+    """
+    @wraps(fonction)
+    def enveloppe(*args, **kwargs):
+        if connection.in_atomic_block:
+            with transaction.atomic():
+                return fonction(*args, **kwargs)
+
+        for tentative in range(1, TENTATIVES + 1):
+            try:
+                with transaction.atomic():
+                    return fonction(*args, **kwargs)
+            except OperationalError as erreur:
+                if not est_verrouillee(erreur) or tentative == TENTATIVES:
+                    raise
+            time.sleep(random.uniform(0, ATTENTE_INITIALE * 2 ** tentative))
+    return enveloppe
@@ -0,0 +1,102 @@
+"""
+Indicateurs du tableau de bord (vue HTML et api/dashboard/).
+
+Trois requêtes d'agrégats conditionnels :
+- flotte et réservations : voitures jointes à leurs réservations, statut
+  effectif compté comme VoitureQuerySet.avec_statut_effectif ;
+- réservations archivées (ReservationHistorique) : ajoutées aux totaux,
+  le nettoyage ne doit pas faire baisser les compteurs ;
+- finances : DailyFinancialRollup, comme /api/transactions/summary/.
+
+Le résultat est gardé en cache sous une clé qui contient les versions des
+tables Voiture/Reservation (core/versions.py) et la génération du cache
+analytique des transactions : toute écriture rend l'ancienne entrée
+inaccessible. La durée courte (DUREE) borne ce qui change sans écriture
+(réservations qui arrivent à échéance, nouveau mois).
+"""
+from django.core.cache import caches
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from reservations.models import Reservation, ReservationHistorique
+from transactions import cache as analytics_cache
+from transactions.models import DailyFinancialRollup
+from transactions.queries import TOTALS, format_totals
+from voitures.models import Voiture
+from .versions import versions
+
+CACHE_ALIAS = 'analytics'
+PREFIXE_CLE = 'core:dashboard'
+DUREE = 60
+NB_DERNIERES = 5
+
+
+def cle():
+    """Clé de cache courante (une requête sur TableVersion)."""
+    etat, _ = versions(Voiture, Reservation)
+    tables = ':'.join(str(version) for _, (version, _) in sorted(etat.items()))
+    return f'{PREFIXE_CLE}:{analytics_cache.current_generation()}:{tables}'
+
+
+def donnees():
+    """Indicateurs du tableau de bord, depuis le cache si aucune écriture depuis."""
+    cache = caches[CACHE_ALIAS]
+    cle_courante = cle()
+    resultat = cache.get(cle_courante)
+    if resultat is None:
+        resultat = calculer()
+        cache.set(cle_courante, resultat, timeout=DUREE)
+    return resultat
+
+
+def calculer(maintenant=None):
+    maintenant = maintenant or timezone.now()
+    debut_mois = timezone.localtime(maintenant).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    en_cours = Q(reservations__date_fin__gt=maintenant) & ~Q(statut='maintenance')
+
+    flotte = Voiture.objects.aggregate(
+        total_voitures=Count('id', distinct=True),
+        voitures_louees=Count('id', distinct=True, filter=en_cours),
+        voitures_maintenance=Count('id', distinct=True, filter=Q(statut='maintenance')),
+        reservations_total=Count('reservations'),
+        reservations_mois=Count('reservations', filter=Q(reservations__date_debut__gte=debut_mois)),
+        reservations_en_cours=Count('reservations', filter=Q(
+            reservations__date_debut__lte=maintenant,
+            reservations__date_fin__gt=maintenant,
+        )),
+    )
+    # Une réservation archivée est terminée : jamais en cours
+    archivees = ReservationHistorique.objects.aggregate(
+        total=Count('id'),
+        mois=Count('id', filter=Q(date_debut__gte=debut_mois)),
+    )
+    flotte['reservations_total'] += archivees['total']
+    flotte['reservations_mois'] += archivees['mois']
+    flotte['voitures_disponibles'] = (
+        flotte['total_voitures'] - flotte['voitures_louees'] - flotte['voitures_maintenance']
+    )
+
+    finances = format_totals(DailyFinancialRollup.objects.aggregate(**TOTALS))
+
+    dernieres = Reservation.objects.select_related('voiture').order_by('-id')[:NB_DERNIERES]
+    return {
+        'revenus': finances['total_revenu'],
+        'depenses': finances['total_depense'],
+        'profit': finances['profit'],
+        'nb_transactions': finances['transaction_count'],
+        **flotte,
+        'dernieres_reservations': [
+            {
+                'id': reservation.id,
+                'nom_client': reservation.nom_client,
+                'voiture': str(reservation.voiture),
+                'date_debut': reservation.date_debut.isoformat(),
+                'date_fin': reservation.date_fin.isoformat(),
+                'prix_total': float(reservation.prix_total) if reservation.prix_total is not None else None,
+            }
+            for reservation in dernieres
+        ],
+        'devise': 'MRU',
+    }
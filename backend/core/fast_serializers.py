@@ -0,0 +1,74 @@
+from django.utils.functional import cached_property
+from rest_framework.relations import RelatedField
+
+
+class FastListSerializer:
+    """
+    Sérialisation en lecture seule de listes à partir de QuerySet.values().
+
+    Produit les mêmes clés, dans le même ordre et avec les mêmes
+    représentations que `serializer_class` (JSON identique à l'octet près),
+    sans instancier de modèles ni d'état de serializer par objet.
+
+    Les champs qui ne sont pas de simples colonnes sont déclarés dans
+    `custom`, ce qui fixe les jointures une fois pour toutes :
+        nom -> FastListSerializer(..., prefix='relation__')  (imbriqué)
+        nom -> (lookups values(), fonction(row) -> valeur)   (calculé)
+    """
+
+    def __init__(self, serializer_class, custom=None, prefix=''):
+        self.serializer_class = serializer_class
+        self.custom = custom or {}
+        self.prefix = prefix
+
+    @cached_property
+    def _plan(self):
+        """(lookups, [(clé, lecteur)]) calculés une seule fois."""
+        lookups = []
+        entries = []
+
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+
+            if name in self.custom:
+                spec = self.custom[name]
+                if isinstance(spec, FastListSerializer):
+                    field_lookups, read = spec.lookups, spec.to_representation
+                else:
+                    field_lookups, read = spec
+                lookups.extend(field_lookups)
+                entries.append((name, read))
+                continue
+
+            lookup = self.prefix + field.source
+            lookups.append(lookup)
+            # values() renvoie déjà la clé primaire des relations
+            convert = None if isinstance(field, RelatedField) else field.to_representation
+            entries.append((name, self._column(lookup, convert)))
+
+        return lookups, entries
+
+    @staticmethod
+    def _column(lookup, convert):
+        if convert is None:
+            return lambda row: row[lookup]
+
+        def read(row):
+            value = row[lookup]
+            return None if value is None else convert(value)
+        return read
+
+    @property
+    def lookups(self):
+        return self._plan[0]
+
+    def values(self, queryset):
+        return queryset.values(*self.lookups)
+
+    def to_representation(self, row):
+        return {name: read(row) for name, read in self._plan[1]}
+
+    def serialize(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
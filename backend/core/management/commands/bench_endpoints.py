@@ -0,0 +1,117 @@
+import json
+import platform
+import sqlite3
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmark import comparer, mesurer_routes
+
+BASELINE_DEFAUT = Path(settings.BASE_DIR) / 'bench_baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure toutes les routes (p50/p95, requêtes SQL, pic mémoire) sur des "
+        "bases de test générées par seed_fleet, de tailles croissantes, et "
+        "compare au fichier de référence JSON (code de sortie non nul en cas "
+        "de régression)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tailles', default='1000,10000,50000',
+                            help="Nombres de réservations générées, séparés par des virgules.")
+        parser.add_argument('--repetitions', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--baseline', default=str(BASELINE_DEFAUT))
+        parser.add_argument('--ecrire', action='store_true',
+                            help="Enregistre les mesures comme nouvelle référence.")
+        parser.add_argument('--tolerance', type=float, default=0.30,
+                            help="Hausse relative admise du p95 (0.30 = +30 %%).")
+        parser.add_argument('--tolerance-memoire', type=float, default=0.30)
+        parser.add_argument('--tolerance-requetes', type=int, default=0)
+        parser.add_argument('--plancher-ms', type=float, default=2.0,
+                            help="Hausse absolue du p95 ignorée (bruit).")
+
+    def handle(self, *args, **options):
+        tailles = [int(t) for t in options['tailles'].split(',') if t.strip()]
+        resultats = self._mesurer(tailles, options['repetitions'], options['seed'])
+        self._afficher(resultats)
+
+        chemin = Path(options['baseline'])
+        if options['ecrire']:
+            chemin.write_text(json.dumps({
+                'environnement': {
+                    'python': platform.python_version(),
+                    'sqlite': sqlite3.sqlite_version,
+                    'repetitions': options['repetitions'],
+                },
+                'resultats': resultats,
+            }, indent=2, ensure_ascii=False) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Référence écrite dans {chemin}"))
+            return
+
+        if not chemin.exists():
+            self.stdout.write(self.style.WARNING(
+                f"Pas de référence ({chemin}) : relancer avec --ecrire pour la créer."
+            ))
+            return
+
+        reference = json.loads(chemin.read_text())['resultats']
+        regressions = comparer(
+            reference, resultats,
+            tolerance=options['tolerance'],
+            tolerance_memoire=options['tolerance_memoire'],
+            tolerance_requetes=options['tolerance_requetes'],
+            plancher_ms=options['plancher_ms'],
+        )
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f"{len(regressions)} régression(s) par rapport à {chemin}")
+        self.stdout.write(self.style.SUCCESS("Aucune régression."))
+
+    def _mesurer(self, tailles, repetitions, seed):
+        """Crée une base de test jetable, la remplit à chaque taille et mesure."""
+        setup_test_environment()
+        ancien_nom = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            admin = get_user_model().objects.create_superuser('bench', 'bench@example.com', 'bench')
+            client = Client(raise_request_exception=False)
+            client.force_login(admin)
+
+            resultats = {}
+            for taille in tailles:
+                self.stdout.write(f"Génération : {taille} réservations...")
+                call_command(
+                    'seed_fleet',
+                    voitures=max(10, taille // 50),
+                    reservations=taille,
+                    transactions=2 * taille,
+                    seed=seed,
+                    vider=True,
+                    stdout=self.stdout,
+                )
+                resultats[str(taille)] = mesurer_routes(client, repetitions)
+            return resultats
+        finally:
+            connection.creation.destroy_test_db(ancien_nom, verbosity=0)
+            teardown_test_environment()
+
+    def _afficher(self, resultats):
+        for taille, routes in resultats.items():
+            self.stdout.write(f"\n{taille} réservations")
+            self.stdout.write(
+                f"  {'route':<30}{'statut':>7}{'p50 ms':>10}{'p95 ms':>10}{'SQL':>6}{'Ko':>10}"
+            )
+            for nom, m in routes.items():
+                self.stdout.write(
+                    f"  {nom:<30}{m['statut']:>7}{m['p50_ms']:>10.2f}{m['p95_ms']:>10.2f}"
+                    f"{m['requetes']:>6}{m['memoire_ko']:>10.0f}"
+                )
@@ -0,0 +1,114 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from reservations.models import Reservation
+from reservations.serializers import ReservationSerializer, reservation_list_serializer
+from transactions.models import Transaction
+from transactions.serializers import TransactionSerializer, transaction_list_serializer
+from voitures.models import Voiture
+from voitures.serializers import VoitureSerializer, voiture_list_serializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare la sérialisation des listes (ModelSerializer vs lecture "
+        "values()) sur N lignes créées puis annulées."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lignes', type=int, default=10000)
+        parser.add_argument('--repetitions', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._creer_donnees(options['lignes'])
+                self._comparer(options['repetitions'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _creer_donnees(self, n):
+        debut = timezone.now() - timedelta(days=3 * n)
+        voitures = Voiture.objects.bulk_create([
+            Voiture(
+                matricule=f'BENCH{i:07d}', marque='Bench', modele='Serializer',
+                prix_jour=Decimal('100.00'), kilometrage=i
+            )
+            for i in range(n)
+        ], batch_size=1000)
+        reservations = Reservation.objects.bulk_create([
+            Reservation(
+                voiture=voiture, nom_client=f'Client {i}', telephone='0600000000',
+                date_debut=debut + timedelta(days=3 * i),
+                date_fin=debut + timedelta(days=3 * i + 2),
+                prix_total=Decimal('300.00'),
+            )
+            for i, voiture in enumerate(voitures)
+        ], batch_size=1000)
+        Transaction.objects.bulk_create([
+            Transaction(
+                type='REVENU', montant=Decimal('300.00'),
+                reservation=reservation, voiture=reservation.voiture,
+                description=f'Revenue {i}',
+            )
+            for i, reservation in enumerate(reservations)
+        ], batch_size=1000)
+
+    def _mesurer(self, fonction, repetitions):
+        meilleur = None
+        for _ in range(repetitions):
+            depart = time.perf_counter()
+            contenu = fonction()
+            duree = time.perf_counter() - depart
+            meilleur = duree if meilleur is None else min(meilleur, duree)
+        return meilleur, contenu
+
+    def _comparer(self, repetitions):
+        cas = [
+            (
+                'voitures',
+                Voiture.objects.avec_statut_effectif().order_by('id'),
+                VoitureSerializer,
+                voiture_list_serializer,
+            ),
+            (
+                'reservations',
+                Reservation.objects.order_by('-id'),
+                ReservationSerializer,
+                reservation_list_serializer,
+            ),
+            (
+                'transactions',
+                Transaction.objects.select_related(
+                    'reservation__voiture', 'voiture'
+                ).order_by('-date', '-id'),
+                TransactionSerializer,
+                transaction_list_serializer,
+            ),
+        ]
+        renderer = JSONRenderer()
+
+        for nom, queryset, serializer_class, rapide in cas:
+            lent, attendu = self._mesurer(
+                lambda: renderer.render(serializer_class(queryset.all(), many=True).data),
+                repetitions,
+            )
+            vite, obtenu = self._mesurer(
+                lambda: renderer.render(rapide.serialize(rapide.values(queryset.all()))),
+                repetitions,
+            )
+            self.stdout.write(
+                f"{nom:<13} ModelSerializer {lent:7.3f}s   values() {vite:7.3f}s   "
+                f"x{lent / vite:4.1f}   JSON identique: {attendu == obtenu}"
+            )
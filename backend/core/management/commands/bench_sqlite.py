@@ -0,0 +1,170 @@
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+
+from location_voiture.base_sqlite import profil_developpement, profil_production
+from reservations.models import Reservation
+from transactions.models import Transaction
+from voitures.models import Voiture
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare les profils SQLite développement / production sous charge : "
+        "N lecteurs (listes voitures et réservations) pendant qu'un ou "
+        "plusieurs écrivains enregistrent des transactions, sur une copie de "
+        "la base. Affiche lectures/s, écritures/s et erreurs « database is locked »."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=None,
+                            help="Base à copier (défaut : DATABASES['default']). "
+                                 "La remplir d'abord avec seed_fleet.")
+        parser.add_argument('--lecteurs', type=int, default=8)
+        parser.add_argument('--ecrivains', type=int, default=2)
+        parser.add_argument('--duree', type=float, default=5.0, help="Secondes par profil.")
+
+    def handle(self, *args, **options):
+        source = Path(options['source'] or settings.DATABASES['default']['NAME'])
+        if not source.exists():
+            raise CommandError(f"Base introuvable : {source}")
+
+        dossier = Path(tempfile.mkdtemp(prefix='bench_sqlite_'))
+        try:
+            resultats = {}
+            for profil in ('dev', 'production'):
+                copie = dossier / f'{profil}.sqlite3'
+                self._copier(source, copie)
+                resultats[profil] = self._mesurer(
+                    profil, copie, options['lecteurs'], options['ecrivains'], options['duree']
+                )
+        finally:
+            shutil.rmtree(dossier, ignore_errors=True)
+
+        self.stdout.write(
+            f"{'profil':<12}{'lectures/s':>12}{'p95 lecture ms':>16}"
+            f"{'écritures/s':>13}{'verrouillée':>13}"
+        )
+        for profil, r in resultats.items():
+            self.stdout.write(
+                f"{profil:<12}{r['lectures_s']:>12.1f}{r['p95_ms']:>16.1f}"
+                f"{r['ecritures_s']:>13.1f}{r['erreurs']:>13}"
+            )
+        dev, prod = resultats['dev'], resultats['production']
+        if dev['lectures_s']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Lectures pendant les écritures : x{prod['lectures_s'] / dev['lectures_s']:.1f}"
+            ))
+
+    def _copier(self, source, destination):
+        """Copie cohérente (API backup), en mode journal par défaut."""
+        origine = sqlite3.connect(source)
+        cible = sqlite3.connect(destination)
+        try:
+            origine.backup(cible)
+            cible.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            origine.close()
+            cible.close()
+
+    def _alias(self, profil, copie):
+        """Déclare les alias du profil ; renvoie (alias écriture, alias lecture)."""
+        if profil == 'production':
+            bases = profil_production(copie)
+        else:
+            bases = profil_developpement(copie)
+
+        alias = {}
+        for role, config in bases.items():
+            nom = f'bench_{profil}_{role}'
+            connections.settings[nom] = {**connections.settings['default'], **config}
+            alias[role] = nom
+        return alias['default'], alias.get('replica', alias['default'])
+
+    def _mesurer(self, profil, copie, nb_lecteurs, nb_ecrivains, duree):
+        ecriture, lecture = self._alias(profil, copie)
+        voiture_ids = list(Voiture.objects.using(ecriture).values_list('pk', flat=True))
+        if not voiture_ids:
+            raise CommandError("La base copiée ne contient aucune voiture (lancer seed_fleet).")
+
+        arret = threading.Event()
+        verrou = threading.Lock()
+        stats = {'lectures': 0, 'ecritures': 0, 'erreurs': 0, 'durees': []}
+
+        def compter(cle, valeur=1):
+            with verrou:
+                stats[cle] += valeur
+
+        def lecteur():
+            durees = []
+            try:
+                while not arret.is_set():
+                    depart = time.perf_counter()
+                    try:
+                        list(Voiture.objects.using(lecture).avec_statut_effectif()
+                             .order_by('id').values()[:50])
+                        list(Reservation.objects.using(lecture)
+                             .select_related('voiture').order_by('-id').values()[:50])
+                    except OperationalError:
+                        compter('erreurs')
+                        continue
+                    durees.append((time.perf_counter() - depart) * 1000)
+                    compter('lectures')
+            finally:
+                with verrou:
+                    stats['durees'].extend(durees)
+                connections.close_all()
+
+        def ecrivain():
+            rng = random.Random()
+            try:
+                while not arret.is_set():
+                    voiture_id = rng.choice(voiture_ids)
+                    try:
+                        with transaction.atomic(using=ecriture):
+                            Voiture.objects.using(ecriture).filter(pk=voiture_id).update(
+                                kilometrage=F('kilometrage') + 1
+                            )
+                            # bulk_create : pas de signaux (qui écriraient sur 'default')
+                            Transaction.objects.using(ecriture).bulk_create([Transaction(
+                                type='DEPENSE', categorie='CARBURANT',
+                                montant=Decimal('50.00'), voiture_id=voiture_id,
+                                description='bench_sqlite',
+                            )])
+                    except OperationalError:
+                        compter('erreurs')
+                        continue
+                    compter('ecritures')
+            finally:
+                connections.close_all()
+
+        fils = [threading.Thread(target=lecteur) for _ in range(nb_lecteurs)]
+        fils += [threading.Thread(target=ecrivain) for _ in range(nb_ecrivains)]
+        for f in fils:
+            f.start()
+        time.sleep(duree)
+        arret.set()
+        for f in fils:
+            f.join()
+
+        for nom in {ecriture, lecture}:
+            connections[nom].close()
+            del connections.settings[nom]
+
+        durees = sorted(stats['durees']) or [0]
+        return {
+            'lectures_s': stats['lectures'] / duree,
+            'ecritures_s': stats['ecritures'] / duree,
+            'erreurs': stats['erreurs'],
+            'p95_ms': durees[int(0.95 * (len(durees) - 1))],
+        }
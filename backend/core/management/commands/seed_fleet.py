@@ -0,0 +1,268 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.versions import incrementer
+from reservations.models import (
+    EvenementReservation, Reservation, ReservationHistorique, calculer_prix_total,
+)
+from transactions import rollups
+from transactions.models import (
+    ClosedPeriod, DailyFinancialRollup, Transaction, TransactionArchive,
+)
+from transactions.search import FTS_TABLE, is_available
+from voitures import utilisation
+from voitures.models import Voiture
+
+CATALOGUE = [
+    # (marque, modele, prix_jour)
+    ('Toyota', 'Corolla', 150), ('Toyota', 'Hilux', 260), ('Toyota', 'Land Cruiser', 450),
+    ('Hyundai', 'Accent', 110), ('Hyundai', 'Tucson', 220), ('Kia', 'Picanto', 90),
+    ('Kia', 'Sportage', 210), ('Renault', 'Clio', 100), ('Dacia', 'Logan', 85),
+    ('Dacia', 'Duster', 140), ('Peugeot', '208', 115), ('Peugeot', '3008', 230),
+    ('Nissan', 'Patrol', 420), ('Mercedes', 'Classe C', 380), ('Suzuki', 'Swift', 95),
+]
+
+PRENOMS = ['Mohamed', 'Ahmed', 'Fatimetou', 'Mariem', 'Sidi', 'Aicha', 'Cheikh',
+           'Khadijetou', 'Moussa', 'Aminata', 'Oumar', 'Zeinabou', 'Ali', 'Salma']
+NOMS = ['Ould Ahmed', 'Mint Mohamed', 'Diallo', 'Ba', 'Sy', 'Ould Sidi',
+        'Mint Cheikh', 'Kane', 'Sow', 'Ould Brahim', 'Camara', 'Fall']
+
+# Catégorie de dépense -> (poids, montant min, montant max)
+DEPENSES = {
+    'CARBURANT': (45, 20, 250),
+    'ENTRETIEN': (25, 80, 900),
+    'REPARATION': (15, 150, 6000),
+    'ASSURANCE': (10, 1500, 12000),
+    'AUTRE': (5, 10, 500),
+}
+
+# Jours générés après maintenant : quelques réservations à venir
+A_VENIR = 30
+
+
+def dater(modele, objets, dates, champs):
+    """
+    Écrit les dates historiques après un bulk_create (auto_now_add y a mis
+    l'heure courante) : `dates[i]` va dans chaque champ de `objets[i]`.
+    Un UPDATE préparé, exécuté par executemany : pas d'expression par ligne.
+    """
+    nom = connection.ops.quote_name
+    colonnes = ', '.join(f'{nom(modele._meta.get_field(champ).column)} = %s' for champ in champs)
+    sql = (
+        f'UPDATE {nom(modele._meta.db_table)} SET {colonnes} '
+        f'WHERE {nom(modele._meta.pk.column)} = %s'
+    )
+    adapter = connection.ops.adapt_datetimefield_value
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            [adapter(date)] * len(champs) + [objet.pk] for objet, date in zip(objets, dates)
+        ])
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère une flotte synthétique à l'échelle de la production : voitures, "
+        "historiques de réservations sans chevauchement, revenus associés et "
+        "dépenses pondérées par catégorie (bulk_create, sans Reservation.clean() "
+        "ni signaux)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voitures', type=int, default=200)
+        parser.add_argument('--reservations', type=int, default=10000,
+                            help="Nombre total de réservations (un revenu par réservation).")
+        parser.add_argument('--transactions', type=int, default=20000,
+                            help="Nombre de dépenses générées en plus des revenus.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--jours', type=int, default=730,
+                            help="Profondeur de l'historique en jours.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--vider', action='store_true',
+                            help="Supprime voitures, réservations et transactions (archives comprises) "
+                                 "avant la génération.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.maintenant = timezone.now().replace(minute=0, second=0, microsecond=0)
+        self.origine = self.maintenant - timedelta(days=options['jours'])
+        depart = time.perf_counter()
+
+        # Voitures tirées avant tout effacement : une demande impossible ne
+        # touche pas à la base
+        voitures = self._voitures(options['voitures'], options['seed'])
+        self._verifier_capacite(voitures, options['reservations'], options['jours'])
+
+        if options['vider']:
+            self._vider()
+
+        with transaction.atomic():
+            voitures = Voiture.objects.bulk_create(voitures, batch_size=self.batch_size)
+        nb_reservations = self._creer_reservations(
+            voitures, options['reservations'], options['jours']
+        )
+        nb_depenses = self._creer_depenses(voitures, options['transactions'], options['jours'])
+
+        # bulk_create contourne les signaux : reconstruire les agrégats,
+        # invalider les ETag des listes et le cache d'utilisation
+        rollups.rebuild()
+        incrementer(Voiture, Reservation)
+        utilisation.invalider_flotte()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(voitures)} voitures, {nb_reservations} réservations, "
+            f"{nb_reservations} revenus, {nb_depenses} dépenses "
+            f"en {time.perf_counter() - depart:.1f}s"
+        ))
+
+    def _vider(self):
+        # DELETE direct : ni signaux ni lignes chargées (les triggers FTS suivent).
+        # Archives, mois clos et boîte d'envoi partent aussi : ils pointent
+        # vers les voitures supprimées ou fixeraient une date de coupure périmée.
+        modeles = (
+            DailyFinancialRollup, Transaction, TransactionArchive, ClosedPeriod,
+            EvenementReservation, Reservation, ReservationHistorique, Voiture,
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            for modele in modeles:
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(modele._meta.db_table)}')
+            # Entrées des transactions archivées, posées hors trigger par archive.py
+            if is_available(connection.alias):
+                cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def _voitures(self, n, seed):
+        voitures = []
+        for i in range(n):
+            marque, modele, prix = self.rng.choice(CATALOGUE)
+            maintenance = self.rng.random() < 0.05
+            voitures.append(Voiture(
+                matricule=f'{seed:03d}{i:06d} NKC',
+                marque=marque,
+                modele=modele,
+                prix_jour=None if maintenance else Decimal(prix),
+                kilometrage=self.rng.randint(5_000, 250_000),
+                statut='maintenance' if maintenance else 'disponible',
+            ))
+        return voitures
+
+    @staticmethod
+    def _capacite(jours):
+        """Réservations au plus par voiture : débuts espacés de deux jours."""
+        return (jours + A_VENIR) // 2
+
+    def _verifier_capacite(self, voitures, total, jours):
+        louables = sum(1 for v in voitures if v.statut != 'maintenance')
+        capacite = louables * self._capacite(jours)
+        if total > capacite:
+            raise CommandError(
+                f"{total} réservations ne tiennent pas sans chevauchement : "
+                f"{louables} voitures louables × {self._capacite(jours)} sur "
+                f"{jours + A_VENIR} jours, soit {capacite} au plus. "
+                f"Augmenter --voitures ou --jours."
+            )
+
+    def _intervalles(self, nb, jours):
+        """nb intervalles [debut, fin] disjoints (en jours) dans l'horizon."""
+        horizon = jours + A_VENIR
+        # Débuts espacés d'au moins deux jours : la fin tombe toujours un jour
+        # avant le début suivant, quelles que soient les heures tirées.
+        debuts = [j + i for i, j in enumerate(sorted(self.rng.sample(range(horizon - nb), nb)))]
+        for debut, suivant in zip(debuts, debuts[1:] + [horizon + 1]):
+            # fin strictement avant le début suivant (même règle que clean())
+            duree = self.rng.randint(1, max(1, min(10, suivant - debut - 1)))
+            yield debut, debut + duree
+
+    def _creer_reservations(self, voitures, total, jours):
+        louables = [v for v in voitures if v.statut != 'maintenance']
+        if not louables or not total:
+            return 0
+
+        # Répartition des réservations par voiture
+        parts = [total // len(louables)] * len(louables)
+        for i in self.rng.sample(range(len(louables)), total % len(louables)):
+            parts[i] += 1
+
+        nb = 0
+        louees = []
+        lot = []
+        for voiture, part in zip(louables, parts):
+            for debut_jour, fin_jour in self._intervalles(part, jours):
+                debut = self.origine + timedelta(days=debut_jour, hours=self.rng.randint(8, 12))
+                fin = self.origine + timedelta(days=fin_jour, hours=self.rng.randint(8, 18))
+                # Même calcul que Reservation.save()
+                prix_total = calculer_prix_total(debut, fin, voiture.prix_jour)
+                lot.append(Reservation(
+                    voiture=voiture,
+                    nni=f'{self.rng.randint(0, 10**10 - 1):010d}',
+                    nom_client=f'{self.rng.choice(PRENOMS)} {self.rng.choice(NOMS)}',
+                    telephone=f'{self.rng.choice("234")}{self.rng.randint(0, 10**7 - 1):07d}',
+                    date_debut=debut,
+                    date_fin=fin,
+                    prix_total=prix_total,
+                    # Réservation à venir : créée au plus tard maintenant,
+                    # son revenu (daté de created_at) aussi
+                    created_at=min(debut - timedelta(days=self.rng.randint(0, 7)), self.maintenant),
+                ))
+                if fin > self.maintenant:
+                    louees.append(voiture.pk)
+            if len(lot) >= self.batch_size:
+                nb += self._enregistrer_reservations(lot)
+                lot = []
+        nb += self._enregistrer_reservations(lot)
+
+        Voiture.objects.filter(pk__in=set(louees)).update(statut='louee')
+        return nb
+
+    def _enregistrer_reservations(self, lot):
+        if not lot:
+            return 0
+        dates = [r.created_at for r in lot]
+        with transaction.atomic():
+            reservations = Reservation.objects.bulk_create(lot, batch_size=self.batch_size)
+            dater(Reservation, reservations, dates, ['created_at'])
+            revenus = Transaction.objects.bulk_create([
+                Transaction(
+                    type='REVENU',
+                    montant=r.prix_total,
+                    reservation=r,
+                    voiture_id=r.voiture_id,
+                    description=f"Revenue from reservation: {r.nom_client} - {r.voiture.matricule}",
+                )
+                for r in reservations
+            ], batch_size=self.batch_size)
+            dater(Transaction, revenus, dates, ['date', 'created_at'])
+        return len(reservations)
+
+    def _creer_depenses(self, voitures, total, jours):
+        categories = list(DEPENSES)
+        poids = [DEPENSES[c][0] for c in categories]
+
+        nb = 0
+        while nb < total:
+            taille = min(self.batch_size, total - nb)
+            lot = []
+            dates = []
+            for categorie in self.rng.choices(categories, weights=poids, k=taille):
+                _, minimum, maximum = DEPENSES[categorie]
+                date = self.origine + timedelta(seconds=self.rng.randint(0, jours * 86400))
+                voiture = self.rng.choice(voitures) if voitures else None
+                lot.append(Transaction(
+                    type='DEPENSE',
+                    categorie=categorie,
+                    montant=Decimal(self.rng.randint(minimum * 100, maximum * 100)) / 100,
+                    voiture=voiture,
+                    description=f"{dict(Transaction.CATEGORIE_CHOICES)[categorie]} - "
+                                f"{voiture.matricule if voiture else 'flotte'}",
+                ))
+                dates.append(date)
+            with transaction.atomic():
+                depenses = Transaction.objects.bulk_create(lot, batch_size=self.batch_size)
+                dater(Transaction, depenses, dates, ['date', 'created_at'])
+            nb += taille
+        return nb
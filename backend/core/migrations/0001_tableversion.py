@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:40
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def creer_versions(apps, schema_editor):
+    TableVersion = apps.get_model('core', 'TableVersion')
+    for table in ('voitures.Voiture', 'reservations.Reservation'):
+        TableVersion.objects.get_or_create(
+            table=table, defaults={'version': 1, 'modifie_le': timezone.now()}
+        )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('table', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('modifie_le', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(creer_versions, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,14 @@
 from django.db import models
 
-# Create your models here.
+
+class TableVersion(models.Model):
+    """
+    Numéro de version d'une table, incrémenté à chaque écriture
+    (voir core/versions.py). Sert à calculer les ETag des listes.
+    """
+    table = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    modifie_le = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
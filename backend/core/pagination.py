@@ -0,0 +1,184 @@
+import base64
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .fast_serializers import FastListSerializer
+
+
+class EncodeurCurseur(DjangoJSONEncoder):
+    """
+    Dates à la microseconde : DjangoJSONEncoder les tronque à la
+    milliseconde, et la condition keyset sauterait les lignes de la même
+    milliseconde que la dernière de la page.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encoder_curseur(valeurs):
+    brut = json.dumps(valeurs, cls=EncodeurCurseur).encode()
+    return base64.urlsafe_b64encode(brut).decode()
+
+
+def decoder_curseur(curseur):
+    try:
+        return json.loads(base64.urlsafe_b64decode(curseur.encode()))
+    except (ValueError, TypeError):
+        return None
+
+
+def apres(ordering, valeurs):
+    """
+    Condition keyset « strictement après » la ligne `valeurs` pour un
+    ordre composite, ex. ('-date', '-id') :
+        date < d OR (date = d AND id < i)
+    """
+    condition = Q()
+    egalites = {}
+    for champ, valeur in zip(ordering, valeurs):
+        nom = champ.lstrip('-')
+        operateur = 'lt' if champ.startswith('-') else 'gt'
+        condition |= Q(**egalites, **{f'{nom}__{operateur}': valeur})
+        egalites[nom] = valeur
+    return condition
+
+
+def inverser(ordering):
+    """('-date', '-id') -> ('date', 'id')."""
+    return tuple(champ[1:] if champ.startswith('-') else f'-{champ}' for champ in ordering)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Pagination par curseur (keyset) : chaque page est un `WHERE cle < curseur
+    LIMIT n` sur un ordre stable, donc la page N coûte autant que la page 1.
+
+    La clé est composite : l'ordre demandé (ordering, ou ?ordering= via
+    OrderingFilter) complété par l'id, et le curseur porte la valeur de
+    chaque champ de la dernière ligne (condition `apres`). Des lignes de
+    même date ou de même type ne sont donc jamais départagées par un
+    décalage OFFSET comme dans CursorPagination.
+
+    - `?page_size=<n>` choisit la taille de page (plafonnée à max_page_size)
+    - `?page_size=all` réactive l'ancien mode « tout d'un coup »
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-id'
+    all_value = 'all'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.page_size_query_param) == self.all_value:
+            return None
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.position, self.reverse = self.decode_cursor(request)
+
+        # Vers l'arrière : ordre inversé, puis page remise à l'endroit
+        ordering = inverser(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(apres(ordering, self.position))
+
+        lignes = list(queryset[:self.page_size + 1])
+        encore = len(lignes) > self.page_size
+        self.page = lignes[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, encore
+        else:
+            self.has_next, self.has_previous = encore, self.position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not {'id', 'pk'} & {champ.lstrip('-') for champ in ordering}:
+            # Départage par l'id, dans le sens du dernier champ
+            ordering += ('-id' if ordering[-1].startswith('-') else 'id',)
+        return ordering
+
+    def decode_cursor(self, request):
+        """(position, vers l'arrière) du curseur, (None, False) sans curseur."""
+        encode = request.query_params.get(self.cursor_query_param)
+        if encode is None:
+            return None, False
+        curseur = decoder_curseur(encode)
+        if (
+            not isinstance(curseur, dict)
+            or not isinstance(curseur.get('p'), list)
+            or len(curseur['p']) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return curseur['p'], bool(curseur.get('r'))
+
+    def encode_cursor(self, position, reverse=False):
+        curseur = {'p': position}
+        if reverse:
+            curseur['r'] = 1
+        return replace_query_param(self.base_url, self.cursor_query_param, encoder_curseur(curseur))
+
+    def _get_position_from_instance(self, instance, ordering):
+        valeurs = []
+        for champ in ordering:
+            nom = champ.lstrip('-')
+            valeurs.append(instance[nom] if isinstance(instance, dict) else getattr(instance, nom))
+        return valeurs
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return self.encode_cursor(self.position)
+        return self.encode_cursor(self._get_position_from_instance(self.page[-1], self.ordering))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.encode_cursor(self.position, reverse=True)
+        return self.encode_cursor(
+            self._get_position_from_instance(self.page[0], self.ordering), reverse=True
+        )
+
+
+def paginer(request, queryset, serializer, ordering='-id'):
+    """
+    Réponse paginée pour les vues fonctions (@api_view).
+
+    `serializer` est une classe de serializer DRF ou un FastListSerializer
+    (lecture via values(), sans instancier de modèles).
+    """
+    if isinstance(serializer, FastListSerializer):
+        queryset = serializer.values(queryset)
+        serialize = serializer.serialize
+    else:
+        def serialize(rows):
+            return serializer(rows, many=True).data
+
+    paginator = KeysetPagination()
+    paginator.ordering = ordering
+
+    page = paginator.paginate_queryset(queryset, request)
+    if page is None:
+        return Response(serialize(queryset.order_by(ordering)))
+
+    return paginator.get_paginated_response(serialize(page))
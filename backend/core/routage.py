@@ -0,0 +1,61 @@
+"""
+Routage lecture / écriture (profil de production, voir
+location_voiture/base_sqlite.py).
+
+LectureSeuleMiddleware marque les requêtes GET/HEAD/OPTIONS ; pendant
+celles-ci, LectureEcritureRouter envoie les lectures sur l'alias
+'replica'. Les écritures, et les lectures faites dans une transaction
+ouverte sur 'default' (lire ses propres écritures), restent sur 'default'.
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+
+REPLICA = 'replica'
+METHODES_LECTURE = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+_lecture_seule = ContextVar('lecture_seule', default=False)
+
+
+@sync_and_async_middleware
+def lecture_seule_middleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            jeton = _lecture_seule.set(request.method in METHODES_LECTURE)
+            try:
+                return await get_response(request)
+            finally:
+                _lecture_seule.reset(jeton)
+    else:
+        def middleware(request):
+            jeton = _lecture_seule.set(request.method in METHODES_LECTURE)
+            try:
+                return get_response(request)
+            finally:
+                _lecture_seule.reset(jeton)
+    return middleware
+
+
+class LectureEcritureRouter:
+
+    def db_for_read(self, model, **hints):
+        if (
+            _lecture_seule.get()
+            and REPLICA in settings.DATABASES
+            and not connections['default'].in_atomic_block
+        ):
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Même fichier SQLite derrière les deux alias
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == REPLICA else None
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reservations.models import Reservation
+from voitures.models import Voiture
+from .versions import incrementer
+
+
+@receiver(post_save, sender=Voiture)
+@receiver(post_delete, sender=Voiture)
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def incrementer_version(sender, **kwargs):
+    """Toute écriture sur une voiture ou une réservation change l'ETag des listes."""
+    incrementer(sender)
@@ -1,3 +1,433 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F, Sum
+from django.conf import settings
+from django.db import connections
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core.benchmark import ROUTES, comparer, mesurer_routes
+from core.routage import LectureEcritureRouter, lecture_seule_middleware
+from core.versions import versions
+from reservations.models import EvenementReservation, Reservation, ReservationHistorique
+from reservations.nettoyage import nettoyer_reservations_expirees
+from transactions.archive import close_months
+from transactions.models import ClosedPeriod, DailyFinancialRollup, Transaction, TransactionArchive
+from transactions.search import FTS_TABLE
+from transactions.outbox import drain
+from voitures.models import Voiture
+
+
+class SeedFleetTest(TestCase):
+
+    def lancer(self, seed=7):
+        call_command(
+            'seed_fleet', voitures=12, reservations=150, transactions=80,
+            seed=seed, jours=120, batch_size=40, stdout=StringIO(),
+        )
+
+    def test_volumes_et_revenus(self):
+        self.lancer()
+
+        self.assertEqual(Voiture.objects.count(), 12)
+        nb_reservations = Reservation.objects.count()
+        self.assertGreater(nb_reservations, 0)
+        # Un revenu par réservation, du même montant
+        revenus = Transaction.objects.filter(type='REVENU')
+        self.assertEqual(revenus.count(), nb_reservations)
+        self.assertFalse(revenus.exclude(montant=F('reservation__prix_total')).exists())
+        self.assertEqual(Transaction.objects.filter(type='DEPENSE').count(), 80)
+        self.assertFalse(Transaction.objects.filter(type='DEPENSE', categorie__isnull=True).exists())
+
+    def test_dates_historiques(self):
+        self.lancer()
+
+        # Revenu daté de la création de sa réservation, dates étalées sur l'historique
+        revenus = Transaction.objects.filter(type='REVENU')
+        self.assertFalse(revenus.exclude(date=F('reservation__created_at')).exists())
+        self.assertFalse(Transaction.objects.exclude(created_at=F('date')).exists())
+        ancien = timezone.now() - timedelta(days=60)
+        self.assertTrue(Transaction.objects.filter(type='DEPENSE', date__lt=ancien).exists())
+        self.assertTrue(Reservation.objects.filter(created_at__lt=ancien).exists())
+        self.assertTrue(Transaction._meta.get_field('date').auto_now_add)
+
+    def test_rien_dans_le_futur(self):
+        """Réservations à venir créées au plus tard maintenant, revenus compris"""
+        self.lancer()
+
+        maintenant = timezone.now()
+        self.assertTrue(Reservation.objects.filter(date_debut__gt=maintenant).exists())
+        self.assertFalse(Reservation.objects.filter(created_at__gt=maintenant).exists())
+        self.assertFalse(Transaction.objects.filter(date__gt=maintenant).exists())
+
+    def test_capacite_depassee(self):
+        """Plus de réservations que l'horizon n'en tient : erreur, rien d'écrit"""
+        with self.assertRaisesMessage(CommandError, 'Augmenter --voitures ou --jours'):
+            call_command(
+                'seed_fleet', voitures=5, reservations=5000, transactions=10,
+                jours=120, stdout=StringIO(),
+            )
+        self.assertFalse(Voiture.objects.exists())
+
+        # Juste à la capacité : tout est créé
+        call_command(
+            'seed_fleet', voitures=1, reservations=75, transactions=0,
+            seed=1, jours=120, stdout=StringIO(),
+        )
+        self.assertEqual(Reservation.objects.count(), 75)
+
+    def test_aucun_chevauchement(self):
+        self.lancer()
+
+        for reservation in Reservation.objects.all():
+            self.assertLess(reservation.date_debut, reservation.date_fin)
+            autres = Reservation.objects.filter(voiture=reservation.voiture).exclude(pk=reservation.pk)
+            self.assertFalse(
+                autres.chevauchant(reservation.date_debut, reservation.date_fin).exists()
+            )
+
+    def test_agregats_reconstruits(self):
+        self.lancer()
+
+        ledger = Transaction.objects.aggregate(total=Sum('montant'), n=Count('id'))
+        rollup = DailyFinancialRollup.objects.aggregate(total=Sum('total'), n=Sum('count'))
+        self.assertEqual(ledger['total'], rollup['total'])
+        self.assertEqual(ledger['n'], rollup['n'])
+
+    def test_vider_archives(self):
+        """--vider efface aussi historique, archive, mois clos et boîte d'envoi"""
+        self.lancer()
+        nettoyer_reservations_expirees()
+        close_months(timezone.localdate().replace(day=1) - timedelta(days=40))
+        Reservation.objects.create(
+            voiture=Voiture.objects.exclude(statut='maintenance').first(),
+            nom_client='Client Futur', telephone='0600000000',
+            date_debut=timezone.now() + timedelta(days=400),
+            date_fin=timezone.now() + timedelta(days=402),
+        )
+        self.assertTrue(ReservationHistorique.objects.exists())
+        self.assertTrue(TransactionArchive.objects.exists())
+        self.assertTrue(EvenementReservation.objects.exists())
+
+        call_command(
+            'seed_fleet', voitures=12, reservations=150, transactions=80,
+            seed=7, jours=120, batch_size=40, vider=True, stdout=StringIO(),
+        )
+        self.assertEqual(Voiture.objects.count(), 12)
+        for modele in (ReservationHistorique, TransactionArchive, ClosedPeriod, EvenementReservation):
+            self.assertFalse(modele.objects.exists(), modele.__name__)
+        with connections['default'].cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+            self.assertEqual(cursor.fetchone()[0], Transaction.objects.count())
+
+    def test_deterministe(self):
+        colonnes = ('voiture__matricule', 'nom_client', 'nni', 'prix_total')
+        self.lancer(seed=3)
+        premier = list(Reservation.objects.order_by('id').values_list(*colonnes))
+
+        call_command(
+            'seed_fleet', voitures=12, reservations=150, transactions=80,
+            seed=3, jours=120, batch_size=40, vider=True, stdout=StringIO(),
+        )
+        second = list(Reservation.objects.order_by('id').values_list(*colonnes))
+        self.assertEqual(premier, second)
+
+
+class BenchmarkTest(TestCase):
+
+    def setUp(self):
+        call_command(
+            'seed_fleet', voitures=5, reservations=20, transactions=10,
+            seed=1, jours=60, stdout=StringIO(),
+        )
+        admin = get_user_model().objects.create_superuser('bench', 'b@example.com', 'bench')
+        self.client.force_login(admin)
+
+    def test_mesurer_routes(self):
+        routes = [r for r in ROUTES if r[0] in (
+            'voitures-liste', 'transaction-creer', 'transactions-by-voiture'
+        )]
+        resultats = mesurer_routes(self.client, repetitions=2, routes=routes)
+
+        self.assertEqual(set(resultats), {'voitures-liste', 'transaction-creer', 'transactions-by-voiture'})
+        self.assertEqual(resultats['voitures-liste']['statut'], 200)
+        self.assertEqual(resultats['transactions-by-voiture']['statut'], 200)
+        self.assertEqual(resultats['transaction-creer']['statut'], 201)
+        for mesure in resultats.values():
+            self.assertGreater(mesure['requetes'], 0)
+            self.assertLessEqual(mesure['p50_ms'], mesure['p95_ms'])
+            self.assertGreater(mesure['memoire_ko'], 0)
+        # Les écritures sont annulées
+        self.assertEqual(Transaction.objects.filter(description='Bench').count(), 0)
+
+    def test_ecritures_voitures_reservations(self):
+        attendus = {
+            'voiture-creer': 201, 'voiture-modifier': 200, 'voiture-supprimer': 204,
+            'reservation-creer': 201, 'reservation-modifier': 200, 'reservation-supprimer': 204,
+        }
+        avant = (Voiture.objects.count(), Reservation.objects.count(), Transaction.objects.count())
+        routes = [r for r in ROUTES if r[0] in attendus]
+        resultats = mesurer_routes(self.client, repetitions=2, routes=routes)
+
+        self.assertEqual({nom: m['statut'] for nom, m in resultats.items()}, attendus)
+        # Chaque répétition retrouve la même base
+        self.assertEqual(
+            (Voiture.objects.count(), Reservation.objects.count(), Transaction.objects.count()),
+            avant
+        )
+
+    def test_comparer(self):
+        base = {'statut': 200, 'p50_ms': 10.0, 'p95_ms': 12.0, 'requetes': 3, 'memoire_ko': 100.0}
+        reference = {'1000': {'liste': base}}
+
+        self.assertEqual(comparer(reference, {'1000': {'liste': dict(base, p95_ms=14.0)}}), [])
+        # Route inconnue de la référence : ignorée
+        self.assertEqual(comparer(reference, {'1000': {'autre': dict(base, p95_ms=99.0)}}), [])
+
+        regressions = comparer(reference, {'1000': {'liste': dict(
+            base, statut=500, p95_ms=20.0, requetes=4, memoire_ko=200.0
+        )}})
+        self.assertEqual(len(regressions), 4)
+        self.assertTrue(all(r.startswith('[1000] liste') for r in regressions))
+
+    def test_comparer_plancher(self):
+        reference = {'10': {'rapide': {
+            'statut': 200, 'p50_ms': 0.5, 'p95_ms': 1.0, 'requetes': 1, 'memoire_ko': 10.0
+        }}}
+        actuel = {'10': {'rapide': {
+            'statut': 200, 'p50_ms': 1.0, 'p95_ms': 2.5, 'requetes': 1, 'memoire_ko': 10.0
+        }}}
+        self.assertEqual(comparer(reference, actuel, plancher_ms=2.0), [])
+        self.assertEqual(len(comparer(reference, actuel, plancher_ms=0)), 1)
+
+
+class ListeConditionnelleTest(TestCase):
+    """ETag / Last-Modified des listes de voitures et de réservations"""
+
+    def setUp(self):
+        self.voiture = Voiture.objects.create(
+            matricule='ET000001', marque='Kia', modele='Rio',
+            prix_jour=Decimal('80.00'), kilometrage=1000
+        )
+        maintenant = timezone.now()
+        self.reservation = Reservation.objects.create(
+            voiture=self.voiture, nom_client='Etag', telephone='0600000000',
+            date_debut=maintenant, date_fin=maintenant + timedelta(days=2)
+        )
+
+    def etag(self, url):
+        reponse = self.client.get(url)
+        self.assertEqual(reponse.status_code, 200)
+        return reponse['ETag']
+
+    def test_304_sans_serialisation(self):
+        reponse = self.client.get('/api/voitures/')
+        self.assertIn('no-cache', reponse['Cache-Control'])
+        self.assertTrue(reponse.has_header('Last-Modified'))
+
+        with self.assertNumQueries(1):
+            non_modifie = self.client.get('/api/voitures/', HTTP_IF_NONE_MATCH=reponse['ETag'])
+        self.assertEqual(non_modifie.status_code, 304)
+        self.assertEqual(non_modifie.content, b'')
+
+    def test_ecritures_changent_etag(self):
+        voitures = self.etag('/api/voitures/')
+        reservations = self.etag('/api/reservations/')
+
+        self.voiture.kilometrage = 2000
+        self.voiture.save()
+
+        self.assertNotEqual(self.etag('/api/voitures/'), voitures)
+        # La voiture est imbriquée dans chaque réservation
+        self.assertNotEqual(self.etag('/api/reservations/'), reservations)
+
+    def test_etag_par_page(self):
+        self.assertNotEqual(self.etag('/api/voitures/'), self.etag('/api/voitures/?page_size=all'))
+
+    def test_echeance_sans_ecriture(self):
+        """Le statut effectif change quand une réservation se termine"""
+        avant = self.etag('/api/voitures/')
+        passe = timezone.now() - timedelta(minutes=1)
+        # update() : aucune version incrémentée, seule l'échéance change
+        Reservation.objects.filter(pk=self.reservation.pk).update(
+            date_debut=passe - timedelta(days=1), date_fin=passe
+        )
+        self.assertNotEqual(self.etag('/api/voitures/'), avant)
+
+    def test_ecritures_en_masse(self):
+        from reservations.nettoyage import nettoyer_reservations_expirees
+
+        Reservation.objects.filter(pk=self.reservation.pk).update(
+            date_fin=timezone.now() - timedelta(days=1)
+        )
+        version = versions(Voiture)[0]['voitures.Voiture'][0]
+        nettoyer_reservations_expirees()
+        self.assertGreater(versions(Voiture)[0]['voitures.Voiture'][0], version)
+
+    def test_ecriture_sans_etag(self):
+        reponse = self.client.post('/api/voitures/', {}, content_type='application/json')
+        self.assertEqual(reponse.status_code, 400)
+        self.assertFalse(reponse.has_header('ETag'))
+
+
+class ProfilSQLiteTest(TestCase):
+    """Profil de production : pragmas appliqués à la connexion, alias lecture seule"""
+
+    def test_pragmas_et_lecture_seule(self):
+        import tempfile
+        from pathlib import Path
+
+        from django.db import OperationalError
+        from django.db.utils import ConnectionHandler
+
+        from location_voiture.base_sqlite import BUSY_TIMEOUT, profil_production
+
+        with tempfile.TemporaryDirectory() as dossier:
+            profil = profil_production(Path(dossier) / 'prod.sqlite3')
+            # Alias distinct de 'replica' (bloqué par le TestCase sous ce profil)
+            bases = ConnectionHandler({'default': profil['default'], 'lecture': profil['replica']})
+            try:
+                with bases['default'].cursor() as curseur:
+                    curseur.execute('PRAGMA journal_mode')
+                    self.assertEqual(curseur.fetchone()[0], 'wal')
+                    curseur.execute('PRAGMA synchronous')
+                    self.assertEqual(curseur.fetchone()[0], 1)  # NORMAL
+                    curseur.execute('PRAGMA busy_timeout')
+                    self.assertEqual(curseur.fetchone()[0], BUSY_TIMEOUT * 1000)
+                    curseur.execute('CREATE TABLE t (x INTEGER)')
+
+                with bases['lecture'].cursor() as curseur:
+                    curseur.execute('SELECT COUNT(*) FROM t')
+                    with self.assertRaises(OperationalError):
+                        curseur.execute('INSERT INTO t VALUES (1)')
+            finally:
+                bases.close_all()
+
+
+@override_settings(DATABASES={**settings.DATABASES, 'replica': settings.DATABASES['default']})
+class RoutageLectureTest(SimpleTestCase):
+    """Les lectures des requêtes GET vont sur 'replica', le reste sur 'default'"""
+
+    def setUp(self):
+        self.router = LectureEcritureRouter()
+
+    def appeler(self, methode):
+        vues = []
+        middleware = lecture_seule_middleware(
+            lambda request: vues.append(self.router.db_for_read(Voiture))
+        )
+        middleware(getattr(RequestFactory(), methode)('/api/voitures/'))
+        return vues[0]
+
+    def test_get_sur_replica(self):
+        self.assertEqual(self.appeler('get'), 'replica')
+        self.assertIsNone(self.appeler('post'))
+        # Hors requête : 'default'
+        self.assertIsNone(self.router.db_for_read(Voiture))
+        self.assertEqual(self.router.db_for_write(Voiture), 'default')
+
+    def test_transaction_ouverte_sur_default(self):
+        """Dans un atomic() sur 'default', on relit ses propres écritures"""
+        connexion = connections['default']
+        connexion.in_atomic_block = True
+        try:
+            self.assertIsNone(self.appeler('get'))
+        finally:
+            connexion.in_atomic_block = False
+
+    def test_pas_de_migration_sur_replica(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'voitures'))
+        self.assertIsNone(self.router.allow_migrate('default', 'voitures'))
+
+
+class DashboardTest(TestCase):
+    """Indicateurs du tableau de bord : trois agrégats, cache invalidé par les écritures"""
+
+    def setUp(self):
+        caches['analytics'].clear()
+        maintenant = timezone.now()
+        self.clio = Voiture.objects.create(
+            matricule='DB000001', marque='Renault', modele='Clio',
+            prix_jour=Decimal('100.00'), kilometrage=1000
+        )
+        Voiture.objects.create(
+            matricule='DB000002', marque='Kia', modele='Rio',
+            prix_jour=Decimal('90.00'), kilometrage=2000
+        )
+        Voiture.objects.create(
+            matricule='DB000003', marque='Kia', modele='Rio',
+            prix_jour=Decimal('90.00'), kilometrage=3000, statut='maintenance'
+        )
+        # Réservation en cours : revenu de 300 (3 jours entamés)
+        Reservation.objects.create(
+            voiture=self.clio, nom_client='Client En Cours', telephone='0600000000',
+            date_debut=maintenant - timedelta(days=1), date_fin=maintenant + timedelta(days=1),
+        )
+        drain()
+        Transaction.objects.create(type='DEPENSE', categorie='CARBURANT', montant=Decimal('50.00'))
+
+    def test_indicateurs(self):
+        data = self.client.get('/api/dashboard/').json()
+
+        # Les filtres suivent Transaction.TYPE_CHOICES ('REVENU' / 'DEPENSE')
+        self.assertEqual(data['revenus'], 300.0)
+        self.assertEqual(data['depenses'], 50.0)
+        self.assertEqual(data['profit'], 250.0)
+        self.assertEqual(data['nb_transactions'], 2)
+        self.assertEqual(data['total_voitures'], 3)
+        self.assertEqual(data['voitures_louees'], 1)
+        self.assertEqual(data['voitures_maintenance'], 1)
+        self.assertEqual(data['voitures_disponibles'], 1)
+        self.assertEqual(data['reservations_total'], 1)
+        self.assertEqual(data['reservations_en_cours'], 1)
+        self.assertEqual(data['dernieres_reservations'][0]['nom_client'], 'Client En Cours')
+
+    def test_agregats_puis_cache(self):
+        # Versions des tables, trois agrégats, dernières réservations (avec la voiture)
+        with self.assertNumQueries(5):
+            self.client.get('/api/dashboard/')
+        # Réponse en cache : seule la lecture des versions reste
+        with self.assertNumQueries(1):
+            self.client.get('/api/dashboard/')
+
+    def test_ecritures_invalident_le_cache(self):
+        self.assertEqual(self.client.get('/api/dashboard/').json()['depenses'], 50.0)
+
+        # La génération du cache analytique change au commit de l'écriture
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(type='DEPENSE', categorie='CARBURANT', montant=Decimal('25.00'))
+        self.assertEqual(self.client.get('/api/dashboard/').json()['depenses'], 75.0)
+
+        Voiture.objects.create(
+            matricule='DB000004', marque='Kia', modele='Picanto',
+            prix_jour=Decimal('70.00'), kilometrage=10
+        )
+        self.assertEqual(self.client.get('/api/dashboard/').json()['total_voitures'], 4)
+
+    def test_reservations_archivees_comptees(self):
+        maintenant = timezone.now()
+        Reservation.objects.create(
+            voiture=self.clio, nom_client='Client Termine', telephone='0600000000',
+            date_debut=maintenant - timedelta(days=10), date_fin=maintenant - timedelta(days=8),
+        )
+        drain()
+        avant = self.client.get('/api/dashboard/').json()
+        self.assertEqual(avant['reservations_total'], 2)
+
+        nettoyer_reservations_expirees()
+        apres = self.client.get('/api/dashboard/').json()
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(apres['reservations_total'], 2)
+        self.assertEqual(apres['reservations_mois'], avant['reservations_mois'])
+        self.assertEqual(apres['reservations_en_cours'], 1)
+
+    def test_page_html(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Client En Cours')
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import dashboard
+from .views import dashboard, dashboard_api
 
 urlpatterns = [
     path('', dashboard, name='dashboard'),
+    path('api/dashboard/', dashboard_api, name='dashboard-api'),
 ]
@@ -0,0 +1,109 @@
+"""
+Versions de tables et GET conditionnel (ETag / Last-Modified).
+
+Chaque écriture sur une table suivie incrémente sa ligne TableVersion
+(signaux dans core/signals.py, appel explicite pour les écritures en
+masse qui contournent les signaux). Les listes dérivent leur ETag de ces
+versions : une liste inchangée coûte une seule requête sur TableVersion
+et une réponse 304, sans sérialisation ni contenu.
+"""
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.db.models import DateTimeField, F, Subquery, Value
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .models import TableVersion
+
+
+def cle(modele):
+    return modele._meta.label
+
+
+def incrementer(*modeles):
+    """Marque les tables de `modeles` comme modifiées."""
+    maintenant = timezone.now()
+    for modele in modeles:
+        table = cle(modele)
+        if TableVersion.objects.filter(table=table).update(
+            version=F('version') + 1, modifie_le=maintenant
+        ):
+            continue
+        try:
+            with transaction.atomic():
+                TableVersion.objects.create(table=table, version=1, modifie_le=maintenant)
+        except IntegrityError:
+            # Créée entre-temps par une autre écriture
+            TableVersion.objects.filter(table=table).update(
+                version=F('version') + 1, modifie_le=maintenant
+            )
+
+
+def versions(*modeles, horloge=None):
+    """
+    ({table: (version, modifie_le)}, instant) en une requête.
+
+    `horloge` est un queryset values_list(flat=True) d'une valeur, lu en
+    sous-requête de la même requête.
+    """
+    tables = [cle(modele) for modele in modeles]
+    etat = {table: (0, None) for table in tables}
+    lignes = TableVersion.objects.filter(table__in=tables)
+    if horloge is not None:
+        lignes = lignes.annotate(instant=Subquery(horloge[:1]))
+    else:
+        lignes = lignes.annotate(instant=Value(None, output_field=DateTimeField()))
+
+    instant = None
+    trouvees = False
+    for table, version, modifie_le, instant in lignes.values_list(
+        'table', 'version', 'modifie_le', 'instant'
+    ):
+        etat[table] = (version, modifie_le)
+        trouvees = True
+    if horloge is not None and not trouvees:
+        instant = horloge.first()
+    return etat, instant
+
+
+def liste_conditionnelle(*modeles, horloge=None):
+    """
+    Décorateur de vue liste : ETag fort et Last-Modified calculés à partir
+    des versions de `modeles`, réponse 304 sur If-None-Match /
+    If-Modified-Since, et `Cache-Control: no-cache` pour que le navigateur
+    revalide à chaque navigation au lieu de tout retélécharger.
+
+    `horloge` (optionnelle) renvoie un queryset d'un instant qui fait aussi
+    varier la réponse sans écriture (ex. dernière réservation arrivée à
+    échéance pour le statut effectif des voitures).
+    """
+    def etat(request):
+        if not hasattr(request, '_etat_versions'):
+            valeurs, instant = versions(*modeles, horloge=horloge() if horloge else None)
+            dates = [modifie_le for _, modifie_le in valeurs.values() if modifie_le]
+            if instant:
+                dates.append(instant)
+            empreinte = hashlib.sha1('|'.join([
+                request.get_full_path(),
+                request.META.get('HTTP_ACCEPT', ''),
+                *(f'{table}:{version}' for table, (version, _) in sorted(valeurs.items())),
+                instant.isoformat() if instant else '',
+            ]).encode()).hexdigest()
+            request._etat_versions = (empreinte, max(dates) if dates else None)
+        return request._etat_versions
+
+    def etag(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        return etat(request)[0]
+
+    def last_modified(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        return etat(request)[1]
+
+    def decorateur(vue):
+        return cache_control(no_cache=True)(condition(etag, last_modified)(vue))
+    return decorateur
@@ -1,19 +1,15 @@
 from django.shortcuts import render
-from voitures.models import Voiture
-from reservations.models import Reservation
-from transactions.models import Transaction
-from django.db.models import Sum
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from . import dashboard as indicateurs
+
 
 def dashboard(request):
-    revenus = Transaction.objects.filter(type='revenu').aggregate(Sum('montant'))['montant__sum'] or 0
-    depenses = Transaction.objects.filter(type='depense').aggregate(Sum('montant'))['montant__sum'] or 0
+    return render(request, 'core/dashboard.html', indicateurs.donnees())
+
 
-    context = {
-        'revenus': revenus,
-        'depenses': depenses,
-        'profit': revenus - depenses,
-        'total_voitures': Voiture.objects.count(),
-        'reservations_mois': Reservation.objects.count(),
-        'dernieres_reservations': Reservation.objects.all()[:5]
-    }
-    return render(request, 'core/dashboard.html', context)
+@api_view(['GET'])
+def dashboard_api(request):
+    """Mêmes indicateurs que la page d'accueil, en JSON pour le frontend React."""
+    return Response(indicateurs.donnees())
@@ -3,6 +3,9 @@ ASGI config for location_voiture project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Run with e.g. ``uvicorn location_voiture.asgi:application``: the async read
+endpoints (``.../async/``) are then served without a thread per request.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
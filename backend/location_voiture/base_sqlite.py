@@ -0,0 +1,63 @@
+"""
+Profil SQLite de production (DJANGO_DB_PROFILE=production).
+
+- WAL : les lectures ne bloquent plus les écritures (et inversement) ;
+- synchronous=NORMAL : sûr en WAL, un fsync par checkpoint au lieu d'un
+  par transaction ;
+- cache et mmap plus grands, tables temporaires en mémoire ;
+- busy timeout : une écriture concurrente attend au lieu d'échouer
+  immédiatement avec « database is locked » ;
+- transaction_mode IMMEDIATE : les transactions d'écriture prennent le
+  verrou dès BEGIN (pas de mise à niveau lecture -> écriture qui échoue
+  sans attendre le busy timeout) ;
+- CONN_MAX_AGE : connexions conservées entre les requêtes.
+
+L'alias 'replica' ouvre le même fichier en lecture seule (query_only) et
+en transactions DEFERRED : les GET y sont envoyés par
+core.routage.LectureEcritureRouter et n'attendent jamais le verrou
+d'écriture.
+"""
+
+PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-65536',      # 64 Mo
+    'PRAGMA mmap_size=268435456',    # 256 Mo
+    'PRAGMA temp_store=MEMORY',
+)
+
+BUSY_TIMEOUT = 20  # secondes
+CONN_MAX_AGE = 600
+
+
+def profil_developpement(nom):
+    return {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': nom,
+        }
+    }
+
+
+def profil_production(nom, conn_max_age=CONN_MAX_AGE):
+    ecriture = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': nom,
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': BUSY_TIMEOUT,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join(PRAGMAS),
+        },
+    }
+    lecture = {
+        **ecriture,
+        'OPTIONS': {
+            'timeout': BUSY_TIMEOUT,
+            'init_command': ';'.join(PRAGMAS + ('PRAGMA query_only=ON',)),
+        },
+        # En test, 'replica' pointe sur la base de test de 'default'
+        'TEST': {'MIRROR': 'default'},
+    }
+    return {'default': ecriture, 'replica': lecture}
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .base_sqlite import profil_developpement, profil_production
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -59,6 +62,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+REST_FRAMEWORK = {
+    # Pagination par curseur sur toutes les listes (voir core/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+}
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
@@ -115,11 +124,42 @@ WSGI_APPLICATION = 'location_voiture.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
+# DJANGO_DB_PROFILE=production : WAL, pragmas, busy timeout, connexions
+# persistantes et lectures GET sur l'alias 'replica' (voir base_sqlite.py)
+DB_PROFILE = os.environ.get('DJANGO_DB_PROFILE', 'dev')
+
+if DB_PROFILE == 'production':
+    DATABASES = profil_production(BASE_DIR / 'db.sqlite3')
+    DATABASE_ROUTERS = ['core.routage.LectureEcritureRouter']
+    MIDDLEWARE.insert(0, 'core.routage.lecture_seule_middleware')
+else:
+    DATABASES = profil_developpement(BASE_DIR / 'db.sqlite3')
+
+# Revenus des réservations : événements (outbox) appliqués au journal par un
+# thread local après chaque réservation. 0 : les traiter uniquement avec
+# `manage.py process_reservation_events` (cron ou worker séparé).
+TRANSACTIONS_OUTBOX_WORKER = os.environ.get('TRANSACTIONS_OUTBOX_WORKER', '1') == '1'
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Réponses des actions analytiques des transactions (transactions/cache.py).
+    # LocMemCache est un LRU borné par MAX_ENTRIES ; utiliser Redis/Memcached
+    # pour partager le cache (et le verrou anti-stampede) entre workers.
+    'analytics': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'transactions-analytics',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+            'CULL_FREQUENCY': 4,
+        },
+    },
 }
 
 
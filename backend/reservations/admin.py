@@ -1,3 +1,14 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Reservation
+
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'nom_client', 'voiture', 'date_debut', 'date_fin', 'prix_total')
+    list_select_related = ('voiture',)
+    # Recherche utilisée aussi par l'autocomplétion des transactions
+    search_fields = ('nom_client', 'telephone', 'nni', 'voiture__matricule')
+    autocomplete_fields = ('voiture',)
+    ordering = ('-id',)
+    show_full_result_count = False
@@ -0,0 +1,24 @@
+from django.views.decorators.http import require_GET
+
+from core.async_api import apaginer, non_trouve, reponse_json
+from .models import Reservation
+from .serializers import reservation_list_serializer
+
+# Versions async (ASGI) des lectures : même JSON que les vues @api_view.
+
+
+@require_GET
+async def reservation_list_async(request):
+    return await apaginer(
+        request, Reservation.objects.all(), reservation_list_serializer, ordering=('-id',)
+    )
+
+
+@require_GET
+async def reservation_detail_async(request, pk):
+    # Une requête : la voiture imbriquée vient de la même jointure values()
+    try:
+        ligne = await reservation_list_serializer.values(Reservation.objects.all()).aget(pk=pk)
+    except Reservation.DoesNotExist:
+        return non_trouve(Reservation)
+    return reponse_json(reservation_list_serializer.to_representation(ligne))
@@ -0,0 +1,106 @@
+"""
+Devis en lot : prix et disponibilité de nombreuses combinaisons
+(voiture, début, fin), sans créer de réservation.
+
+Deux requêtes quelle que soit la taille du lot : les voitures demandées
+(prix, statut), puis leurs réservations sur l'étendue du lot. Les
+chevauchements sont ensuite cherchés par dichotomie dans les intervalles
+triés de chaque voiture, avec la même règle que Reservation.clean().
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate
+
+from voitures.models import Voiture
+from .models import (
+    DATES_INVERSEES, DEJA_RESERVEE, VOITURE_INDISPONIBLE,
+    Reservation, calculer_prix_total, nombre_de_jours,
+)
+
+MAX_DEVIS = 500
+VOITURE_INTROUVABLE = "Voiture introuvable."
+
+
+class Occupation:
+    """Réservations d'une voiture triées par début, avec le maximum courant des fins."""
+
+    def __init__(self, intervalles):
+        intervalles.sort()
+        self.debuts = [debut for debut, _ in intervalles]
+        self.fins_max = list(accumulate((fin for _, fin in intervalles), max))
+
+    def chevauche(self, debut, fin):
+        """Même règle que ReservationQuerySet.chevauchant : date_fin >= debut et date_debut <= fin."""
+        # Réservations commencées au plus tard à `fin` : l'une d'elles finit-elle après `debut` ?
+        rang = bisect_right(self.debuts, fin)
+        return rang > 0 and self.fins_max[rang - 1] >= debut
+
+
+def deviser(demandes):
+    """
+    `demandes` : liste de {'voiture_id', 'date_debut', 'date_fin'} validés.
+
+    Retourne une ligne par demande, dans le même ordre, avec nb_jours,
+    prix_jour, prix_total et disponible (+ motif du refus éventuel).
+    """
+    if not demandes:
+        return []
+
+    voiture_ids = {demande['voiture_id'] for demande in demandes}
+    voitures = {
+        pk: (prix_jour, statut)
+        for pk, prix_jour, statut in Voiture.objects.filter(
+            pk__in=voiture_ids
+        ).values_list('pk', 'prix_jour', 'statut')
+    }
+
+    intervalles = defaultdict(list)
+    for voiture_id, debut, fin in Reservation.objects.filter(
+        voiture_id__in=voitures
+    ).chevauchant(
+        min(demande['date_debut'] for demande in demandes),
+        max(demande['date_fin'] for demande in demandes),
+    ).values_list('voiture_id', 'date_debut', 'date_fin'):
+        intervalles[voiture_id].append((debut, fin))
+    occupations = {
+        voiture_id: Occupation(liste) for voiture_id, liste in intervalles.items()
+    }
+
+    resultats = []
+    for demande in demandes:
+        voiture_id = demande['voiture_id']
+        debut, fin = demande['date_debut'], demande['date_fin']
+        ligne = {
+            'voiture_id': voiture_id,
+            'date_debut': debut,
+            'date_fin': fin,
+            'nb_jours': None,
+            'prix_jour': None,
+            'prix_total': None,
+            'disponible': False,
+            'motif': None,
+        }
+        resultats.append(ligne)
+
+        if voiture_id not in voitures:
+            ligne['motif'] = VOITURE_INTROUVABLE
+            continue
+        if fin < debut:
+            ligne['motif'] = DATES_INVERSEES
+            continue
+
+        prix_jour, statut = voitures[voiture_id]
+        ligne['nb_jours'] = nombre_de_jours(debut, fin)
+        ligne['prix_jour'] = prix_jour
+        ligne['prix_total'] = calculer_prix_total(debut, fin, prix_jour)
+
+        # Mêmes contrôles, dans le même ordre, que Reservation.clean() :
+        # seule la maintenance bloque, le statut 'louee' stocké n'entre pas en compte
+        if statut == 'maintenance':
+            ligne['motif'] = VOITURE_INDISPONIBLE
+        elif voiture_id in occupations and occupations[voiture_id].chevauche(debut, fin):
+            ligne['motif'] = DEJA_RESERVEE
+        else:
+            ligne['disponible'] = True
+
+    return resultats
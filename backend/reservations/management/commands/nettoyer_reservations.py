@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reservations.nettoyage import TAILLE_LOT_DEFAUT, nettoyer_reservations_expirees
+
+
+class Command(BaseCommand):
+    help = "Archive les réservations terminées dans l'historique et libère les voitures (par lots)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot', type=int, default=TAILLE_LOT_DEFAUT,
+            help="Nombre de réservations traitées par transaction."
+        )
+        parser.add_argument(
+            '--intervalle', type=int, default=0,
+            help="Relancer toutes les N secondes (0 = une seule passe, pour cron)."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total = nettoyer_reservations_expirees(options['taille_lot'])
+            self.stdout.write(f"{total} réservation(s) terminée(s) archivée(s).")
+
+            if not options['intervalle']:
+                break
+            time.sleep(options['intervalle'])
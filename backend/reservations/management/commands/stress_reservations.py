@@ -0,0 +1,133 @@
+import logging
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from reservations.models import Reservation
+from voitures.models import Voiture
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge des réservations : N fils envoient en parallèle des "
+        "POST /api/reservations/ sur des voitures tirées au hasard, dans une "
+        "base de test jetable. Affiche réservations/s et vérifie qu'aucune "
+        "voiture n'est réservée deux fois (code de sortie non nul sinon)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voitures', type=int, default=100)
+        parser.add_argument('--fils', type=int, default=8)
+        parser.add_argument('--demandes', type=int, default=50,
+                            help="Nombre de POST envoyés par fil.")
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        dossier = Path(tempfile.mkdtemp(prefix='stress_reservations_'))
+        # Base fichier (et non mémoire partagée) : mêmes verrous qu'en production
+        connection.settings_dict['TEST']['NAME'] = str(dossier / 'stress.sqlite3')
+        setup_test_environment()
+        ancien_nom = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            voiture_ids = self._creer_voitures(options['voitures'])
+            stats, duree = self._charger(
+                voiture_ids, options['fils'], options['demandes'], options['seed']
+            )
+            doublons = list(
+                Reservation.objects.values('voiture_id')
+                .annotate(nb=Count('id')).filter(nb__gt=1)
+            )
+            reservations = Reservation.objects.count()
+            louees = Voiture.objects.filter(statut='louee').count()
+        finally:
+            connection.creation.destroy_test_db(ancien_nom, verbosity=0)
+            teardown_test_environment()
+            shutil.rmtree(dossier, ignore_errors=True)
+
+        self.stdout.write(
+            f"{stats['acceptees']} réservation(s) acceptée(s), {stats['refusees']} refusée(s), "
+            f"{stats['erreurs']} erreur(s) en {duree:.2f} s"
+        )
+        self.stdout.write(f"Débit : {stats['acceptees'] / duree:.1f} réservations/s "
+                          f"({sum(stats.values()) / duree:.1f} requêtes/s)")
+
+        problemes = []
+        if doublons:
+            problemes.append(f"{len(doublons)} voiture(s) réservée(s) plusieurs fois")
+        if reservations != stats['acceptees']:
+            problemes.append(
+                f"{reservations} réservation(s) en base pour {stats['acceptees']} acceptée(s)"
+            )
+        if louees != reservations:
+            problemes.append(f"{louees} voiture(s) louée(s) pour {reservations} réservation(s)")
+        if stats['erreurs']:
+            problemes.append(f"{stats['erreurs']} réponse(s) en erreur serveur")
+        if problemes:
+            raise CommandError(' ; '.join(problemes))
+        self.stdout.write(self.style.SUCCESS("Aucune double réservation."))
+
+    def _creer_voitures(self, nombre):
+        Voiture.objects.bulk_create([
+            Voiture(
+                matricule=f'ST{i:06d}', marque='Stress', modele='Test',
+                prix_jour=100, kilometrage=0,
+            )
+            for i in range(nombre)
+        ])
+        return list(Voiture.objects.values_list('pk', flat=True))
+
+    def _charger(self, voiture_ids, nb_fils, nb_demandes, seed):
+        debut = timezone.now() + timedelta(days=1)
+        depart = threading.Barrier(nb_fils)
+        verrou = threading.Lock()
+        stats = {'acceptees': 0, 'refusees': 0, 'erreurs': 0}
+
+        def client_fil(numero):
+            rng = random.Random(None if seed is None else seed + numero)
+            client = Client(raise_request_exception=False)
+            try:
+                depart.wait()
+                for i in range(nb_demandes):
+                    reponse = client.post('/api/reservations/', {
+                        'voiture_id': rng.choice(voiture_ids),
+                        'nom_client': f'Client {numero}-{i}',
+                        'telephone': '0600000000',
+                        'date_debut': debut.isoformat(),
+                        'date_fin': (debut + timedelta(days=2)).isoformat(),
+                    }, content_type='application/json')
+                    if reponse.status_code == 201:
+                        cle = 'acceptees'
+                    elif reponse.status_code == 400:
+                        cle = 'refusees'
+                    else:
+                        cle = 'erreurs'
+                    with verrou:
+                        stats[cle] += 1
+            finally:
+                connection.close()
+
+        # Les refus (400) sont comptés : inutile de les journaliser un par un
+        journal = logging.getLogger('django.request')
+        niveau = journal.level
+        journal.setLevel(logging.CRITICAL)
+        fils = [threading.Thread(target=client_fil, args=(n,)) for n in range(nb_fils)]
+        chrono = time.perf_counter()
+        try:
+            for f in fils:
+                f.start()
+            for f in fils:
+                f.join()
+        finally:
+            journal.setLevel(niveau)
+        return stats, time.perf_counter() - chrono
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0007_alter_reservation_id'),
+        ('voitures', '0006_alter_voiture_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['voiture', 'date_debut', 'date_fin'], name='reservation_intervalle_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0008_reservation_intervalle_idx'),
+        ('voitures', '0006_alter_voiture_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['date_fin'], name='reservation_date_fin_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0009_reservation_date_fin_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvenementReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nature', models.CharField(choices=[('creee', 'Créée'), ('modifiee', 'Modifiée')], max_length=10)),
+                ('cree_le', models.DateTimeField(auto_now_add=True)),
+                ('reservation', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='reservations.reservation')),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0010_evenementreservation'),
+        ('voitures', '0006_alter_voiture_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationHistorique',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_origine', models.BigIntegerField(db_index=True)),
+                ('matricule', models.CharField(max_length=20)),
+                ('nni', models.CharField(blank=True, max_length=10, null=True)),
+                ('nom_client', models.CharField(max_length=100)),
+                ('telephone', models.CharField(max_length=20)),
+                ('date_debut', models.DateTimeField()),
+                ('date_fin', models.DateTimeField()),
+                ('prix_total', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('archivee_le', models.DateTimeField()),
+                ('voiture', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservations_historique', to='voitures.voiture')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['nom_client', 'date_debut'], name='historique_client_idx'), models.Index(fields=['nni'], name='historique_nni_idx'), models.Index(fields=['voiture', 'date_debut'], name='historique_voiture_idx'), models.Index(fields=['date_debut'], name='historique_date_debut_idx')],
+            },
+        ),
+    ]
@@ -1,8 +1,38 @@
 from django.db import models
 from django.core.exceptions import ValidationError
+from core.concurrence import reessayer_si_verrouillee
 from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
 from voitures.models import Voiture  # أو from voitures.models import Voiture
 
+
+# Messages partagés par clean() et les devis (reservations/devis.py)
+VOITURE_INDISPONIBLE = "Cette voiture n'est pas disponible."
+DATES_INVERSEES = "La date de fin doit être après la date de début."
+DEJA_RESERVEE = "Cette voiture est déjà réservée sur cette période."
+
+
+def nombre_de_jours(date_debut, date_fin):
+    """Jours facturés : tout jour entamé compte (même jour = 1 jour)."""
+    return (date_fin - date_debut).days + 1
+
+
+def calculer_prix_total(date_debut, date_fin, prix_jour):
+    """Prix total arrondi au centime, ou None si la voiture n'a pas de tarif."""
+    if not prix_jour:
+        return None
+    return (nombre_de_jours(date_debut, date_fin) * prix_jour).quantize(
+        Decimal('0.01'), rounding=ROUND_HALF_UP
+    )
+
+
+class ReservationQuerySet(models.QuerySet):
+
+    def chevauchant(self, debut, fin):
+        """Réservations qui chevauchent l'intervalle [debut, fin]."""
+        return self.filter(date_fin__gte=debut, date_debut__lte=fin)
+
+
 class Reservation(models.Model):
     voiture = models.ForeignKey(
         Voiture,
@@ -26,26 +56,38 @@ class Reservation(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ReservationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Index d'intervalle : recherche de chevauchement par voiture
+            models.Index(
+                fields=['voiture', 'date_debut', 'date_fin'],
+                name='reservation_intervalle_idx',
+            ),
+            # Expiration par lots (nettoyer_reservations)
+            models.Index(fields=['date_fin'], name='reservation_date_fin_idx'),
+        ]
+
     def clean(self):
         # Vérifier si une voiture est sélectionnée
         if self.voiture is None:
             raise ValidationError("La voiture doit être sélectionnée.")
 
-        # Vérifier disponibilité
-        if self.voiture.statut != 'disponible' and not self.pk:
-            raise ValidationError("Cette voiture n'est pas disponible.")
+        # Vérifier disponibilité : seule la maintenance bloque, les dates
+        # sont vérifiées par le chevauchement ci-dessous
+        if self.voiture.statut == 'maintenance' and not self.pk:
+            raise ValidationError(VOITURE_INDISPONIBLE)
 
         # Vérifier dates
         if self.date_fin < self.date_debut:
-            raise ValidationError("La date de fin doit être après la date de début.")
+            raise ValidationError(DATES_INVERSEES)
 
         # Vérifier chevauchement avec d'autres réservations
-        if self.__class__.objects.filter(
-            voiture=self.voiture,
-            date_fin__gte=self.date_debut,
-            date_debut__lte=self.date_fin
+        if self.__class__.objects.filter(voiture=self.voiture).chevauchant(
+            self.date_debut, self.date_fin
         ).exclude(pk=self.pk).exists():
-            raise ValidationError("Cette voiture est déjà réservée sur cette période.")
+            raise ValidationError(DEJA_RESERVEE)
         
 
 
@@ -53,21 +95,121 @@ class Reservation(models.Model):
 
 
 
+    @reessayer_si_verrouillee
     def save(self, *args, **kwargs):
-        self.clean()
+        nouvelle = self._state.adding
+
+        # Verrou sur la voiture (Voiture.objects.prendre) : les réservations
+        # d'une même voiture passent l'une après l'autre, et le contrôle de
+        # chevauchement de clean() voit celles déjà validées. C'est la
+        # première écriture de la transaction : SQLite attend le verrou au
+        # lieu d'échouer aussitôt (ce qui arrive quand une transaction qui a
+        # déjà lu veut écrire)
+        if self.voiture_id is not None and not Voiture.objects.prendre(self.voiture_id):
+            if nouvelle:
+                raise ValidationError(VOITURE_INDISPONIBLE)
+            # Modification d'une réservation d'une voiture en maintenance :
+            # verrou sans changer le statut
+            Voiture.objects.filter(pk=self.voiture_id).update(statut=models.F('statut'))
 
-        # calcul nombre de jours
-        nb_jours = (self.date_fin - self.date_debut).days + 1
+        self.clean()
 
+        # calcul du prix : jours entamés × prix par jour
         if self.voiture.prix_jour:
-            self.prix_total = nb_jours * self.voiture.prix_jour
+            self.prix_total = calculer_prix_total(
+                self.date_debut, self.date_fin, self.voiture.prix_jour
+            )
 
         super().save(*args, **kwargs)
 
-        # mettre la voiture en statut louée (une seule fois)
-        if self.voiture.statut == 'disponible':
+        # Effets sur le journal financier : un événement dans la même
+        # transaction, traité plus tard par transactions/outbox.py
+        EvenementReservation.objects.create(
+            reservation=self,
+            nature=EvenementReservation.CREEE if nouvelle else EvenementReservation.MODIFIEE,
+        )
+
+        # prendre() a mis la voiture en statut louée
+        if self.voiture.statut != 'maintenance':
             self.voiture.statut = 'louee'
-            self.voiture.save()
 
     def __str__(self):
         return f"{self.nom_client} - {self.voiture.matricule}"
+
+
+class ReservationHistorique(models.Model):
+    """
+    Réservations terminées, archivées par nettoyer_reservations_expirees()
+    (reservations/nettoyage.py).
+
+    La table Reservation ne garde que les réservations en cours ou à venir,
+    celles que lisent les contrôles de chevauchement et de disponibilité ;
+    l'historique a ses propres index pour les recherches par client et
+    par voiture.
+    """
+    # Identifiant dans Reservation : SQLite peut le réattribuer une fois la
+    # ligne supprimée, d'où une clé propre à l'historique
+    id_origine = models.BigIntegerField(db_index=True)
+    voiture = models.ForeignKey(
+        Voiture,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="reservations_historique"
+    )
+    # Copié : l'historique reste lisible si la voiture est supprimée
+    matricule = models.CharField(max_length=20)
+
+    nni = models.CharField(max_length=10, blank=True, null=True)
+    nom_client = models.CharField(max_length=100)
+    telephone = models.CharField(max_length=20)
+
+    date_debut = models.DateTimeField()
+    date_fin = models.DateTimeField()
+
+    prix_total = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+
+    created_at = models.DateTimeField()
+    archivee_le = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['nom_client', 'date_debut'], name='historique_client_idx'),
+            models.Index(fields=['nni'], name='historique_nni_idx'),
+            models.Index(fields=['voiture', 'date_debut'], name='historique_voiture_idx'),
+            models.Index(fields=['date_debut'], name='historique_date_debut_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nom_client} - {self.matricule}"
+
+
+class EvenementReservation(models.Model):
+    """
+    Boîte d'envoi (outbox) : une ligne par réservation créée ou modifiée,
+    écrite dans la transaction de la réservation. Les lignes sont
+    consommées (puis supprimées) par transactions/outbox.py.
+    """
+    CREEE = 'creee'
+    MODIFIEE = 'modifiee'
+    NATURES = [
+        (CREEE, 'Créée'),
+        (MODIFIEE, 'Modifiée'),
+    ]
+
+    # Sans contrainte : l'événement survit à la suppression de la réservation
+    reservation = models.ForeignKey(
+        Reservation,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    nature = models.CharField(max_length=10, choices=NATURES)
+    cree_le = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.nature} #{self.reservation_id}"
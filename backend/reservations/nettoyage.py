@@ -0,0 +1,96 @@
+from django.db import connections, router, transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils.timezone import now
+
+from core.versions import incrementer
+from transactions.models import Transaction
+from transactions.outbox import drain
+from voitures.models import Voiture
+from .models import EvenementReservation, Reservation, ReservationHistorique
+
+TAILLE_LOT_DEFAUT = 500
+
+# Colonnes recopiées telles quelles dans l'historique
+COLONNES = (
+    'voiture_id', 'nni', 'nom_client', 'telephone',
+    'date_debut', 'date_fin', 'prix_total', 'created_at',
+)
+
+SUPPRIMER_SQL = f'DELETE FROM {Reservation._meta.db_table} WHERE id IN ({{ids}})'
+
+
+def nettoyer_reservations_expirees(taille_lot=TAILLE_LOT_DEFAUT, maintenant=None):
+    """
+    Archive les réservations terminées dans ReservationHistorique et
+    libère leurs voitures.
+
+    Travaille par lots de `taille_lot` réservations, chaque lot dans sa
+    propre transaction : copie dans l'historique, rattachement des
+    transactions à la réservation archivée, UPDATE ensembliste sur les
+    voitures puis DELETE de la table des réservations actives, sans
+    signaux (une version de table par lot, core/versions.py). Retourne
+    le nombre de réservations archivées.
+
+    Le journal des réservations (transactions/outbox.py) est vidé
+    d'abord, pour que les revenus existent avant d'être rattachés à
+    l'historique ; une réservation dont l'événement arrive entre-temps
+    attend le prochain passage.
+    """
+    maintenant = maintenant or now()
+    drain()
+    using = router.db_for_write(Reservation)
+    total = 0
+    en_attente = EvenementReservation.objects.filter(reservation=OuterRef('pk'))
+
+    while True:
+        with transaction.atomic():
+            lignes = list(
+                Reservation.objects.filter(date_fin__lte=maintenant)
+                .exclude(Exists(en_attente))
+                .order_by('pk')
+                .values('id', *COLONNES, 'voiture__matricule')[:taille_lot]
+            )
+            if not lignes:
+                break
+            ids = [ligne['id'] for ligne in lignes]
+
+            ReservationHistorique.objects.bulk_create(
+                [
+                    ReservationHistorique(
+                        id_origine=ligne['id'],
+                        matricule=ligne['voiture__matricule'],
+                        archivee_le=maintenant,
+                        **{colonne: ligne[colonne] for colonne in COLONNES},
+                    )
+                    for ligne in lignes
+                ]
+            )
+            # Avant le DELETE : la réservation archivée remplace la réservation
+            # (le SET_NULL que delete() aurait fait)
+            archive = ReservationHistorique.objects.filter(
+                id_origine=OuterRef('reservation_id')
+            ).order_by('-pk').values('pk')[:1]
+            Transaction.objects.filter(reservation_id__in=ids).update(
+                reservation_historique_id=Subquery(archive), reservation=None
+            )
+
+            # Libérer les voitures qui n'ont plus de réservation en cours
+            en_cours = Reservation.objects.filter(
+                voiture=OuterRef('pk'), date_fin__gt=maintenant
+            )
+            liberees = Voiture.objects.filter(
+                reservations__pk__in=ids, statut='louee'
+            ).exclude(Exists(en_cours)).update(statut='disponible')
+            if liberees:
+                # update() ne déclenche pas post_save
+                incrementer(Voiture)
+
+            # DELETE direct : delete() chargerait le lot et incrémenterait la
+            # version de la table ligne à ligne (post_delete, core/signals.py)
+            with connections[using].cursor() as cursor:
+                cursor.execute(SUPPRIMER_SQL.format(ids=', '.join(['%s'] * len(ids))), ids)
+            incrementer(Reservation)
+
+        total += len(ids)
+
+    return total
@@ -1,5 +1,8 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import Reservation
+from core.concurrence import reessayer_si_verrouillee
+from core.fast_serializers import FastListSerializer
+from .models import Reservation, ReservationHistorique
 from voitures.serializers import VoitureSerializer
 from voitures.models import Voiture
 
@@ -18,21 +21,22 @@ class ReservationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         voiture = validated_data.pop('voiture_id')
 
-        # 1️⃣ Vérifier si la voiture est disponible
-        if voiture.statut != "disponible":
+        # 1️⃣ Voiture en maintenance : refus immédiat (les dates sont
+        #    vérifiées sous verrou dans Reservation.save())
+        if voiture.statut == "maintenance":
             raise serializers.ValidationError("Cette voiture n'est pas disponible.")
 
-        # 2️⃣ Créer la réservation
+        # 2️⃣ Créer la réservation : la voiture passe à louée dans la même transaction
         reservation = Reservation(**validated_data)
         reservation.voiture = voiture
-        reservation.save()
-
-        # 3️⃣ Marquer la voiture comme louée
-        voiture.statut = "louee"
-        voiture.save()
+        try:
+            reservation.save()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
 
         return reservation
 
+    @reessayer_si_verrouillee
     def update(self, instance, validated_data):
         if 'voiture_id' in validated_data:
             new_voiture = validated_data.pop('voiture_id')
@@ -40,17 +44,14 @@ class ReservationSerializer(serializers.ModelSerializer):
 
             # Si la voiture a changé
             if old_voiture != new_voiture:
-                # 1️⃣ Libérer l'ancienne voiture
-                old_voiture.statut = "disponible"
-                old_voiture.save()
-
-                # 2️⃣ Vérifier que la nouvelle est disponible
-                if new_voiture.statut != "disponible":
+                # 1️⃣ Prendre la nouvelle voiture (verrou ; refus si en maintenance,
+                #    le chevauchement est vérifié par instance.save())
+                if not Voiture.objects.prendre(new_voiture.pk):
                     raise serializers.ValidationError("Cette voiture n'est pas disponible.")
-
-                # 3️⃣ Louer la nouvelle voiture
                 new_voiture.statut = "louee"
-                new_voiture.save()
+
+                # 2️⃣ Libérer l'ancienne voiture
+                Voiture.objects.liberer(old_voiture.pk)
 
             instance.voiture = new_voiture
 
@@ -58,5 +59,41 @@ class ReservationSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        instance.save()
+        try:
+            instance.save()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
         return instance
+
+
+class ReservationHistoriqueSerializer(serializers.ModelSerializer):
+    """Réservation archivée (lecture seule)"""
+
+    class Meta:
+        model = ReservationHistorique
+        fields = "__all__"
+
+
+class DevisSerializer(serializers.Serializer):
+    """Une ligne de POST /api/reservations/quotes/ : demande (écriture) et devis (lecture)"""
+    voiture_id = serializers.IntegerField()
+    date_debut = serializers.DateTimeField()
+    date_fin = serializers.DateTimeField()
+
+    nb_jours = serializers.IntegerField(read_only=True)
+    prix_jour = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True)
+    prix_total = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    disponible = serializers.BooleanField(read_only=True)
+    motif = serializers.CharField(read_only=True)
+
+
+# 🔹 Lecture rapide des listes : la voiture imbriquée est lue par jointure
+#    dans la même requête values() (pas de N+1)
+reservation_list_serializer = FastListSerializer(
+    ReservationSerializer,
+    custom={
+        'voiture': FastListSerializer(VoitureSerializer, prefix='voiture__'),
+    },
+)
+
+reservation_historique_list_serializer = FastListSerializer(ReservationHistoriqueSerializer)
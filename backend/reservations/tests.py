@@ -1,3 +1,467 @@
-from django.test import TestCase
+import sqlite3
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from location_voiture.base_sqlite import profil_production
+from voitures.models import Voiture
+from .devis import VOITURE_INTROUVABLE
+from .models import (
+    DATES_INVERSEES, DEJA_RESERVEE, VOITURE_INDISPONIBLE, Reservation, ReservationHistorique,
+)
+from .nettoyage import nettoyer_reservations_expirees
+
+
+def creer_voiture(matricule, **kwargs):
+    valeurs = {
+        'marque': 'Toyota',
+        'modele': 'Yaris',
+        'prix_jour': Decimal('100.00'),
+        'kilometrage': 10000,
+    }
+    valeurs.update(kwargs)
+    return Voiture.objects.create(matricule=matricule, **valeurs)
+
+
+def creer_reservation(voiture, debut, fin, **kwargs):
+    valeurs = {'nom_client': 'Client Test', 'telephone': '0600000000'}
+    valeurs.update(kwargs)
+    return Reservation.objects.create(
+        voiture=voiture, date_debut=debut, date_fin=fin, **valeurs
+    )
+
+
+class NettoyageReservationsTest(TestCase):
+    """Test de l'expiration planifiée des réservations"""
+
+    def setUp(self):
+        """Une voiture avec réservation expirée, une autre encore louée"""
+        maintenant = timezone.now()
+        self.voiture_expiree = creer_voiture('EX000001')
+        self.voiture_en_cours = creer_voiture('EX000002')
+
+        self.expiree = creer_reservation(
+            self.voiture_expiree,
+            maintenant - timedelta(days=5), maintenant - timedelta(days=2)
+        )
+        creer_reservation(
+            self.voiture_en_cours,
+            maintenant - timedelta(days=9), maintenant - timedelta(days=7)
+        )
+        # Nouvelle réservation sur la même voiture, déjà marquée louée
+        Voiture.objects.filter(pk=self.voiture_en_cours.pk).update(statut='disponible')
+        self.voiture_en_cours.refresh_from_db()
+        self.en_cours = creer_reservation(
+            self.voiture_en_cours,
+            maintenant - timedelta(days=1), maintenant + timedelta(days=2)
+        )
+
+    def test_suppression_et_liberation(self):
+        """Les réservations expirées sont supprimées, les voitures libérées"""
+        total = nettoyer_reservations_expirees(taille_lot=1)
+
+        self.assertEqual(total, 2)
+        self.assertEqual(list(Reservation.objects.all()), [self.en_cours])
+
+        self.voiture_expiree.refresh_from_db()
+        self.voiture_en_cours.refresh_from_db()
+        self.assertEqual(self.voiture_expiree.statut, 'disponible')
+        # Toujours louée : une réservation est en cours
+        self.assertEqual(self.voiture_en_cours.statut, 'louee')
+
+    def test_une_version_par_lot(self):
+        """Un lot : un seul incrément de version, pas de post_delete par ligne"""
+        from core.versions import versions
+
+        avant = versions(Reservation)[0]['reservations.Reservation'][0]
+        with CaptureQueriesContext(connection) as requetes:
+            nettoyer_reservations_expirees(taille_lot=10)
+        apres = versions(Reservation)[0]['reservations.Reservation'][0]
+
+        self.assertEqual(apres, avant + 1)
+        self.assertEqual(
+            sum('"core_tableversion"' in q['sql'] and q['sql'].startswith('UPDATE')
+                for q in requetes.captured_queries),
+            2  # Reservation et Voiture
+        )
+
+    def test_commande(self):
+        """La commande de gestion exécute une passe unique"""
+        sortie = StringIO()
+        call_command('nettoyer_reservations', '--taille-lot', '10', stdout=sortie)
+        self.assertIn('2 réservation(s)', sortie.getvalue())
+        self.assertEqual(Reservation.objects.count(), 1)
+
+
+class ArchivageReservationsTest(APITestCase):
+    """Les réservations terminées passent dans l'historique avec leurs revenus"""
+
+    def setUp(self):
+        maintenant = timezone.now()
+        self.voiture = creer_voiture('AR000001')
+        self.reservation = creer_reservation(
+            self.voiture,
+            maintenant - timedelta(days=4), maintenant - timedelta(days=1),
+            nom_client='Aminetou Sall', nni='1234567890',
+        )
+        self.id_origine = self.reservation.pk
+        nettoyer_reservations_expirees()
+
+    def test_historique_et_transaction(self):
+        from transactions.models import Transaction
+
+        archive = ReservationHistorique.objects.get()
+        self.assertEqual(archive.id_origine, self.id_origine)
+        self.assertEqual(archive.matricule, 'AR000001')
+        self.assertEqual(archive.nom_client, 'Aminetou Sall')
+        self.assertFalse(Reservation.objects.exists())
+
+        revenu = Transaction.objects.get(type='REVENU')
+        self.assertIsNone(revenu.reservation_id)
+        self.assertEqual(revenu.reservation_historique, archive)
+
+        details = self.client.get(f'/api/transactions/{revenu.pk}/').json()
+        self.assertEqual(details['reservation_historique'], archive.pk)
+        self.assertEqual(details['reservation_details']['id'], self.id_origine)
+        self.assertEqual(details['reservation_details']['nom_client'], 'Aminetou Sall')
+
+    def test_recherche_du_revenu_archive(self):
+        """La recherche plein texte trouve toujours le client archivé"""
+        reponse = self.client.get('/api/transactions/', {'search': 'aminetou'})
+        self.assertEqual(len(reponse.json()['results']), 1)
+
+    def test_api_historique(self):
+        autre = creer_voiture('AR000002')
+        maintenant = timezone.now()
+        creer_reservation(
+            autre, maintenant - timedelta(days=3), maintenant - timedelta(days=2),
+            nom_client='Autre Client',
+        )
+        nettoyer_reservations_expirees()
+
+        reponse = self.client.get('/api/reservations/historique/')
+        self.assertEqual(reponse.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(reponse.json()['results']), 2)
+
+        for filtre in ({'client': 'Aminetou Sall'}, {'nni': '1234567890'},
+                       {'voiture': self.voiture.pk}):
+            resultats = self.client.get('/api/reservations/historique/', filtre).json()['results']
+            self.assertEqual([r['id_origine'] for r in resultats], [self.id_origine])
+
+
+class ReservationLectureSansEcritureTest(APITestCase):
+    """Les GET sur les réservations n'écrivent jamais"""
+
+    def test_get_ne_supprime_rien(self):
+        maintenant = timezone.now()
+        voiture = creer_voiture('RO000001')
+        reservation = creer_reservation(
+            voiture, maintenant - timedelta(days=3), maintenant - timedelta(days=1)
+        )
+
+        self.assertEqual(self.client.get('/api/reservations/').status_code, 200)
+        self.assertEqual(
+            self.client.get(f'/api/reservations/{reservation.pk}/').status_code, 200
+        )
+        self.assertTrue(Reservation.objects.filter(pk=reservation.pk).exists())
+
+
+class ReservationFastSerializerTest(TestCase):
+    """La lecture rapide produit le même JSON que ReservationSerializer"""
+
+    def test_json_identique_sans_n_plus_1(self):
+        from rest_framework.renderers import JSONRenderer
+        from .serializers import ReservationSerializer, reservation_list_serializer
+
+        maintenant = timezone.now()
+        for i in range(3):
+            creer_reservation(
+                creer_voiture(f'FR00000{i}'),
+                maintenant + timedelta(days=i), maintenant + timedelta(days=i + 2),
+                nni='123456789' if i else None,
+            )
+        reservations = Reservation.objects.order_by('-id')
+
+        attendu = JSONRenderer().render(
+            ReservationSerializer(reservations, many=True).data
+        )
+        with self.assertNumQueries(1):
+            obtenu = JSONRenderer().render(
+                reservation_list_serializer.serialize(
+                    reservation_list_serializer.values(reservations)
+                )
+            )
+        self.assertEqual(obtenu, attendu)
+
+
+class ReservationAsyncTest(TestCase):
+    """Lectures async : même JSON que les vues @api_view"""
+
+    def setUp(self):
+        debut = timezone.now() - timedelta(days=30)
+        for i in range(3):
+            voiture = creer_voiture(f'RA00000{i}')
+            self.reservation = creer_reservation(
+                voiture, debut + timedelta(days=i), debut + timedelta(days=i + 2)
+            )
+
+    async def test_liste_identique(self):
+        sync = await self.async_client.get('/api/reservations/', {'page_size': 'all'})
+        reponse = await self.async_client.get('/api/reservations/async/', {'page_size': 'all'})
+        self.assertEqual(reponse.content, sync.content)
+
+        page = (await self.async_client.get('/api/reservations/async/', {'page_size': 2})).json()
+        self.assertEqual(page['results'], sync.json()[:2])
+        suite = (await self.async_client.get(page['next'])).json()
+        self.assertEqual(suite['results'], sync.json()[2:])
+        self.assertIsNone(suite['next'])
+
+    async def test_detail(self):
+        url = f'/api/reservations/{self.reservation.pk}/'
+        sync = await self.async_client.get(url)
+        reponse = await self.async_client.get(f'/api/reservations/async/{self.reservation.pk}/')
+        self.assertEqual(reponse.content, sync.content)
+
+        absente = await self.async_client.get('/api/reservations/async/999999/')
+        self.assertEqual(absente.status_code, 404)
+
+
+class ReservationDisponibiliteTest(APITestCase):
+    """La réservation suit la même règle que GET /api/voitures/disponibles/"""
+
+    def setUp(self):
+        self.maintenant = timezone.now()
+        self.voiture = creer_voiture('DS000001')
+        # Réservation lointaine : le statut stocké passe à 'louee'
+        creer_reservation(
+            self.voiture,
+            self.maintenant + timedelta(days=30), self.maintenant + timedelta(days=31)
+        )
+
+    def reserver(self, voiture, debut, fin):
+        return self.client.post('/api/reservations/', {
+            'voiture_id': voiture.pk,
+            'nom_client': 'Client Test',
+            'telephone': '0600000000',
+            'date_debut': debut.isoformat(),
+            'date_fin': fin.isoformat(),
+        }, format='json')
+
+    def test_fenetre_libre_acceptee(self):
+        debut = self.maintenant + timedelta(days=2)
+        fin = self.maintenant + timedelta(days=4)
+        disponibles = self.client.get('/api/voitures/disponibles/', {
+            'debut': debut.isoformat(), 'fin': fin.isoformat(),
+        }).json()['results']
+        self.assertEqual([v['id'] for v in disponibles], [self.voiture.pk])
+
+        self.assertEqual(self.reserver(self.voiture, debut, fin).status_code, status.HTTP_201_CREATED)
+
+    def test_chevauchement_et_maintenance_refuses(self):
+        reponse = self.reserver(
+            self.voiture,
+            self.maintenant + timedelta(days=29), self.maintenant + timedelta(days=30, hours=1)
+        )
+        self.assertEqual(reponse.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(DEJA_RESERVEE, str(reponse.json()))
+
+        en_maintenance = creer_voiture('DS000002', statut='maintenance', prix_jour=None)
+        reponse = self.reserver(
+            en_maintenance, self.maintenant + timedelta(days=2), self.maintenant + timedelta(days=4)
+        )
+        self.assertEqual(reponse.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(VOITURE_INDISPONIBLE, str(reponse.json()))
+
+
+class ReservationQuotesTest(APITestCase):
+    """POST /api/reservations/quotes/ : devis en lot, sans réservation"""
+
+    def setUp(self):
+        self.debut = timezone.now() + timedelta(days=10)
+        self.libre = creer_voiture('QT000001', prix_jour=Decimal('99.95'))
+        self.reservee = creer_voiture('QT000002')
+        creer_reservation(self.reservee, self.debut, self.debut + timedelta(days=2))
+        self.louee = creer_voiture('QT000003')
+        creer_reservation(self.louee, self.debut + timedelta(days=30), self.debut + timedelta(days=31))
+        self.maintenance = creer_voiture('QT000004', statut='maintenance', prix_jour=None)
+
+    def demande(self, voiture_id, debut, fin):
+        return {'voiture_id': voiture_id, 'date_debut': debut.isoformat(), 'date_fin': fin.isoformat()}
+
+    def test_prix_et_disponibilite(self):
+        apres = self.debut + timedelta(days=5)
+        demandes = [
+            self.demande(self.libre.pk, self.debut, self.debut + timedelta(days=2, hours=3)),
+            self.demande(self.reservee.pk, self.debut + timedelta(days=1), self.debut + timedelta(days=3)),
+            self.demande(self.reservee.pk, apres, apres + timedelta(days=1)),
+            self.demande(self.louee.pk, apres, apres + timedelta(days=1)),
+            self.demande(999999, apres, apres + timedelta(days=1)),
+            self.demande(self.libre.pk, apres, self.debut),
+            self.demande(self.maintenance.pk, apres, apres + timedelta(days=1)),
+        ]
+        with self.assertNumQueries(2):
+            response = self.client.post('/api/reservations/quotes/', demandes, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        devis = response.json()
+        self.assertEqual(len(devis), len(demandes))
+        self.assertEqual(
+            [(d['disponible'], d['motif']) for d in devis],
+            [
+                (True, None),
+                (False, DEJA_RESERVEE),
+                (True, None),
+                # Réservée plus tard (statut stocké 'louee') : libre sur cette fenêtre
+                (True, None),
+                (False, VOITURE_INTROUVABLE),
+                (False, DATES_INVERSEES),
+                (False, VOITURE_INDISPONIBLE),
+            ],
+        )
+        self.assertEqual(devis[0]['nb_jours'], 3)
+        self.assertEqual(devis[0]['prix_jour'], '99.95')
+        self.assertEqual(devis[0]['prix_total'], '299.85')
+        self.assertEqual(devis[2]['prix_total'], '200.00')
+        self.assertIsNone(devis[4]['prix_total'])
+
+        # Aucun effet de bord : ni réservation, ni changement de statut
+        self.assertEqual(Reservation.objects.count(), 2)
+        self.libre.refresh_from_db()
+        self.assertEqual(self.libre.statut, 'disponible')
+
+    def test_meme_prix_que_la_reservation(self):
+        fin = self.debut + timedelta(days=4, hours=20)
+        devis = self.client.post('/api/reservations/quotes/', [
+            self.demande(self.libre.pk, self.debut, fin),
+        ], format='json').json()[0]
+
+        reservation = creer_reservation(self.libre, self.debut, fin)
+        self.assertEqual(Decimal(devis['prix_total']), reservation.prix_total)
+
+    def test_corps_invalide(self):
+        for corps in ([], {'voiture_id': self.libre.pk}, [{'voiture_id': self.libre.pk}]):
+            response = self.client.post('/api/reservations/quotes/', corps, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, corps)
+
+
+# Thread du journal coupé : il ouvrirait sa propre connexion sur la base
+# de test en mémoire, et non sur la base fichier du test
+@override_settings(TRANSACTIONS_OUTBOX_WORKER=False)
+class ReservationConcurrenteTest(TransactionTestCase):
+    """Réservations simultanées : jamais deux réservations pour une voiture"""
+
+    def base_fichier(self):
+        """
+        Copie de la base de test dans un fichier, ouverte avec le profil de
+        production (WAL, busy timeout, BEGIN IMMEDIATE) et une isolation
+        normale. La base de test en mémoire partage son cache entre les
+        fils : verrous de table sans attente, et lectures non validées
+        (read_uncommitted) pour les contourner, ce qui rendrait le test
+        aveugle aux doubles réservations. Comme stress_reservations.
+
+        Retourne une fonction qui branche l'alias 'default' du fil courant
+        sur cette base (une connexion par fil).
+        """
+        dossier = tempfile.TemporaryDirectory(prefix='reservations_concurrentes_')
+        self.addCleanup(dossier.cleanup)
+        chemin = Path(dossier.name) / 'concurrence.sqlite3'
+
+        connection.ensure_connection()
+        copie = sqlite3.connect(chemin)
+        connection.connection.backup(copie)
+        copie.close()
+
+        reglages = {
+            **connection.settings_dict,
+            **profil_production(chemin, conn_max_age=0)['default'],
+        }
+        enveloppe = type(connections['default'])
+
+        def brancher():
+            connections['default'] = enveloppe(reglages, 'default')
+
+        memoire = connections['default']
+
+        def restaurer():
+            connections['default'].close()
+            connections['default'] = memoire
+        brancher()
+        self.addCleanup(restaurer)
+        return brancher
+
+    def test_aucune_double_reservation(self):
+        brancher = self.base_fichier()
+        with connection.cursor() as curseur:
+            curseur.execute('PRAGMA journal_mode')
+            self.assertEqual(curseur.fetchone()[0], 'wal')
+            curseur.execute('PRAGMA read_uncommitted')
+            self.assertEqual(curseur.fetchone()[0], 0)
+
+        voitures = [creer_voiture(f'CC00000{i}') for i in range(3)]
+        debut = timezone.now() + timedelta(days=1)
+        nb_fils = 12
+        depart = threading.Barrier(nb_fils)
+        statuts = []
+
+        def reserver(i):
+            voiture = voitures[i % len(voitures)]
+            client = Client()
+            brancher()
+            try:
+                depart.wait()
+                reponse = client.post('/api/reservations/', {
+                    'voiture_id': voiture.pk,
+                    'nom_client': f'Client {i}',
+                    'telephone': '0600000000',
+                    'date_debut': debut.isoformat(),
+                    'date_fin': (debut + timedelta(days=2)).isoformat(),
+                }, content_type='application/json')
+                statuts.append(reponse.status_code)
+            finally:
+                connection.close()
+
+        fils = [threading.Thread(target=reserver, args=(i,)) for i in range(nb_fils)]
+        for f in fils:
+            f.start()
+        for f in fils:
+            f.join()
+
+        self.assertEqual(statuts.count(201), len(voitures))
+        self.assertEqual(statuts.count(400), nb_fils - len(voitures))
+        for voiture in voitures:
+            self.assertEqual(Reservation.objects.filter(voiture=voiture).count(), 1)
+            voiture.refresh_from_db()
+            self.assertEqual(voiture.statut, 'louee')
+
+    def test_changement_de_voiture(self):
+        """PUT vers une voiture déjà prise : refusé, l'ancienne reste louée"""
+        debut = timezone.now() + timedelta(days=1)
+        prise = creer_voiture('CC100001')
+        creer_reservation(prise, debut, debut + timedelta(days=1))
+        autre = creer_voiture('CC100002')
+        reservation = creer_reservation(autre, debut, debut + timedelta(days=1))
+
+        reponse = Client().put(f'/api/reservations/{reservation.pk}/', {
+            'voiture_id': prise.pk,
+            'nom_client': 'Client Test',
+            'telephone': '0600000000',
+            'date_debut': debut.isoformat(),
+            'date_fin': (debut + timedelta(days=1)).isoformat(),
+        }, content_type='application/json')
+
+        self.assertEqual(reponse.status_code, 400)
+        autre.refresh_from_db()
+        self.assertEqual(autre.statut, 'louee')
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.voiture_id, autre.pk)
@@ -1,7 +1,13 @@
 from django.urls import path
-from .views import reservation_list_api, reservation_detail_api
+from .views import reservation_list_api, reservation_detail_api, reservation_quotes_api, reservation_historique_api
+from .async_views import reservation_list_async, reservation_detail_async
 
 urlpatterns = [
     path('', reservation_list_api),
+    path('quotes/', reservation_quotes_api),
+    path('historique/', reservation_historique_api),
     path('<int:pk>/', reservation_detail_api),
+    # Lectures async (ASGI)
+    path('async/', reservation_list_async),
+    path('async/<int:pk>/', reservation_detail_async),
 ]
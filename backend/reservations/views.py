@@ -2,31 +2,27 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from django.utils.timezone import now
 
-from .models import Reservation
-from .serializers import ReservationSerializer
+from core.pagination import paginer
+from core.versions import liste_conditionnelle
+from voitures.models import Voiture
+from .models import Reservation, ReservationHistorique
+from .devis import MAX_DEVIS, deviser
+from .serializers import (
+    DevisSerializer, ReservationSerializer,
+    reservation_historique_list_serializer, reservation_list_serializer,
+)
 
-# 🔹 Nettoyage des réservations expirées
-def nettoyer_reservations_expirees():
-    current_time = now()
-    reservations_expirees = Reservation.objects.filter(date_fin__lte=current_time)
-
-    for r in reservations_expirees:
-        voiture = r.voiture
-        voiture.statut = "disponible"  # libérer la voiture
-        voiture.save()
-        r.delete()
+# 🔹 L'archivage des réservations terminées est une tâche planifiée :
+#    python manage.py nettoyer_reservations (voir reservations/nettoyage.py)
 
 
+@liste_conditionnelle(Reservation, Voiture)
 @api_view(['GET', 'POST'])
 def reservation_list_api(request):
-    nettoyer_reservations_expirees()
-
     if request.method == 'GET':
-        reservations = Reservation.objects.all().order_by('-id')
-        serializer = ReservationSerializer(reservations, many=True)
-        return Response(serializer.data)
+        reservations = Reservation.objects.all()
+        return paginer(request, reservations, reservation_list_serializer, ordering='-id')
 
     if request.method == 'POST':
         serializer = ReservationSerializer(data=request.data)
@@ -37,9 +33,46 @@ def reservation_list_api(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+def reservation_quotes_api(request):
+    """
+    POST /api/reservations/quotes/
+
+    Corps : liste de {voiture_id, date_debut, date_fin} (500 au plus).
+    Renvoie pour chacune nb_jours, prix_jour, prix_total, disponible et
+    motif, sans rien réserver.
+    """
+    serializer = DevisSerializer(
+        data=request.data, many=True, allow_empty=False, max_length=MAX_DEVIS
+    )
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    devis = deviser(serializer.validated_data)
+    return Response(DevisSerializer(devis, many=True).data)
+
+
+@api_view(['GET'])
+def reservation_historique_api(request):
+    """
+    GET /api/reservations/historique/?client=<nom>&nni=<nni>&voiture=<id>
+
+    Réservations terminées et archivées, plus récentes d'abord (pagination
+    par curseur). Les filtres sont exacts et servis par les index de
+    l'historique.
+    """
+    historique = ReservationHistorique.objects.all()
+    if request.query_params.get('client'):
+        historique = historique.filter(nom_client=request.query_params['client'])
+    if request.query_params.get('nni'):
+        historique = historique.filter(nni=request.query_params['nni'])
+    if request.query_params.get('voiture', '').isdigit():
+        historique = historique.filter(voiture_id=int(request.query_params['voiture']))
+    return paginer(request, historique, reservation_historique_list_serializer, ordering='-id')
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
 def reservation_detail_api(request, pk):
-    nettoyer_reservations_expirees()
     reservation = get_object_or_404(Reservation, pk=pk)
 
     if request.method == 'GET':
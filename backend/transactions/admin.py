@@ -1,6 +1,39 @@
 from django.contrib import admin
-from django.db.models import Sum, Q
-from .models import Transaction
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from . import archive
+from . import cache as analytics_cache
+from . import search
+from .models import DailyFinancialRollup, Transaction
+from .queries import TOTALS, format_totals
+
+
+def ledger_summary():
+    """
+    Ledger totals from the daily rollup, shared with the cached
+    /transactions/summary/ response (same analytics cache entry).
+    """
+    def compute():
+        totals = DailyFinancialRollup.objects.aggregate(**TOTALS)
+        return {**format_totals(totals), 'currency': 'MRU'}
+    
+    return analytics_cache.get_or_compute('summary', {}, compute)
+
+
+class LedgerPaginator(Paginator):
+    """
+    Changelist paginator that avoids COUNT(*) over the whole ledger.
+    
+    The unfiltered list takes its row count from the cached rollup totals,
+    less the archived transactions (the rollup still counts them);
+    filtered or searched lists still count their (narrower) result exactly.
+    """
+    
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return ledger_summary()['transaction_count'] - archive.archived_count()
+        return super().count
 
 
 @admin.register(Transaction)
@@ -19,11 +52,14 @@ class TransactionAdmin(admin.ModelAdmin):
         'date_formatted',
     )
     
+    # Joined in the changelist query for reservation_link / voiture_link
+    list_select_related = ('reservation', 'reservation_historique', 'voiture')
+    
+    # No per-vehicle filter: it lists every car. Search by matricule instead.
     list_filter = (
         'type',
         'categorie',
         'date',
-        'voiture',
     )
     
     search_fields = (
@@ -32,11 +68,18 @@ class TransactionAdmin(admin.ModelAdmin):
         'voiture__matricule',
     )
     
+    autocomplete_fields = ('reservation', 'voiture')
+    
+    paginator = LedgerPaginator
+    # Skip the second COUNT(*) of the unfiltered ledger on filtered pages
+    show_full_result_count = False
+    
     readonly_fields = (
         'id',
         'date',
         'created_at',
         'updated_at',
+        'reservation_historique',
         'type_display',
         'categorie_display',
         'reservation_details',
@@ -63,6 +106,7 @@ class TransactionAdmin(admin.ModelAdmin):
         ('Related Objects', {
             'fields': (
                 'reservation',
+                'reservation_historique',
                 'reservation_details',
                 'voiture',
                 'voiture_details',
@@ -81,10 +125,37 @@ class TransactionAdmin(admin.ModelAdmin):
             ),
             'classes': ('collapse',)
         }),
+        ('Summary', {
+            'fields': ('financial_summary',),
+            'classes': ('collapse',)
+        }),
     )
     
+    # No date_hierarchy: its year/month links run a DISTINCT scan of the
+    # filtered ledger on every page. The 'date' list filter covers it.
     ordering = ('-date',)
-    date_hierarchy = 'date'
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Answer the changelist search from the FTS5 index (see
+        transactions/search.py), most relevant first unless a column
+        ordering is selected.
+        """
+        columns = search.columns_for(self.search_fields)
+        if columns is None or not search.is_available(queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+        
+        if search.match_expression([search_term], columns) is None:
+            return queryset, False
+        
+        request._search_ranked = True
+        return search.search(queryset, [search_term], columns, rank=True), False
+    
+    def get_ordering(self, request):
+        """Order search results by relevance when no column is sorted."""
+        if getattr(request, '_search_ranked', False) and 'o' not in request.GET:
+            return ('rank',)
+        return super().get_ordering(request)
     
     def montant_display(self, obj):
         """Display montant with currency and formatting"""
@@ -111,6 +182,8 @@ class TransactionAdmin(admin.ModelAdmin):
         """Display reservation with client name"""
         if obj.reservation:
             return f"{obj.reservation.nom_client}"
+        if obj.reservation_historique:
+            return f"{obj.reservation_historique.nom_client} (archived)"
         return '—'
     reservation_link.short_description = 'Reservation'
     
@@ -130,6 +203,13 @@ class TransactionAdmin(admin.ModelAdmin):
             Vehicle: {res.voiture.matricule}
             Price: {res.prix_total} DA
             """
+        if obj.reservation_historique:
+            res = obj.reservation_historique
+            return f"""
+            Client: {res.nom_client} (archived)
+            Vehicle: {res.matricule}
+            Price: {res.prix_total} DA
+            """
         return 'Not linked'
     reservation_details.short_description = 'Reservation Details'
     
@@ -146,22 +226,16 @@ class TransactionAdmin(admin.ModelAdmin):
     voiture_details.short_description = 'Vehicle Details'
     
     def financial_summary(self, obj):
-        """Display financial summary"""
-        total_revenu = Transaction.objects.filter(type='REVENU').aggregate(
-            total=Sum('montant')
-        )['total'] or 0
-        total_depense = Transaction.objects.filter(type='DEPENSE').aggregate(
-            total=Sum('montant')
-        )['total'] or 0
-        profit = total_revenu - total_depense
+        """Display financial summary (cached rollup totals)"""
+        summary = ledger_summary()
         
         return f"""
-        Total Revenue: {total_revenu} DA
-        Total Expenses: {total_depense} DA
-        Net Profit: {profit} DA
+        Total Revenue: {summary['total_revenu']:.2f} DA
+        Total Expenses: {summary['total_depense']:.2f} DA
+        Net Profit: {summary['profit']:.2f} DA
         """
     financial_summary.short_description = 'Financial Summary'
     
-    def has_delete_permission(self, request):
+    def has_delete_permission(self, request, obj=None):
         """Only superusers can delete transactions"""
         return request.user.is_superuser
@@ -0,0 +1,155 @@
+"""
+Archival of closed months of the transaction ledger.
+
+`manage.py archive_transactions --through YYYY-MM` moves the transactions
+of every month up to YYYY-MM from Transaction to TransactionArchive, in
+batches, and records the months in ClosedPeriod. Day-to-day reads then
+scan a ledger holding only the open months.
+
+Reads are routed by their date filter (ledger_model):
+- date_from on or after the cutoff (the month after the latest closed
+  one), or nothing archived yet: Transaction only;
+- no date filter, or a range reaching a closed month: LedgerEntry, the
+  UNION ALL view of both tables. Lists, exports and by-voiture rows then
+  cover the same months as the rollup-based totals next to them.
+
+What stays in the ledger:
+- transactions still linked to a live reservation, which the outbox may
+  update (they move once reservations/nettoyage.py has archived it);
+- the highest id: SQLite hands out max(id) + 1, so keeping it stops an
+  archived id from being reused.
+
+The rows are moved without delete signals: DailyFinancialRollup keeps the
+archived amounts, so summaries and monthly stats are unchanged, and their
+FTS entries are restored so ?search= still finds them.
+"""
+from datetime import date
+
+from django.db import connections, router
+from django.db import transaction as db_transaction
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from . import cache as analytics_cache
+from .models import ClosedPeriod, LedgerEntry, Transaction, TransactionArchive
+from .queries import date_param, day_start
+from .search import FTS_TABLE, is_available
+
+DEFAULT_BATCH_SIZE = 1000
+
+ARCHIVE_COLUMNS = (
+    'id', 'type', 'categorie', 'montant', 'description',
+    'reservation_id', 'reservation_historique_id', 'voiture_id',
+    'date', 'created_at', 'updated_at',
+)
+
+DELETE_MOVED_SQL = f"DELETE FROM {Transaction._meta.db_table} WHERE id IN ({{ids}})"
+
+# Same document as the FTS insert trigger of the ledger
+INDEX_ARCHIVED_SQL = f"""
+    INSERT INTO {FTS_TABLE} (rowid, description, nom_client, matricule)
+    SELECT a.id, a.description, h.nom_client, v.matricule
+    FROM transactions_transactionarchive a
+    LEFT JOIN reservations_reservationhistorique h ON h.id = a.reservation_historique_id
+    LEFT JOIN voitures_voiture v ON v.id = a.voiture_id
+    WHERE a.id IN ({{ids}})
+"""
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def cutoff_from(latest):
+    """Cutoff for the latest closed month (None when nothing is archived)."""
+    return next_month(latest) if latest else None
+
+
+def cutoff():
+    """First day of the oldest open month, or None."""
+    return cutoff_from(ClosedPeriod.objects.aggregate(latest=Max('month'))['latest'])
+
+
+async def acutoff():
+    latest = (await ClosedPeriod.objects.aaggregate(latest=Max('month')))['latest']
+    return cutoff_from(latest)
+
+
+def date_range(params):
+    """(date_from, date_to) of the query parameters (None when absent)."""
+    return date_param(params, 'date_from'), date_param(params, 'date_to')
+
+
+def reaches_archive(range_, cutoff):
+    """Does a (date_from, date_to) range start before `cutoff`?"""
+    from_date, _ = range_
+    return cutoff is not None and (from_date is None or from_date < cutoff)
+
+
+def ledger_model(params):
+    """Transaction, or LedgerEntry when the read may reach a closed month."""
+    if reaches_archive(date_range(params), cutoff()):
+        return LedgerEntry
+    return Transaction
+
+
+async def aledger_model(params):
+    if reaches_archive(date_range(params), await acutoff()):
+        return LedgerEntry
+    return Transaction
+
+
+def archived_count():
+    """Transactions in the archive, from ClosedPeriod (no COUNT(*))."""
+    return ClosedPeriod.objects.aggregate(n=Sum('transaction_count'))['n'] or 0
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def close_months(through, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move the transactions dated up to the end of month `through` (a date)
+    to the archive and close those months. Returns the number moved.
+    """
+    through = month_start(through)
+    end = day_start(next_month(through))
+    newest = Transaction.objects.aggregate(newest=Max('id'))['newest']
+    using = router.db_for_write(Transaction)
+    candidates = Transaction.objects.filter(
+        date__lt=end, reservation__isnull=True
+    ).exclude(id=newest).order_by('id')
+
+    total = 0
+    while True:
+        with db_transaction.atomic():
+            rows = list(candidates.values(*ARCHIVE_COLUMNS)[:batch_size])
+            if not rows:
+                break
+            ids = [row['id'] for row in rows]
+
+            TransactionArchive.objects.bulk_create(TransactionArchive(**row) for row in rows)
+            # Plain DELETE, no delete signals: the rollup keeps the archived amounts
+            placeholders = ', '.join(['%s'] * len(ids))
+            with connections[using].cursor() as cursor:
+                cursor.execute(DELETE_MOVED_SQL.format(ids=placeholders), ids)
+                if is_available(using):
+                    cursor.execute(INDEX_ARCHIVED_SQL.format(ids=placeholders), ids)
+
+            counts = {}
+            for row in rows:
+                month = month_start(timezone.localdate(row['date']))
+                counts[month] = counts.get(month, 0) + 1
+            for month, count in counts.items():
+                period, _ = ClosedPeriod.objects.get_or_create(month=month)
+                ClosedPeriod.objects.filter(pk=period.pk).update(
+                    transaction_count=F('transaction_count') + count
+                )
+        total += len(rows)
+
+    # The cutoff moves even when the month had nothing left to archive
+    ClosedPeriod.objects.get_or_create(month=through)
+    # Hot-only results (e.g. cached by-voiture lists) have changed
+    analytics_cache.bump_generation()
+    return total
@@ -0,0 +1,96 @@
+"""
+Async (ASGI) read endpoints for transactions.
+
+Same payloads as the TransactionViewSet list / summary / monthly-stats /
+by-voiture actions, served through the async ORM (aiterator, acount,
+aaggregate) so a single worker can multiplex many slow clients without
+a thread per request. Analytics responses share the sync cache entries.
+"""
+from django.views.decorators.http import require_GET
+
+from core.async_api import apaginer, reponse_json
+from . import archive
+from . import cache as analytics_cache
+from .models import DailyFinancialRollup
+from .queries import TOTALS, filter_rollups, filter_transactions, format_month, format_totals, monthly_rows
+from .serializers import transaction_list_serializer
+
+# Same stable order as TransactionViewSet.ordering
+ORDERING = ('-date', '-id')
+
+
+def _rollups(request):
+    return filter_rollups(DailyFinancialRollup.objects.all(), request.GET)
+
+
+@require_GET
+async def transaction_list_async(request):
+    """GET /transactions/async/ - filtered, keyset-paginated list."""
+    model = await archive.aledger_model(request.GET)
+    queryset = filter_transactions(model.objects.all(), request.GET)
+    return await apaginer(request, queryset, transaction_list_serializer, ordering=ORDERING)
+
+
+@require_GET
+async def summary_async(request):
+    """GET /transactions/async/summary/"""
+    async def compute():
+        totals = await _rollups(request).aaggregate(**TOTALS)
+        return {**format_totals(totals), 'currency': 'MRU'}
+
+    return reponse_json(
+        await analytics_cache.aget_or_compute('summary', request.GET, compute)
+    )
+
+
+@require_GET
+async def monthly_stats_async(request):
+    """GET /transactions/async/monthly-stats/"""
+    async def compute():
+        return {
+            'monthly_stats': [
+                format_month(item) async for item in monthly_rows(_rollups(request))
+            ],
+            'currency': 'MRU',
+        }
+
+    return reponse_json(
+        await analytics_cache.aget_or_compute('monthly-stats', request.GET, compute)
+    )
+
+
+@require_GET
+async def by_voiture_async(request, voiture_id):
+    """GET /transactions/async/by-voiture/{voiture_id}/"""
+    # URL parameter kept as text, like the sync action (same payload and cache key)
+    voiture_id = str(voiture_id)
+
+    async def compute():
+        model = await archive.aledger_model(request.GET)
+        queryset = filter_transactions(model.objects.all(), request.GET).filter(
+            voiture_id=voiture_id
+        ).order_by(*ORDERING)
+
+        if not await queryset.aexists():
+            return None
+
+        rows = transaction_list_serializer.values(queryset)
+        totals = await _rollups(request).filter(voiture_id=voiture_id).aaggregate(**TOTALS)
+
+        return {
+            'voiture_id': voiture_id,
+            'transactions': transaction_list_serializer.serialize(
+                [row async for row in rows.aiterator()]
+            ),
+            'summary': format_totals(totals),
+        }
+
+    data = await analytics_cache.aget_or_compute(
+        'by-voiture', request.GET, compute, voiture_id,
+        *await analytics_cache.adetail_versions()
+    )
+    if data is None:
+        return reponse_json(
+            {'detail': 'No transactions found for this vehicle.'}, status=404
+        )
+    return reponse_json(data)
@@ -0,0 +1,215 @@
+"""
+Bulk import of transactions (CSV or JSON).
+
+All rows are validated in one pass against the same business rules as
+TransactionSerializer.validate() / Transaction.clean(). Related vehicles
+and reservations are checked with one query each instead of one per row,
+and valid rows are inserted with bulk_create in batches inside a single
+database transaction.
+"""
+import csv
+import io
+
+from django.db import transaction as db_transaction
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from reservations.models import Reservation
+from voitures.models import Voiture
+from . import rollups
+from .models import Transaction
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+
+TYPES = dict(Transaction.TYPE_CHOICES)
+CATEGORIES = dict(Transaction.CATEGORIE_CHOICES)
+
+
+class CSVParser(BaseParser):
+    """Parse a text/csv request body into a list of row dicts."""
+
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        return read_csv(stream.read(), encoding)
+
+
+def read_csv(content, encoding='utf-8'):
+    """
+    Read CSV bytes (header row + data rows) into a list of dicts.
+
+    Undecodable or malformed content raises ParseError (400) rather than
+    failing the request with a 500.
+    """
+    try:
+        text = content.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        raise ParseError(f'CSV content is not valid {encoding} text.')
+    try:
+        return list(csv.DictReader(io.StringIO(text.lstrip('\ufeff'))))
+    except csv.Error as exc:
+        raise ParseError(f'Malformed CSV: {exc}')
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _text(value):
+    """
+    A text cell as a stripped string (None when blank). JSON numbers are
+    read as their text; booleans, objects and arrays are a row error.
+    """
+    if _blank(value):
+        return None
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise serializers.ValidationError('Expected a string.')
+    return str(value).strip()
+
+
+def _parse_id(value):
+    if _blank(value):
+        return None
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise serializers.ValidationError('Invalid pk - must be an integer.')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError('Invalid pk - must be an integer.')
+
+
+class TransactionImporter:
+    """
+    Validate and insert a batch of raw transaction rows.
+
+    Usage:
+        importer = TransactionImporter(rows, batch_size=1000)
+        importer.run()
+        importer.created, importer.errors
+    """
+
+    def __init__(self, rows, batch_size=DEFAULT_BATCH_SIZE):
+        self.rows = rows
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.created = []
+        self.errors = []
+        # DRF field reused for amount parsing (max_digits / decimal_places)
+        self.montant_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+    def clean_row(self, row):
+        """Return (values, errors) for one raw row."""
+        values = {}
+        errors = {}
+
+        # Type and category: choices, matched case-insensitively
+        for field, choices, required in (('type', TYPES, True), ('categorie', CATEGORIES, False)):
+            try:
+                value = _text(row.get(field))
+            except serializers.ValidationError as e:
+                errors[field] = list(e.detail)
+                value = None
+            else:
+                value = value.upper() if value is not None else None
+                if (value is not None or required) and value not in choices:
+                    errors[field] = [f'"{row.get(field)}" is not a valid choice.']
+            values[field] = value
+        type_val = values['type'] or ''
+        categorie_val = values['categorie']
+
+        # Amount
+        try:
+            montant = self.montant_field.run_validation(row.get('montant'))
+            if montant <= 0:
+                raise serializers.ValidationError('Amount must be positive.')
+            values['montant'] = montant
+        except serializers.ValidationError as e:
+            errors['montant'] = list(e.detail)
+
+        description = row.get('description')
+        if _blank(description):
+            values['description'] = None
+        elif isinstance(description, str):
+            values['description'] = description
+        else:
+            try:
+                values['description'] = _text(description)
+            except serializers.ValidationError as e:
+                errors['description'] = list(e.detail)
+
+        # Related objects (existence checked in bulk afterwards)
+        for field in ('voiture', 'reservation'):
+            try:
+                values[f'{field}_id'] = _parse_id(row.get(field))
+            except serializers.ValidationError as e:
+                errors[field] = list(e.detail)
+
+        # Business rules (same as TransactionSerializer.validate)
+        if 'type' not in errors and 'categorie' not in errors:
+            if type_val == 'REVENU' and categorie_val is not None:
+                errors['categorie'] = ['Category must be null for REVENU type.']
+            elif type_val == 'DEPENSE' and not categorie_val:
+                errors['categorie'] = ['Category is required for DEPENSE type.']
+
+        if values.get('reservation_id') and type_val != 'REVENU':
+            errors.setdefault('type', []).append(
+                'Transactions linked to reservations must be REVENU type.'
+            )
+
+        return values, errors
+
+    def validate(self):
+        """Validate every row; return the list of (row_number, values) that passed."""
+        cleaned = []
+        for number, row in enumerate(self.rows, start=1):
+            if not isinstance(row, dict):
+                self.errors.append({'row': number, 'errors': {'non_field_errors': ['Expected an object.']}})
+                continue
+            values, errors = self.clean_row(row)
+            if errors:
+                self.errors.append({'row': number, 'errors': errors})
+            else:
+                cleaned.append((number, values))
+
+        # One query per related table for the whole file
+        voiture_ids = {v['voiture_id'] for _, v in cleaned if v['voiture_id']}
+        reservation_ids = {v['reservation_id'] for _, v in cleaned if v['reservation_id']}
+        known_voitures = set(
+            Voiture.objects.filter(pk__in=voiture_ids).values_list('pk', flat=True)
+        )
+        known_reservations = set(
+            Reservation.objects.filter(pk__in=reservation_ids).values_list('pk', flat=True)
+        )
+
+        valid = []
+        for number, values in cleaned:
+            errors = {}
+            if values['voiture_id'] and values['voiture_id'] not in known_voitures:
+                errors['voiture'] = [f'Invalid pk "{values["voiture_id"]}" - object does not exist.']
+            if values['reservation_id'] and values['reservation_id'] not in known_reservations:
+                errors['reservation'] = [f'Invalid pk "{values["reservation_id"]}" - object does not exist.']
+            if errors:
+                self.errors.append({'row': number, 'errors': errors})
+            else:
+                valid.append(values)
+
+        self.errors.sort(key=lambda error: error['row'])
+        return valid
+
+    def run(self):
+        """Validate all rows, then insert the valid ones in one transaction."""
+        valid = self.validate()
+        if not valid:
+            return self.created
+
+        with db_transaction.atomic():
+            self.created = Transaction.objects.bulk_create(
+                [Transaction(**values) for values in valid],
+                batch_size=self.batch_size,
+            )
+            # bulk_create bypasses signals: update the rollup in one pass
+            rollups.record_transactions(self.created)
+
+        return self.created
@@ -0,0 +1,213 @@
+"""
+Response cache for the transaction analytics actions.
+
+Entries are keyed by action name and the normalized filter parameters,
+prefixed with a generation counter. Any committed Transaction write
+bumps the generation, which makes every older entry unreachable at once;
+entries that embed car or reservation details also carry the versions
+of those tables (detail_versions()). The unreachable entries then age out
+of the bounded LRU cache backend (`CACHES['analytics']`).
+
+Rollup writes also bump a generation per touched month (bump_months()):
+entries derived from one closed month (voitures/utilisation.py) key on
+it instead of the global generation, so a write today does not evict
+last year's figures.
+
+A cold key is recomputed by a single caller: the first one takes a short
+lock with `cache.add()`, the others poll for its result. With the default
+LocMemCache this holds per process; point the `analytics` alias at a
+shared backend (Redis, Memcached) to extend it across workers.
+"""
+import asyncio
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction as db_transaction
+
+from core.models import TableVersion
+from core.versions import cle
+from reservations.models import Reservation
+from voitures.models import Voiture
+
+CACHE_ALIAS = 'analytics'
+KEY_PREFIX = 'transactions:analytics'
+GENERATION_KEY = f'{KEY_PREFIX}:generation'
+MONTH_KEY = KEY_PREFIX + ':month:{:%Y-%m}'
+
+FILTER_PARAMS = ('type', 'categorie', 'voiture', 'date_from', 'date_to')
+
+# Tables whose details some entries embed (by-voiture lists)
+DETAIL_TABLES = (cle(Reservation), cle(Voiture))
+
+LOCK_TIMEOUT = 30
+POLL_INTERVAL = 0.05
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def generations(keys):
+    """
+    {key: counter} for generation counters stored in the cache, starting
+    a new one for each counter that was evicted. One get_many when all
+    are present.
+    """
+    cache = get_cache()
+    values = cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        # Time-based start so an evicted counter never revives old entries
+        start = time.time_ns()
+        for key in missing:
+            cache.add(key, start, timeout=None)
+        values.update(cache.get_many(missing))
+    return values
+
+
+def bump(keys):
+    """Increment the generation counters `keys` once the current transaction commits."""
+    keys = list(keys)
+    if keys:
+        db_transaction.on_commit(lambda: _bump(keys))
+
+
+def _bump(keys):
+    cache = get_cache()
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def current_generation():
+    """Return the current generation, starting a new one if it was evicted."""
+    return generations([GENERATION_KEY])[GENERATION_KEY]
+
+
+def bump_generation():
+    """
+    Invalidate every cached analytics response once the current database
+    transaction commits (immediately outside one).
+
+    Bumping inside the writer's transaction would let a concurrent reader
+    cache a result computed before the commit under the new generation.
+    """
+    db_transaction.on_commit(_bump_generation)
+
+
+def _bump_generation():
+    _bump([GENERATION_KEY])
+
+
+def month_keys(months):
+    """Generation counter keys of the months of `months` (dates, any day)."""
+    return list(dict.fromkeys(MONTH_KEY.format(month) for month in months))
+
+
+def bump_months(days):
+    """Invalidate the entries of the months of `days` once the transaction commits."""
+    bump(month_keys(days))
+
+
+def _detail_versions():
+    return TableVersion.objects.filter(table__in=DETAIL_TABLES).order_by(
+        'table'
+    ).values_list('table', 'version')
+
+
+def detail_versions():
+    """
+    Versions of the Voiture and Reservation tables (core/versions.py), as
+    key parts for entries that embed car or reservation details: writes
+    to those tables do not bump the generation. One query.
+    """
+    return list(_detail_versions())
+
+
+async def adetail_versions():
+    return [row async for row in _detail_versions()]
+
+
+def make_key(action, params, *extra):
+    """Build a cache key from the action and its normalized filters."""
+    normalized = '&'.join(
+        f'{name}={params[name].strip()}'
+        for name in FILTER_PARAMS
+        if params.get(name, '').strip()
+    )
+    digest = hashlib.sha1(
+        '|'.join([normalized, *map(str, extra)]).encode()
+    ).hexdigest()
+    return f'{KEY_PREFIX}:{current_generation()}:{action}:{digest}'
+
+
+def get_or_compute(action, params, compute, *extra):
+    """
+    Return the cached value for (action, params, extra) or compute it.
+
+    `compute` returning None is not cached (e.g. a 404 result).
+    """
+    cache = get_cache()
+    key = make_key(action, params, *extra)
+
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while not cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+        # Another caller is computing this key: wait for its result
+        time.sleep(POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if time.monotonic() > deadline:
+            break
+
+    try:
+        value = compute()
+        if value is not None:
+            cache.set(key, value)
+    finally:
+        cache.delete(lock_key)
+
+    return value
+
+
+async def aget_or_compute(action, params, compute, *extra):
+    """
+    Async variant of get_or_compute() for the ASGI views; `compute` is a
+    coroutine function. Entries are shared with the sync views.
+
+    Cache calls stay synchronous: the in-memory backend never blocks, and
+    its a*() methods would only add a thread-pool hop.
+    """
+    cache = get_cache()
+    key = make_key(action, params, *extra)
+
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while not cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+        await asyncio.sleep(POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if time.monotonic() > deadline:
+            break
+
+    try:
+        value = await compute()
+        if value is not None:
+            cache.set(key, value)
+    finally:
+        cache.delete(lock_key)
+
+    return value
@@ -0,0 +1,90 @@
+"""
+Streaming export of the transaction ledger (CSV / NDJSON).
+
+Rows are read with values_list() over QuerySet.iterator(chunk_size=...),
+so neither model instances nor serializer output are ever built and
+memory stays constant whatever the size of the ledger.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import Coalesce
+from rest_framework.renderers import BaseRenderer
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# (column name, ORM lookup)
+EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('type', 'type'),
+    ('categorie', 'categorie'),
+    ('montant', 'montant'),
+    ('description', 'description'),
+    ('date', 'date'),
+    ('reservation', 'reservation_id'),
+    # Archived reservations keep their client name in the history table
+    ('nom_client', Coalesce('reservation__nom_client', 'reservation_historique__nom_client')),
+    ('voiture', 'voiture_id'),
+    ('matricule', 'voiture__matricule'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+)
+
+
+class CSVRenderer(BaseRenderer):
+    """Selects the CSV export via ?format=csv (error payloads as JSON)."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Selects the NDJSON export via ?format=ndjson."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode() + b'\n'
+
+
+class _Echo:
+    """File-like object whose write() returns the value (csv.writer target)."""
+
+    def write(self, value):
+        return value
+
+
+def _format(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _rows(queryset, chunk_size):
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    return queryset.values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def iter_csv(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the ledger as CSV lines, header first."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in _rows(queryset, chunk_size):
+        yield writer.writerow([_format(value) for value in row])
+
+
+def iter_ndjson(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the ledger as one JSON object per line."""
+    names = [name for name, _ in EXPORT_COLUMNS]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in _rows(queryset, chunk_size):
+        yield encoder.encode(dict(zip(names, row))) + '\n'
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from transactions.archive import DEFAULT_BATCH_SIZE, close_months
+
+
+class Command(BaseCommand):
+    help = "Close the months up to --through and move their transactions to the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--through', required=True,
+            help="Last month to close, YYYY-MM (must be before the current month)."
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help="Transactions moved per database transaction."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            through = datetime.strptime(options['through'], '%Y-%m').date()
+        except ValueError:
+            raise CommandError("--through must be a month, YYYY-MM.")
+        if through >= timezone.localdate().replace(day=1):
+            raise CommandError("Only months before the current one can be closed.")
+
+        count = close_months(through, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {count} transaction(s) through {through:%Y-%m}."
+        ))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from transactions.outbox import DEFAULT_BATCH_SIZE, drain
+
+
+class Command(BaseCommand):
+    help = "Apply pending reservation events (outbox) to the revenue ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help="Events applied per database transaction."
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help="Poll every N seconds (0 = drain once and exit, for cron)."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = drain(options['batch_size'])
+            if count or not options['interval']:
+                self.stdout.write(f"Applied {count} reservation event(s).")
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
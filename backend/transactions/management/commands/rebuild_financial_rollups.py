@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from transactions import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyFinancialRollup table from the Transaction ledger and its archive."
+
+    def handle(self, *args, **options):
+        count = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily rollup rows."))
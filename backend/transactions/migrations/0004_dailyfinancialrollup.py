@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_alter_transaction_options_transaction_categorie_and_more'),
+        ('voitures', '0006_alter_voiture_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyFinancialRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Transaction day')),
+                ('type', models.CharField(choices=[('REVENU', 'Revenue'), ('DEPENSE', 'Expense')], max_length=20)),
+                ('categorie', models.CharField(blank=True, choices=[('ENTRETIEN', 'Maintenance'), ('ASSURANCE', 'Insurance'), ('REPARATION', 'Repair'), ('CARBURANT', 'Fuel'), ('AUTRE', 'Other')], max_length=20, null=True)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sum of montant for this bucket', max_digits=14)),
+                ('count', models.IntegerField(default=0, help_text='Number of transactions')),
+                ('voiture', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='voitures.voiture')),
+            ],
+            options={
+                'verbose_name': 'Daily Financial Rollup',
+                'verbose_name_plural': 'Daily Financial Rollups',
+                'indexes': [models.Index(fields=['day', 'type', 'categorie', 'voiture'], name='transaction_day_362365_idx'), models.Index(fields=['voiture', 'day'], name='transaction_voiture_69c24c_idx')],
+            },
+        ),
+    ]
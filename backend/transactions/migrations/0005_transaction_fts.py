@@ -0,0 +1,118 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:20
+
+import django.db.models.deletion
+import transactions.models
+from django.db import migrations, models
+
+# FTS5 shadow index over the searchable text of each transaction (rowid =
+# transaction id). Triggers keep it in sync for every write path, including
+# bulk_create, queryset.update() and the SET_NULL cascades.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE transactions_transaction_fts USING fts5(
+        description, nom_client, matricule,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO transactions_transaction_fts (rowid, description, nom_client, matricule)
+    SELECT t.id, t.description, r.nom_client, v.matricule
+    FROM transactions_transaction t
+    LEFT JOIN reservations_reservation r ON r.id = t.reservation_id
+    LEFT JOIN voitures_voiture v ON v.id = t.voiture_id
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_ai
+    AFTER INSERT ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts (rowid, description, nom_client, matricule)
+        VALUES (
+            NEW.id,
+            NEW.description,
+            (SELECT nom_client FROM reservations_reservation WHERE id = NEW.reservation_id),
+            (SELECT matricule FROM voitures_voiture WHERE id = NEW.voiture_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_au
+    AFTER UPDATE OF description, reservation_id, voiture_id ON transactions_transaction BEGIN
+        DELETE FROM transactions_transaction_fts WHERE rowid = OLD.id;
+        INSERT INTO transactions_transaction_fts (rowid, description, nom_client, matricule)
+        VALUES (
+            NEW.id,
+            NEW.description,
+            (SELECT nom_client FROM reservations_reservation WHERE id = NEW.reservation_id),
+            (SELECT matricule FROM voitures_voiture WHERE id = NEW.voiture_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_ad
+    AFTER DELETE ON transactions_transaction BEGIN
+        DELETE FROM transactions_transaction_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_reservation_au
+    AFTER UPDATE OF nom_client ON reservations_reservation BEGIN
+        UPDATE transactions_transaction_fts SET nom_client = NEW.nom_client
+        WHERE rowid IN (
+            SELECT id FROM transactions_transaction WHERE reservation_id = NEW.id
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_voiture_au
+    AFTER UPDATE OF matricule ON voitures_voiture BEGIN
+        UPDATE transactions_transaction_fts SET matricule = NEW.matricule
+        WHERE rowid IN (
+            SELECT id FROM transactions_transaction WHERE voiture_id = NEW.id
+        );
+    END
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_voiture_au',
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_reservation_au',
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_ad',
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_au',
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_ai',
+    'DROP TABLE IF EXISTS transactions_transaction_fts',
+]
+
+
+def run(statements):
+    """Run the statements on SQLite only; other backends keep the LIKE search."""
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_dailyfinancialrollup'),
+        ('reservations', '0009_reservation_date_fin_idx'),
+        ('voitures', '0006_alter_voiture_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+        migrations.CreateModel(
+            name='TransactionSearchIndex',
+            fields=[
+                ('transaction', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='transactions.transaction')),
+                ('document', transactions.models.FullTextField(db_column='transactions_transaction_fts')),
+                ('rank', models.FloatField(help_text='bm25 relevance, lower is better')),
+            ],
+            options={
+                'db_table': 'transactions_transaction_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_transaction_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['date'], name='transaction_date_ad8c94_idx'),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The FTS triggers on transactions_transaction are recreated: the client
+# name of an archived reservation now comes from reservations_reservationhistorique.
+# Going back, every FTS trigger is dropped before RemoveField rebuilds the
+# table (SQLite rejects the rename while triggers reference it), then the
+# 0005 triggers are restored.
+NOM_CLIENT = """
+            COALESCE(
+                (SELECT nom_client FROM reservations_reservation WHERE id = NEW.reservation_id),
+                (SELECT nom_client FROM reservations_reservationhistorique WHERE id = NEW.reservation_historique_id)
+            )"""
+OLD_NOM_CLIENT = """
+            (SELECT nom_client FROM reservations_reservation WHERE id = NEW.reservation_id)"""
+
+
+def triggers(nom_client, update_of):
+    return [
+        'DROP TRIGGER IF EXISTS transactions_transaction_fts_ai',
+        'DROP TRIGGER IF EXISTS transactions_transaction_fts_au',
+        'DROP TRIGGER IF EXISTS transactions_transaction_fts_ad',
+        f"""
+        CREATE TRIGGER transactions_transaction_fts_ai
+        AFTER INSERT ON transactions_transaction BEGIN
+            INSERT INTO transactions_transaction_fts (rowid, description, nom_client, matricule)
+            VALUES (
+                NEW.id,
+                NEW.description,{nom_client},
+                (SELECT matricule FROM voitures_voiture WHERE id = NEW.voiture_id)
+            );
+        END
+        """,
+        f"""
+        CREATE TRIGGER transactions_transaction_fts_au
+        AFTER UPDATE OF {update_of} ON transactions_transaction BEGIN
+            DELETE FROM transactions_transaction_fts WHERE rowid = OLD.id;
+            INSERT INTO transactions_transaction_fts (rowid, description, nom_client, matricule)
+            VALUES (
+                NEW.id,
+                NEW.description,{nom_client},
+                (SELECT matricule FROM voitures_voiture WHERE id = NEW.voiture_id)
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER transactions_transaction_fts_ad
+        AFTER DELETE ON transactions_transaction BEGIN
+            DELETE FROM transactions_transaction_fts WHERE rowid = OLD.id;
+        END
+        """,
+    ]
+
+
+# Unchanged since 0005, dropped and restored around the table rebuild
+RELATED_TRIGGERS = [
+    """
+    CREATE TRIGGER transactions_transaction_fts_reservation_au
+    AFTER UPDATE OF nom_client ON reservations_reservation BEGIN
+        UPDATE transactions_transaction_fts SET nom_client = NEW.nom_client
+        WHERE rowid IN (
+            SELECT id FROM transactions_transaction WHERE reservation_id = NEW.id
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_voiture_au
+    AFTER UPDATE OF matricule ON voitures_voiture BEGIN
+        UPDATE transactions_transaction_fts SET matricule = NEW.matricule
+        WHERE rowid IN (
+            SELECT id FROM transactions_transaction WHERE voiture_id = NEW.id
+        );
+    END
+    """,
+]
+
+CREATE_SQL = triggers(
+    NOM_CLIENT, 'description, reservation_id, reservation_historique_id, voiture_id'
+)
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_voiture_au',
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_reservation_au',
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_ad',
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_au',
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_ai',
+]
+RESTORE_SQL = triggers(OLD_NOM_CLIENT, 'description, reservation_id, voiture_id') + RELATED_TRIGGERS
+
+
+def run(statements):
+    """Run the statements on SQLite only, like 0005_transaction_fts."""
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0011_reservationhistorique'),
+        ('transactions', '0006_transaction_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, run(RESTORE_SQL)),
+        migrations.AddField(
+            model_name='transaction',
+            name='reservation_historique',
+            field=models.ForeignKey(blank=True, help_text='Archived reservation, once the reservation itself has been archived', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transactions', to='reservations.reservationhistorique'),
+        ),
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+    ]
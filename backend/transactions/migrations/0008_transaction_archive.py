@@ -0,0 +1,87 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# LedgerEntry reads this view: the ledger and its archive, same columns.
+# A later migration that rebuilds transactions_transaction on SQLite must
+# drop the view first and recreate it afterwards, like the FTS triggers.
+COLUMNS = """
+    id, type, categorie, montant, description, reservation_id,
+    reservation_historique_id, voiture_id, date, created_at, updated_at
+"""
+CREATE_VIEW_SQL = f"""
+    CREATE VIEW transactions_ledger AS
+    SELECT {COLUMNS} FROM transactions_transaction
+    UNION ALL
+    SELECT {COLUMNS} FROM transactions_transactionarchive
+"""
+DROP_VIEW_SQL = 'DROP VIEW IF EXISTS transactions_ledger'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0011_reservationhistorique'),
+        ('transactions', '0007_transaction_reservation_historique'),
+        ('voitures', '0006_alter_voiture_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('REVENU', 'Revenue'), ('DEPENSE', 'Expense')], max_length=20)),
+                ('categorie', models.CharField(choices=[('ENTRETIEN', 'Maintenance'), ('ASSURANCE', 'Insurance'), ('REPARATION', 'Repair'), ('CARBURANT', 'Fuel'), ('AUTRE', 'Other')], max_length=20, null=True)),
+                ('montant', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('description', models.TextField(null=True)),
+                ('date', models.DateTimeField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'transactions_ledger',
+                'ordering': ['-date'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ClosedPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the closed month', unique=True)),
+                ('transaction_count', models.IntegerField(default=0, help_text='Transactions moved to the archive for this month')),
+                ('closed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Closed Period',
+                'verbose_name_plural': 'Closed Periods',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TransactionArchive',
+            fields=[
+                ('id', models.IntegerField(help_text='Id in the ledger', primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('REVENU', 'Revenue'), ('DEPENSE', 'Expense')], max_length=20)),
+                ('categorie', models.CharField(blank=True, choices=[('ENTRETIEN', 'Maintenance'), ('ASSURANCE', 'Insurance'), ('REPARATION', 'Repair'), ('CARBURANT', 'Fuel'), ('AUTRE', 'Other')], max_length=20, null=True)),
+                ('montant', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('date', models.DateTimeField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('reservation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reservations.reservation')),
+                ('reservation_historique', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reservations.reservationhistorique')),
+                ('voiture', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='voitures.voiture')),
+            ],
+            options={
+                'verbose_name': 'Archived Transaction',
+                'verbose_name_plural': 'Archived Transactions',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='transaction_date_3ade04_idx'), models.Index(fields=['type', 'date'], name='transaction_type_3aa3c5_idx'), models.Index(fields=['voiture', 'date'], name='transaction_voiture_6af65a_idx')],
+            },
+        ),
+        migrations.RunSQL(CREATE_VIEW_SQL, DROP_VIEW_SQL),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:40
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_buckets(apps, schema_editor):
+    """Fold the rows of each duplicated bucket into its oldest row."""
+    DailyFinancialRollup = apps.get_model('transactions', 'DailyFinancialRollup')
+    rows = DailyFinancialRollup.objects.using(schema_editor.connection.alias)
+    duplicates = rows.values('day', 'type', 'categorie', 'voiture').annotate(
+        n=Count('id'), keep=Min('id'), sum_total=Sum('total'), sum_count=Sum('count'),
+    ).filter(n__gt=1)
+    for bucket in duplicates:
+        rows.filter(pk=bucket['keep']).update(
+            total=bucket['sum_total'], count=bucket['sum_count']
+        )
+        rows.filter(
+            day=bucket['day'], type=bucket['type'],
+            categorie=bucket['categorie'], voiture=bucket['voiture'],
+        ).exclude(pk=bucket['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0008_transaction_archive'),
+        ('voitures', '0006_alter_voiture_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailyfinancialrollup',
+            constraint=models.UniqueConstraint(models.F('day'), models.F('type'), django.db.models.functions.comparison.Coalesce('categorie', models.Value('')), django.db.models.functions.comparison.Coalesce('voiture', models.Value(0)), name='transactions_rollup_bucket_unique'),
+        ),
+    ]
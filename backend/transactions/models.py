@@ -1,7 +1,9 @@
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
 from decimal import Decimal
-from reservations.models import Reservation
+from reservations.models import Reservation, ReservationHistorique
 from voitures.models import Voiture
 
 
@@ -63,6 +65,14 @@ class Transaction(models.Model):
         related_name='transactions',
         help_text="Associated reservation (if applicable)"
     )
+    reservation_historique = models.ForeignKey(
+        ReservationHistorique,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='transactions',
+        help_text="Archived reservation, once the reservation itself has been archived"
+    )
     voiture = models.ForeignKey(
         Voiture,
         on_delete=models.SET_NULL,
@@ -89,6 +99,8 @@ class Transaction(models.Model):
     class Meta:
         ordering = ['-date']
         indexes = [
+            # Default (-date, -id) ordering: changelist and API list pages
+            models.Index(fields=['date']),
             models.Index(fields=['type', 'date']),
             models.Index(fields=['voiture', 'date']),
             models.Index(fields=['reservation']),
@@ -149,3 +161,202 @@ class Transaction(models.Model):
         if self.categorie:
             return dict(self.CATEGORIE_CHOICES).get(self.categorie, self.categorie)
         return None
+
+
+class TransactionArchive(models.Model):
+    """
+    Transactions of closed months, moved out of the ledger by
+    `manage.py archive_transactions` (see transactions/archive.py).
+    
+    Same columns and ids as Transaction; the rows are read-only and only
+    read through LedgerEntry when a date filter reaches a closed month.
+    """
+    
+    id = models.IntegerField(primary_key=True, help_text="Id in the ledger")
+    type = models.CharField(max_length=20, choices=Transaction.TYPE_CHOICES)
+    categorie = models.CharField(
+        max_length=20,
+        choices=Transaction.CATEGORIE_CHOICES,
+        null=True,
+        blank=True
+    )
+    montant = models.DecimalField(max_digits=10, decimal_places=2)
+    description = models.TextField(null=True, blank=True)
+    reservation = models.ForeignKey(
+        Reservation, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    reservation_historique = models.ForeignKey(
+        ReservationHistorique, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    voiture = models.ForeignKey(
+        Voiture, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    date = models.DateTimeField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['type', 'date']),
+            models.Index(fields=['voiture', 'date']),
+        ]
+        verbose_name = 'Archived Transaction'
+        verbose_name_plural = 'Archived Transactions'
+    
+    def __str__(self):
+        return f"[{self.type}] {self.montant} DA - {self.date.strftime('%Y-%m-%d')} (archived)"
+
+
+class ClosedPeriod(models.Model):
+    """
+    A closed fiscal month whose transactions live in TransactionArchive.
+    
+    The month after the latest closed one is the archive cutoff: queries
+    whose date range starts on or after it only read the ledger.
+    """
+    
+    month = models.DateField(unique=True, help_text="First day of the closed month")
+    transaction_count = models.IntegerField(
+        default=0,
+        help_text="Transactions moved to the archive for this month"
+    )
+    closed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-month']
+        verbose_name = 'Closed Period'
+        verbose_name_plural = 'Closed Periods'
+    
+    def __str__(self):
+        return f"{self.month.strftime('%Y-%m')}: {self.transaction_count} archived"
+
+
+class LedgerEntry(models.Model):
+    """
+    The ledger and its archive together: the `transactions_ledger` view
+    (UNION ALL of both tables) created by migration 0008_transaction_archive.
+    
+    Read-only, with the same field names as Transaction so the list
+    filters and the values()-based serializer apply unchanged.
+    """
+    
+    id = models.IntegerField(primary_key=True)
+    type = models.CharField(max_length=20, choices=Transaction.TYPE_CHOICES)
+    categorie = models.CharField(max_length=20, choices=Transaction.CATEGORIE_CHOICES, null=True)
+    montant = models.DecimalField(max_digits=10, decimal_places=2)
+    description = models.TextField(null=True)
+    reservation = models.ForeignKey(
+        Reservation, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    reservation_historique = models.ForeignKey(
+        ReservationHistorique, on_delete=models.DO_NOTHING, db_constraint=False, null=True,
+        related_name='+'
+    )
+    voiture = models.ForeignKey(
+        Voiture, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    date = models.DateTimeField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        managed = False
+        db_table = 'transactions_ledger'
+        ordering = ['-date']
+
+
+class FullTextField(models.TextField):
+    """FTS5 hidden column named after its table, the left side of MATCH."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+    
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class TransactionSearchIndex(models.Model):
+    """
+    FTS5 shadow index of the searchable text of each transaction
+    (description, client name, matricule), rowid = transaction id.
+    
+    The table and its sync triggers are created by migration
+    0005_transaction_fts; the model only lets queries join it
+    (transaction__search_index) to filter with MATCH and order by rank.
+    """
+    
+    transaction = models.OneToOneField(
+        Transaction,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_index',
+    )
+    document = FullTextField(db_column='transactions_transaction_fts')
+    rank = models.FloatField(help_text="bm25 relevance, lower is better")
+    
+    class Meta:
+        managed = False
+        db_table = 'transactions_transaction_fts'
+
+
+class DailyFinancialRollup(models.Model):
+    """
+    Daily totals per (day, type, categorie, voiture).
+    
+    Maintained incrementally from Transaction saves/deletes (see
+    transactions/rollups.py) so that summaries read O(days) rows instead
+    of O(transactions). Rebuild with `manage.py rebuild_financial_rollups`.
+    
+    One row per bucket: the unique key coalesces the nullable dimensions,
+    so the fleet-wide (voiture NULL) and uncategorized buckets are unique
+    too, and writers upsert on it (rollups.UPSERT_SQL).
+    """
+    
+    day = models.DateField(help_text="Transaction day")
+    type = models.CharField(max_length=20, choices=Transaction.TYPE_CHOICES)
+    categorie = models.CharField(
+        max_length=20,
+        choices=Transaction.CATEGORIE_CHOICES,
+        null=True,
+        blank=True
+    )
+    voiture = models.ForeignKey(
+        Voiture,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Sum of montant for this bucket"
+    )
+    count = models.IntegerField(default=0, help_text="Number of transactions")
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['day', 'type', 'categorie', 'voiture']),
+            models.Index(fields=['voiture', 'day']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                'day', 'type', Coalesce('categorie', Value('')), Coalesce('voiture', Value(0)),
+                name='transactions_rollup_bucket_unique',
+            ),
+        ]
+        verbose_name = 'Daily Financial Rollup'
+        verbose_name_plural = 'Daily Financial Rollups'
+    
+    def __str__(self):
+        return f"{self.day} {self.type} {self.categorie or '-'}: {self.total} DA ({self.count})"
@@ -0,0 +1,149 @@
+"""
+Reservation outbox consumer: keeps the REVENU transaction of each
+reservation in line with the reservation.
+
+Reservation.save() records an EvenementReservation row in the same
+database transaction as the reservation itself, instead of writing to
+the ledger on the booking path. drain() consumes those rows in id order,
+in batches: events are coalesced per reservation and the ledger is
+converged to the reservation's current state:
+
+- no revenue yet and a positive prix_total: the revenue is created;
+- revenue already there: its amount, vehicle and description follow
+  the reservation (updates included, which the old post_save handler
+  never propagated).
+
+A batch deletes its events and writes the ledger in one transaction, and
+applying the same state twice changes nothing, so concurrent or repeated
+drains cannot duplicate a revenue.
+
+The events are drained by a local thread woken after each committed
+reservation write (settings.TRANSACTIONS_OUTBOX_WORKER), or by
+`manage.py process_reservation_events` (cron / separate worker).
+"""
+import logging
+import threading
+
+from django.db import connections
+from django.db import transaction as db_transaction
+
+from core.concurrence import reessayer_si_verrouillee
+from reservations.models import EvenementReservation, Reservation
+from . import rollups
+from .models import Transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+SYNCED_FIELDS = ('montant', 'voiture_id', 'description')
+
+
+def revenue_values(reservation):
+    """Ledger values of the revenue of `reservation`."""
+    return {
+        'montant': reservation.prix_total,
+        'voiture_id': reservation.voiture_id,
+        'description': (
+            f"Revenue from reservation: {reservation.nom_client} - {reservation.voiture.matricule}"
+        ),
+    }
+
+
+@reessayer_si_verrouillee
+def drain_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Apply the oldest `batch_size` events. Returns the number of events
+    consumed (0 when the outbox is empty).
+    """
+    events = list(
+        EvenementReservation.objects.order_by('id').values_list('id', 'reservation_id')[:batch_size]
+    )
+    if not events:
+        return 0
+    EvenementReservation.objects.filter(id__in=[pk for pk, _ in events]).delete()
+
+    reservation_ids = {reservation_id for _, reservation_id in events}
+    reservations = Reservation.objects.select_related('voiture').in_bulk(reservation_ids)
+    revenues = {}
+    for revenue in Transaction.objects.filter(
+        reservation_id__in=reservation_ids, type='REVENU'
+    ).order_by('id'):
+        revenues.setdefault(revenue.reservation_id, revenue)
+
+    created = []
+    for reservation_id in sorted(reservation_ids):
+        reservation = reservations.get(reservation_id)
+        # Deleted since, or nothing to bill
+        if reservation is None or not reservation.prix_total or reservation.prix_total <= 0:
+            continue
+
+        values = revenue_values(reservation)
+        revenue = revenues.get(reservation_id)
+        if revenue is None:
+            created.append(Transaction(
+                type='REVENU', categorie=None, reservation=reservation, **values
+            ))
+        elif any(getattr(revenue, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(revenue, field, value)
+            # save(): the rollup signals move the amount between buckets
+            revenue.save()
+
+    if created:
+        created = Transaction.objects.bulk_create(created)
+        # bulk_create bypasses signals: update the rollup in one pass
+        rollups.record_transactions(created)
+
+    return len(events)
+
+
+def drain(batch_size=DEFAULT_BATCH_SIZE):
+    """Consume the outbox until it is empty. Returns the number of events."""
+    total = 0
+    while True:
+        count = drain_batch(batch_size)
+        if not count:
+            return total
+        total += count
+
+
+class OutboxWorker:
+    """
+    In-process drainer: one daemon thread, woken by wake() and otherwise
+    idle. Wakes that arrive during a drain are folded into the next one.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pending = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def wake(self):
+        self.pending.set()
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='reservation-outbox', daemon=True
+                )
+                self.thread.start()
+
+    def run(self):
+        while True:
+            self.pending.wait()
+            self.pending.clear()
+            try:
+                drain(self.batch_size)
+            except Exception:
+                # Events stay in the outbox for the next wake or the command
+                logger.exception("Reservation outbox drain failed")
+            finally:
+                connections.close_all()
+
+
+worker = OutboxWorker()
+
+
+def wake_after_commit():
+    """Wake the local worker once the current transaction commits."""
+    db_transaction.on_commit(worker.wake)
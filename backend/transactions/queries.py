@@ -0,0 +1,120 @@
+"""
+Query helpers shared by TransactionViewSet and the async read views.
+
+Both map the same query parameters (type, categorie, voiture, date_from,
+date_to) onto the ledger or the daily rollup and format the analytics
+payloads identically.
+"""
+from datetime import datetime, timedelta
+
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+# Aggregates over DailyFinancialRollup rows
+TOTALS = {
+    'total_revenu': Sum('total', filter=Q(type='REVENU')),
+    'total_depense': Sum('total', filter=Q(type='DEPENSE')),
+    'transaction_count': Sum('count'),
+}
+
+
+def date_param(params, name):
+    """Parse a YYYY-MM-DD query parameter, ignoring invalid values."""
+    value = params.get(name)
+    try:
+        return parse_date(value) if value else None
+    except (ValueError, TypeError):
+        return None
+
+
+def day_start(day):
+    """Aware datetime of the start of a local day."""
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def filter_transactions(queryset, params):
+    """Apply the list filters to a Transaction queryset."""
+    # Filter by type
+    type_filter = params.get('type')
+    if type_filter:
+        queryset = queryset.filter(type=type_filter)
+
+    # Filter by category
+    categorie_filter = params.get('categorie')
+    if categorie_filter:
+        queryset = queryset.filter(categorie=categorie_filter)
+
+    # Filter by vehicle
+    voiture_filter = params.get('voiture')
+    if voiture_filter:
+        queryset = queryset.filter(voiture_id=voiture_filter)
+
+    # Filter by date range (whole local days), as a range on the date
+    # column itself so the date index serves it (in both halves of LedgerEntry)
+    from_date = date_param(params, 'date_from')
+    to_date = date_param(params, 'date_to')
+    if from_date:
+        queryset = queryset.filter(date__gte=day_start(from_date))
+    if to_date:
+        queryset = queryset.filter(date__lt=day_start(to_date + timedelta(days=1)))
+
+    return queryset
+
+
+def filter_rollups(queryset, params):
+    """Apply the same filters to DailyFinancialRollup rows (O(days) rows)."""
+    if params.get('type'):
+        queryset = queryset.filter(type=params['type'])
+    if params.get('categorie'):
+        queryset = queryset.filter(categorie=params['categorie'])
+    if params.get('voiture'):
+        queryset = queryset.filter(voiture_id=params['voiture'])
+
+    from_date = date_param(params, 'date_from')
+    to_date = date_param(params, 'date_to')
+    if from_date:
+        queryset = queryset.filter(day__gte=from_date)
+    if to_date:
+        queryset = queryset.filter(day__lte=to_date)
+
+    return queryset
+
+
+def format_totals(totals):
+    """Turn a TOTALS aggregate into the summary payload."""
+    total_revenu = totals['total_revenu'] or 0
+    total_depense = totals['total_depense'] or 0
+
+    return {
+        'total_revenu': float(total_revenu),
+        'total_depense': float(total_depense),
+        'profit': float(total_revenu - total_depense),
+        'transaction_count': totals['transaction_count'] or 0,
+    }
+
+
+def monthly_rows(queryset):
+    """Group rollup rows by month, most recent first."""
+    return queryset.annotate(
+        month=TruncMonth('day')
+    ).values('month').annotate(
+        total_revenu=Sum('total', filter=Q(type='REVENU')),
+        total_depense=Sum('total', filter=Q(type='DEPENSE')),
+        count=Sum('count'),
+    ).order_by('-month')
+
+
+def format_month(item):
+    month_date = item['month']
+    total_revenu = item['total_revenu'] or 0
+    total_depense = item['total_depense'] or 0
+
+    return {
+        'month': month_date.strftime('%Y-%m') if month_date else None,
+        'total_revenu': float(total_revenu),
+        'total_depense': float(total_depense),
+        'profit': float(total_revenu - total_depense),
+        'transaction_count': item['count'],
+    }
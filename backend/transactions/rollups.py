@@ -0,0 +1,139 @@
+"""
+Incremental maintenance of DailyFinancialRollup.
+
+Every Transaction write is turned into signed deltas on its
+(day, type, categorie, voiture) bucket, applied with an upsert on the
+unique bucket key: concurrent first writes to a bucket add up in one row
+instead of inserting two. A deleted vehicle's buckets are folded into the
+fleet-wide (voiture NULL) ones first (fold_voiture).
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connections, router
+from django.db import transaction as db_transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import cache as analytics_cache
+from .models import DailyFinancialRollup, LedgerEntry
+
+ROLLUP_FIELDS = ('date', 'type', 'categorie', 'voiture_id', 'montant')
+
+# Conflict target: the expressions of the transactions_rollup_bucket_unique index
+UPSERT_SQL = f"""
+    INSERT INTO {DailyFinancialRollup._meta.db_table} (day, type, categorie, voiture_id, total, count)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT (day, type, COALESCE(categorie, ''), COALESCE(voiture_id, 0))
+    DO UPDATE SET total = total + excluded.total, count = count + excluded.count
+"""
+
+
+def rollup_key(date, type, categorie, voiture_id):
+    """Bucket key for a transaction timestamp and its dimensions."""
+    return (timezone.localdate(date), type, categorie, voiture_id)
+
+
+def snapshot(instance):
+    """Return the rollup-relevant fields of a Transaction instance."""
+    return {field: getattr(instance, field) for field in ROLLUP_FIELDS}
+
+
+def add_deltas(deltas, values, sign=1):
+    """Accumulate a transaction snapshot (dict of ROLLUP_FIELDS) into deltas."""
+    key = rollup_key(values['date'], values['type'], values['categorie'], values['voiture_id'])
+    total, count = deltas[key]
+    deltas[key] = (total + sign * values['montant'], count + sign)
+
+
+def new_deltas():
+    return defaultdict(lambda: (Decimal('0.00'), 0))
+
+
+def apply_deltas(deltas):
+    """Apply accumulated deltas: one upsert per touched bucket, in one executemany."""
+    using = router.db_for_write(DailyFinancialRollup)
+    ops = connections[using].ops
+    params = [
+        (ops.adapt_datefield_value(day), type, categorie, voiture_id,
+         ops.adapt_decimalfield_value(total), count)
+        for (day, type, categorie, voiture_id), (total, count) in deltas.items()
+        if total or count
+    ]
+    if not params:
+        return
+    with db_transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.executemany(UPSERT_SQL, params)
+    analytics_cache.bump_months(
+        day for (day, *_), (total, count) in deltas.items() if total or count
+    )
+
+
+def fold_voiture(voiture_id):
+    """
+    Move the buckets of a vehicle about to be deleted into the fleet-wide
+    buckets, where its SET_NULL cascade would otherwise collide with the
+    unique bucket key. Totals are unchanged.
+    """
+    rows = DailyFinancialRollup.objects.filter(voiture_id=voiture_id)
+    deltas = new_deltas()
+    for day, type, categorie, total, count in rows.values_list(
+        'day', 'type', 'categorie', 'total', 'count'
+    ):
+        deltas[(day, type, categorie, None)] = (total, count)
+    with db_transaction.atomic():
+        rows.delete()
+        apply_deltas(deltas)
+
+
+def record_transactions(transactions, sign=1):
+    """Apply a batch of Transaction instances (e.g. after bulk_create)."""
+    deltas = new_deltas()
+    for instance in transactions:
+        add_deltas(deltas, snapshot(instance), sign)
+    apply_deltas(deltas)
+    analytics_cache.bump_generation()
+
+
+def rebuild(source=None):
+    """
+    Recompute every bucket from the ledger in one aggregate query.
+
+    Used to recover from drift (bulk writes that bypass signals,
+    vehicle deletions, crashes between a save and its rollup update).
+    The default source includes the archive of closed months.
+    """
+    source = LedgerEntry.objects.all() if source is None else source
+    rows = source.order_by().annotate(
+        day=TruncDate('date')
+    ).values(
+        'day', 'type', 'categorie', 'voiture_id'
+    ).annotate(
+        sum_total=Sum('montant'),
+        n=Count('id'),
+    )
+
+    with db_transaction.atomic():
+        # Months of the old and the new buckets: all may have changed
+        months = set(DailyFinancialRollup.objects.dates('day', 'month'))
+        DailyFinancialRollup.objects.all().delete()
+        DailyFinancialRollup.objects.bulk_create(
+            (
+                DailyFinancialRollup(
+                    day=row['day'],
+                    type=row['type'],
+                    categorie=row['categorie'],
+                    voiture_id=row['voiture_id'],
+                    total=row['sum_total'],
+                    count=row['n'],
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=1000,
+        )
+        months.update(DailyFinancialRollup.objects.dates('day', 'month'))
+        analytics_cache.bump_months(months)
+
+    analytics_cache.bump_generation()
+    return DailyFinancialRollup.objects.count()
@@ -0,0 +1,101 @@
+"""
+Full-text search over transactions, backed by the SQLite FTS5 table
+`transactions_transaction_fts` (see migration 0005_transaction_fts).
+
+The index holds the description, the reservation's client name and the
+car's matricule of every transaction, kept in sync by triggers. Each
+search word becomes a prefix query ("word"*), served by the index's
+prefix tables instead of a LIKE '%term%' scan across joins.
+
+Matching is by word prefix: "Reven" finds "Revenue", but a fragment from
+the middle of a word does not match as it did with LIKE.
+"""
+import re
+
+from django.db import connections
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+FTS_TABLE = 'transactions_transaction_fts'
+FTS_COLUMNS = ('description', 'nom_client', 'matricule')
+
+# Model lookups covered by each FTS column
+LOOKUP_COLUMNS = {
+    'description': 'description',
+    'reservation__nom_client': 'nom_client',
+    'voiture__matricule': 'matricule',
+}
+
+WORD_RE = re.compile(r'\w+')
+
+
+def is_available(using='default'):
+    """The FTS table only exists on SQLite."""
+    return connections[using].vendor == 'sqlite'
+
+
+def match_expression(terms, columns=FTS_COLUMNS):
+    """
+    Build an FTS5 MATCH expression: every word of every term must match
+    (as a prefix) in one of `columns`. Returns None when nothing is searchable.
+    """
+    words = [word for term in terms for word in WORD_RE.findall(term)]
+    if not words:
+        return None
+    query = ' '.join(f'"{word}"*' for word in words)
+    if tuple(columns) != FTS_COLUMNS:
+        query = f'{{{" ".join(columns)}}} : ({query})'
+    return query
+
+
+def columns_for(search_fields):
+    """FTS columns for DRF/admin search_fields, or None if one is not indexed."""
+    columns = []
+    for field in search_fields:
+        column = LOOKUP_COLUMNS.get(field.lstrip('^=@$'))
+        if column is None:
+            return None
+        columns.append(column)
+    return columns
+
+
+def search(queryset, terms, columns=FTS_COLUMNS, rank=False):
+    """
+    Filter a Transaction queryset to the rows matching `terms`.
+
+    With rank=True the index is joined instead, and the rows are annotated
+    with `rank` (FTS5 bm25, lower is more relevant) for ordering by relevance.
+    """
+    expression = match_expression(terms, columns)
+    if expression is None:
+        return queryset
+
+    if rank:
+        return queryset.filter(
+            search_index__document__match=expression
+        ).annotate(rank=F('search_index__rank'))
+
+    # Semi-join on the index: keeps the queryset's own ordering cheap
+    return queryset.filter(id__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expression]
+    ))
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Drop-in SearchFilter: ?search= is answered by the FTS5 index when the
+    view's search_fields are all indexed, by the default LIKE search otherwise.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        terms = self.get_search_terms(request)
+        if not search_fields or not terms:
+            return queryset
+
+        columns = columns_for(search_fields)
+        if columns is None or not is_available(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        return search(queryset, terms, columns)
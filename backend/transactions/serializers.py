@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.core.exceptions import ValidationError as DjangoValidationError
+from core.fast_serializers import FastListSerializer
 from .models import Transaction
 
 
@@ -25,6 +26,7 @@ class TransactionSerializer(serializers.ModelSerializer):
             'description',
             'date',
             'reservation',
+            'reservation_historique',
             'reservation_details',
             'voiture',
             'voiture_details',
@@ -38,12 +40,13 @@ class TransactionSerializer(serializers.ModelSerializer):
             'updated_at',
             'type_display',
             'categorie_display',
+            'reservation_historique',
             'reservation_details',
             'voiture_details',
         ]
     
     def get_reservation_details(self, obj):
-        """Return reservation details if linked"""
+        """Return reservation details if linked (archived reservations included)"""
         if obj.reservation:
             return {
                 'id': obj.reservation.id,
@@ -51,6 +54,14 @@ class TransactionSerializer(serializers.ModelSerializer):
                 'voiture': str(obj.reservation.voiture),
                 'prix_total': str(obj.reservation.prix_total),
             }
+        if obj.reservation_historique:
+            archive = obj.reservation_historique
+            return {
+                'id': archive.id_origine,
+                'nom_client': archive.nom_client,
+                'voiture': str(archive.voiture) if archive.voiture else archive.matricule,
+                'prix_total': str(archive.prix_total),
+            }
         return None
     
     def get_voiture_details(self, obj):
@@ -100,3 +111,79 @@ class TransactionSerializer(serializers.ModelSerializer):
             })
         
         return data
+
+
+TYPE_LABELS = dict(Transaction.TYPE_CHOICES)
+CATEGORIE_LABELS = dict(Transaction.CATEGORIE_CHOICES)
+
+
+def _reservation_details(row):
+    """Same output as TransactionSerializer.get_reservation_details"""
+    if row['reservation__id'] is not None:
+        return {
+            'id': row['reservation__id'],
+            'nom_client': row['reservation__nom_client'],
+            'voiture': f"{row['reservation__voiture__matricule']} {row['reservation__voiture__marque']}",
+            'prix_total': str(row['reservation__prix_total']),
+        }
+    if row['reservation_historique__id_origine'] is not None:
+        marque = row['reservation_historique__voiture__marque']
+        matricule = row['reservation_historique__matricule']
+        return {
+            'id': row['reservation_historique__id_origine'],
+            'nom_client': row['reservation_historique__nom_client'],
+            'voiture': f"{row['reservation_historique__voiture__matricule']} {marque}"
+            if marque is not None else matricule,
+            'prix_total': str(row['reservation_historique__prix_total']),
+        }
+    return None
+
+
+def _voiture_details(row):
+    """Same output as TransactionSerializer.get_voiture_details"""
+    if row['voiture__id'] is None:
+        return None
+    return {
+        'id': row['voiture__id'],
+        'matricule': row['voiture__matricule'],
+        'marque': row['voiture__marque'],
+        'modele': row['voiture__modele'],
+    }
+
+
+# Fast list path: one values() query with every join declared up front,
+# byte-identical JSON to TransactionSerializer(many=True).
+transaction_list_serializer = FastListSerializer(
+    TransactionSerializer,
+    custom={
+        'type_display': (
+            ['type'],
+            lambda row: TYPE_LABELS.get(row['type'], row['type']),
+        ),
+        'categorie_display': (
+            ['categorie'],
+            lambda row: CATEGORIE_LABELS.get(row['categorie'], row['categorie'])
+            if row['categorie'] else None,
+        ),
+        'reservation_details': (
+            [
+                'reservation__id',
+                'reservation__nom_client',
+                'reservation__voiture__matricule',
+                'reservation__voiture__marque',
+                'reservation__prix_total',
+                'reservation_historique__id_origine',
+                'reservation_historique__nom_client',
+                'reservation_historique__matricule',
+                'reservation_historique__voiture__matricule',
+                'reservation_historique__voiture__marque',
+                'reservation_historique__prix_total',
+            ],
+            _reservation_details,
+        ),
+        'voiture_details': (
+            ['voiture__id', 'voiture__matricule', 'voiture__marque', 'voiture__modele'],
+            _voiture_details,
+        ),
+    },
+)
@@ -1,28 +1,64 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from reservations.models import Reservation
+from voitures.models import Voiture
+from . import cache as analytics_cache
+from . import outbox, rollups
 from .models import Transaction
 
 
 @receiver(post_save, sender=Reservation)
-def create_revenue_transaction(sender, instance, created, **kwargs):
+def schedule_revenue_sync(sender, instance, raw=False, **kwargs):
     """
-    Signal handler to automatically create a REVENU transaction
-    when a Reservation is created or updated with status CONFIRMED.
-    
-    This ensures financial tracking is automatic and synchronized
-    with reservation creation.
+    Reservation.save() has queued an outbox event in its transaction:
+    let the local worker apply it to the ledger once that commits
+    (see transactions/outbox.py).
     """
-    if created:
-        # Check if reservation has a prix_total
-        if instance.prix_total and instance.prix_total > 0:
-            # Check if transaction already exists for this reservation
-            if not Transaction.objects.filter(reservation=instance).exists():
-                Transaction.objects.create(
-                    type='REVENU',
-                    categorie=None,
-                    montant=instance.prix_total,
-                    reservation=instance,
-                    voiture=instance.voiture,
-                    description=f"Revenue from reservation: {instance.nom_client} - {instance.voiture.matricule}"
-                )
+    if not raw and settings.TRANSACTIONS_OUTBOX_WORKER:
+        outbox.wake_after_commit()
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_rollup_state(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored values of an updated transaction so that its previous
+    rollup bucket can be decremented after the save.
+    """
+    instance._rollup_previous = None
+    if instance.pk and not raw:
+        instance._rollup_previous = Transaction.objects.filter(
+            pk=instance.pk
+        ).values(*rollups.ROLLUP_FIELDS).first()
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, raw=False, **kwargs):
+    """Move the transaction amount into its (possibly new) daily bucket."""
+    if raw:
+        return
+    deltas = rollups.new_deltas()
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous:
+        rollups.add_deltas(deltas, previous, sign=-1)
+    rollups.add_deltas(deltas, rollups.snapshot(instance))
+    rollups.apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    """Remove a deleted transaction from its daily bucket."""
+    rollups.record_transactions([instance], sign=-1)
+
+
+@receiver(pre_delete, sender=Voiture)
+def fold_rollups_of_deleted_voiture(sender, instance, **kwargs):
+    """Keep a deleted vehicle's amounts in the fleet-wide rollup buckets."""
+    rollups.fold_voiture(instance.pk)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def invalidate_analytics_cache(sender, **kwargs):
+    """Start a new analytics cache generation once a ledger write commits."""
+    analytics_cache.bump_generation()
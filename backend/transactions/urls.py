@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import TransactionViewSet
+from .async_views import by_voiture_async, monthly_stats_async, summary_async, transaction_list_async
 
 # Create a router and register the viewset
 router = DefaultRouter()
@@ -8,5 +9,10 @@ router.register(r'transactions', TransactionViewSet, basename='transaction')
 
 # URL patterns
 urlpatterns = [
+    # Async (ASGI) read endpoints, before the router's transactions/<pk>/ route
+    path('transactions/async/', transaction_list_async),
+    path('transactions/async/summary/', summary_async),
+    path('transactions/async/monthly-stats/', monthly_stats_async),
+    path('transactions/async/by-voiture/<int:voiture_id>/', by_voiture_async),
     path('', include(router.urls)),
 ]
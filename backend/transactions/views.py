@@ -3,12 +3,19 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.request import Request
+from rest_framework.parsers import JSONParser, MultiPartParser
 from django.core.exceptions import ValidationError
-from django.db.models import Sum, Q
-from django.utils.dateparse import parse_date
+from django.http import Http404, StreamingHttpResponse
+from rest_framework.generics import get_object_or_404
 from datetime import datetime, timedelta
-from .models import Transaction
-from .serializers import TransactionSerializer
+from . import archive
+from . import cache as analytics_cache
+from .export import CSVRenderer, DEFAULT_CHUNK_SIZE, NDJSONRenderer, iter_csv, iter_ndjson
+from .bulk_import import CSVParser, DEFAULT_BATCH_SIZE, TransactionImporter, read_csv
+from .models import DailyFinancialRollup, Transaction, TransactionArchive
+from .queries import TOTALS, filter_rollups, filter_transactions, format_month, format_totals, monthly_rows
+from .search import FullTextSearchFilter
+from .serializers import TransactionSerializer, transaction_list_serializer
 
 
 class TransactionViewSet(viewsets.ModelViewSet):
@@ -16,12 +23,14 @@ class TransactionViewSet(viewsets.ModelViewSet):
     ViewSet for Transaction CRUD operations with custom actions for analytics.
     
     Endpoints:
-    - GET /transactions/ - List all transactions
+    - GET /transactions/ - List transactions (cursor-paginated, ?page_size=all for everything)
     - POST /transactions/ - Create transaction
-    - GET /transactions/{id}/ - Retrieve transaction
+    - GET /transactions/{id}/ - Retrieve transaction (archived ones included)
     - PATCH /transactions/{id}/ - Partial update
     - PUT /transactions/{id}/ - Full update
     - DELETE /transactions/{id}/ - Delete (Admin only)
+    - POST /transactions/bulk/ - Bulk import (CSV or JSON array)
+    - GET /transactions/export/?format=csv|ndjson - Streaming ledger export
     - GET /transactions/summary/ - Financial summary
     - GET /transactions/monthly-stats/ - Monthly statistics
     - GET /transactions/by-voiture/{voiture_id}/ - Transactions by vehicle
@@ -30,10 +39,12 @@ class TransactionViewSet(viewsets.ModelViewSet):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    # ?search= is served by the FTS5 index (transactions/search.py)
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['description', 'reservation__nom_client']
     ordering_fields = ['date', 'montant', 'type']
-    ordering = ['-date']
+    # (date, id) : ordre stable pour la pagination par curseur
+    ordering = ['-date', '-id']
     
     def get_permissions(self):
         """
@@ -46,49 +57,56 @@ class TransactionViewSet(viewsets.ModelViewSet):
         """
         Filter transactions based on query parameters.
         Optimize with select_related for better performance.
+        
+        Lists read the archive of closed months too (LedgerEntry) unless
+        their date_from starts after the last closed one, so they cover
+        the same months as the rollup totals (transactions/archive.py);
+        single transactions are always read and written in the ledger.
         """
-        queryset = Transaction.objects.select_related(
-            'reservation',
+        model = Transaction if self.detail else archive.ledger_model(self.request.query_params)
+        queryset = model.objects.select_related(
+            'reservation__voiture',
+            'reservation_historique__voiture',
             'voiture'
         ).all()
         
-        # Filter by type
-        type_filter = self.request.query_params.get('type')
-        if type_filter:
-            queryset = queryset.filter(type=type_filter)
-        
-        # Filter by category
-        categorie_filter = self.request.query_params.get('categorie')
-        if categorie_filter:
-            queryset = queryset.filter(categorie=categorie_filter)
-        
-        # Filter by vehicle
-        voiture_filter = self.request.query_params.get('voiture')
-        if voiture_filter:
-            queryset = queryset.filter(voiture_id=voiture_filter)
-        
-        # Filter by date range
-        date_from = self.request.query_params.get('date_from')
-        date_to = self.request.query_params.get('date_to')
-        
-        if date_from:
-            try:
-                from_date = parse_date(date_from)
-                if from_date:
-                    queryset = queryset.filter(date__date__gte=from_date)
-            except (ValueError, TypeError):
-                pass
+        return filter_transactions(queryset, self.request.query_params)
+    
+    def get_rollup_queryset(self):
+        """
+        DailyFinancialRollup rows matching the same query parameters as
+        get_queryset(), used by the analytics actions (O(days) rows).
+        """
+        return filter_rollups(DailyFinancialRollup.objects.all(), self.request.query_params)
+    
+    def list(self, request: Request, *args, **kwargs):
+        """
+        List transactions through the values()-based fast serializer
+        (same JSON as TransactionSerializer, no model instances).
+        """
+        rows = transaction_list_serializer.values(
+            self.filter_queryset(self.get_queryset())
+        )
         
-        if date_to:
-            try:
-                to_date = parse_date(date_to)
-                if to_date:
-                    # Include entire day
-                    queryset = queryset.filter(date__date__lte=to_date)
-            except (ValueError, TypeError):
-                pass
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(transaction_list_serializer.serialize(page))
         
-        return queryset
+        return Response(transaction_list_serializer.serialize(rows))
+    
+    def retrieve(self, request: Request, *args, **kwargs):
+        """
+        Retrieve a transaction, from the archive once its month is closed
+        (read-only there: update and delete stay on the ledger).
+        """
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            row = get_object_or_404(
+                transaction_list_serializer.values(TransactionArchive.objects.all()),
+                pk=kwargs['pk']
+            )
+            return Response(transaction_list_serializer.to_representation(row))
     
     def create(self, request: Request, *args, **kwargs):
         """
@@ -147,6 +165,90 @@ class TransactionViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.data)
     
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[AllowAny],
+        parser_classes=[JSONParser, CSVParser, MultiPartParser],
+        url_path='bulk'
+    )
+    def bulk(self, request):
+        """
+        POST /transactions/bulk/
+        
+        Imports many transactions at once. Accepts:
+        - a JSON array of transaction objects
+        - a text/csv body with a header row
+        - a multipart upload with a CSV `file`
+        
+        All rows are validated first; valid rows are inserted with
+        bulk_create (?batch_size=, default 1000) in a single transaction,
+        invalid rows are reported with their 1-based row number.
+        """
+        if 'file' in request.FILES:
+            rows = read_csv(request.FILES['file'].read())
+        else:
+            rows = request.data
+        
+        if not isinstance(rows, list):
+            return Response(
+                {'error': 'Expected a JSON array or CSV rows.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            batch_size = int(request.query_params.get('batch_size', DEFAULT_BATCH_SIZE))
+        except ValueError:
+            batch_size = DEFAULT_BATCH_SIZE
+        
+        importer = TransactionImporter(rows, batch_size=batch_size)
+        created = importer.run()
+        
+        return Response(
+            {
+                'created': len(created),
+                'error_count': len(importer.errors),
+                'errors': importer.errors,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[AllowAny],
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+        url_path='export'
+    )
+    def export(self, request):
+        """
+        GET /transactions/export/?format=csv|ndjson
+        
+        Streams the ledger with the same filters as the list endpoint
+        (type, categorie, voiture, date_from, date_to, search, ordering).
+        Rows are read in chunks (?chunk_size=, default 2000) without
+        building model instances, so memory stays constant.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        try:
+            chunk_size = max(1, int(request.query_params.get('chunk_size', DEFAULT_CHUNK_SIZE)))
+        except ValueError:
+            chunk_size = DEFAULT_CHUNK_SIZE
+        
+        if request.accepted_renderer.format == 'ndjson':
+            rows = iter_ndjson(queryset, chunk_size)
+            content_type = 'application/x-ndjson; charset=utf-8'
+            extension = 'ndjson'
+        else:
+            rows = iter_csv(queryset, chunk_size)
+            content_type = 'text/csv; charset=utf-8'
+            extension = 'csv'
+        
+        response = StreamingHttpResponse(rows, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="transactions.{extension}"'
+        return response
+    
     @action(
         detail=False,
         methods=['get'],
@@ -163,25 +265,14 @@ class TransactionViewSet(viewsets.ModelViewSet):
         - profit: Net profit (revenu - depense)
         - transaction_count: Total number of transactions
         """
-        queryset = self.get_queryset()
+        def compute():
+            # Read from the daily rollup instead of the full ledger
+            totals = self.get_rollup_queryset().aggregate(**TOTALS)
+            return {**format_totals(totals), 'currency': 'MRU'}
         
-        # Calculate totals
-        totals = queryset.aggregate(
-            total_revenu=Sum('montant', filter=Q(type='REVENU')),
-            total_depense=Sum('montant', filter=Q(type='DEPENSE')),
+        return Response(
+            analytics_cache.get_or_compute('summary', request.query_params, compute)
         )
-        
-        total_revenu = totals['total_revenu'] or 0
-        total_depense = totals['total_depense'] or 0
-        profit = total_revenu - total_depense
-        
-        return Response({
-            'total_revenu': float(total_revenu),
-            'total_depense': float(total_depense),
-            'profit': float(profit),
-            'transaction_count': queryset.count(),
-            'currency': 'MRU',
-        })
     
     @action(
         detail=False,
@@ -195,42 +286,21 @@ class TransactionViewSet(viewsets.ModelViewSet):
         
         Returns transactions grouped by month with aggregations.
         """
-        from django.db.models.functions import TruncMonth
-        from django.db.models import Count
-        
-        queryset = self.get_queryset()
-        
-        # Group by month
-        monthly_data = queryset.annotate(
-            month=TruncMonth('date')
-        ).values('month').annotate(
-            total_revenu=Sum('montant', filter=Q(type='REVENU')),
-            total_depense=Sum('montant', filter=Q(type='DEPENSE')),
-            count=Count('id'),
-        ).order_by('-month')
-        
-        # Format response
-        stats = []
-        for item in monthly_data:
-            month_date = item['month']
-            total_revenu = item['total_revenu'] or 0
-            total_depense = item['total_depense'] or 0
+        def compute():
+            # Group daily rollup rows by month
+            monthly_data = monthly_rows(self.get_rollup_queryset())
             
-            stats.append({
-                'month': month_date.strftime('%Y-%m') if month_date else None,
-                'total_revenu': float(total_revenu),
-                'total_depense': float(total_depense),
-                'profit': float(total_revenu - total_depense),
-                'transaction_count': item['count'],
-            })
+            return {
+                'monthly_stats': [format_month(item) for item in monthly_data],
+                'currency': 'MRU',
+            }
         
-        return Response({
-            'monthly_stats': stats,
-            'currency': 'MRU',
-        })
+        return Response(
+            analytics_cache.get_or_compute('monthly-stats', request.query_params, compute)
+        )
     
     @action(
-        detail=True,
+        detail=False,
         methods=['get'],
         permission_classes=[AllowAny],
         url_path='by-voiture/(?P<voiture_id>[^/.]+)',
@@ -242,32 +312,31 @@ class TransactionViewSet(viewsets.ModelViewSet):
         
         Returns all transactions for a specific vehicle with summary.
         """
-        queryset = self.get_queryset().filter(voiture_id=voiture_id)
+        def compute():
+            queryset = self.get_queryset().filter(voiture_id=voiture_id)
+            
+            if not queryset.exists():
+                return None
+            
+            # values()-based: the rows may come from the LedgerEntry view
+            rows = transaction_list_serializer.values(queryset)
+            
+            # Calculate summary for this vehicle from the daily rollup
+            totals = self.get_rollup_queryset().filter(voiture_id=voiture_id).aggregate(**TOTALS)
+            
+            return {
+                'voiture_id': voiture_id,
+                'transactions': transaction_list_serializer.serialize(rows),
+                'summary': format_totals(totals),
+            }
         
-        if not queryset.exists():
+        data = analytics_cache.get_or_compute(
+            'by-voiture', request.query_params, compute, voiture_id,
+            *analytics_cache.detail_versions()
+        )
+        if data is None:
             return Response(
                 {'detail': 'No transactions found for this vehicle.'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        serializer = self.get_serializer(queryset, many=True)
-        
-        # Calculate summary for this vehicle
-        totals = queryset.aggregate(
-            total_revenu=Sum('montant', filter=Q(type='REVENU')),
-            total_depense=Sum('montant', filter=Q(type='DEPENSE')),
-        )
-        
-        total_revenu = totals['total_revenu'] or 0
-        total_depense = totals['total_depense'] or 0
-        
-        return Response({
-            'voiture_id': voiture_id,
-            'transactions': serializer.data,
-            'summary': {
-                'total_revenu': float(total_revenu),
-                'total_depense': float(total_depense),
-                'profit': float(total_revenu - total_depense),
-                'transaction_count': queryset.count(),
-            },
-        })
+        return Response(data)
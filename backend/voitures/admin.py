@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Voiture
+
+
+@admin.register(Voiture)
+class VoitureAdmin(admin.ModelAdmin):
+    list_display = ('matricule', 'marque', 'modele', 'prix_jour', 'kilometrage', 'statut')
+    list_filter = ('statut', 'marque')
+    # Recherche utilisée aussi par l'autocomplétion des transactions
+    search_fields = ('matricule', 'marque', 'modele')
+    ordering = ('matricule',)
@@ -3,5 +3,15 @@ from .models import Voiture
 from .serializers import VoitureSerializer
 
 class VoitureViewSet(viewsets.ModelViewSet):
-    queryset = Voiture.objects.filter(statut='disponible')
+    queryset = Voiture.objects.all()
     serializer_class = VoitureSerializer
+
+    def get_queryset(self):
+        return Voiture.objects.avec_statut_effectif().filter(
+            statut_effectif='disponible'
+        )
+
+    def perform_update(self, serializer):
+        instance = serializer.save()
+        # L'annotation lue avant la mise à jour n'est plus valable
+        instance.__dict__.pop('statut_effectif', None)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class VoituresConfig(AppConfig):
     name = 'voitures'
+
+    def ready(self):
+        """Invalidation du cache d'utilisation"""
+        import voitures.signals
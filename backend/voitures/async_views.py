@@ -0,0 +1,40 @@
+from django.views.decorators.http import require_GET
+
+from core.async_api import apaginer, non_trouve, reponse_json
+from core.fast_serializers import FastListSerializer
+from .models import Voiture
+from .serializers import VoitureSerializer, voiture_list_serializer
+from .views import lire_periode, voitures_disponibles
+
+# Versions async (ASGI) des lectures : même JSON que les vues @api_view,
+# sans passer par le pool de threads de sync_to_async.
+
+# La recherche de disponibilité renvoie le statut stocké (comme la vue sync)
+voiture_stockee_serializer = FastListSerializer(VoitureSerializer)
+
+
+@require_GET
+async def voiture_list_async(request):
+    voitures = Voiture.objects.avec_statut_effectif()
+    return await apaginer(request, voitures, voiture_list_serializer, ordering=('id',))
+
+
+@require_GET
+async def voiture_detail_async(request, pk):
+    voitures = voiture_list_serializer.values(Voiture.objects.avec_statut_effectif())
+    try:
+        ligne = await voitures.aget(pk=pk)
+    except Voiture.DoesNotExist:
+        return non_trouve(Voiture)
+    return reponse_json(voiture_list_serializer.to_representation(ligne))
+
+
+@require_GET
+async def voiture_disponibles_async(request):
+    debut, fin, erreur = lire_periode(request.GET)
+    if erreur:
+        return reponse_json({'error': erreur}, status=400)
+
+    return await apaginer(
+        request, voitures_disponibles(debut, fin), voiture_stockee_serializer, ordering=('id',)
+    )
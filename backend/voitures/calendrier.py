@@ -0,0 +1,152 @@
+"""
+Calendrier d'occupation de la flotte : matrice booléenne voitures × créneaux.
+
+Les réservations de la fenêtre sont lues en une requête, converties en
+indices de créneaux, puis posées dans la matrice par un tableau de
+différences (+1 au début, -1 après la fin) et une somme cumulée par
+ligne : aucune boucle Python par voiture ni par jour.
+"""
+import base64
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from reservations.models import Reservation, ReservationHistorique
+from .models import Voiture
+
+try:
+    import numpy as np
+except ImportError:  # dépendance optionnelle : l'endpoint répond 501 sans elle
+    np = None
+
+GRANULARITES = {
+    'day': timedelta(days=1),
+    'hour': timedelta(hours=1),
+}
+ENCODAGES = ('bitset', 'rle')
+# Plafond de la matrice (voitures × créneaux), soit ~40 Mo de compteurs int32
+MAX_CELLULES = 10_000_000
+
+
+class CalendrierTropGrand(ValueError):
+    pass
+
+
+def debut_de_creneau(moment, granularite):
+    """Ramène `moment` au début de son créneau (minuit ou heure pleine, heure locale)."""
+    moment = timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+    if granularite == 'day':
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def en_datetime64(moment):
+    """Instant aware -> datetime64[us] UTC (format des dates lues par intervalles())."""
+    return np.datetime64(moment.astimezone(dt_timezone.utc).replace(tzinfo=None), 'us')
+
+
+def intervalles(ids, debut, fin):
+    """
+    Réservations qui chevauchent [debut, fin], en une requête :
+    (ligne de la voiture dans `ids` trié, débuts, fins) en datetime64[us] UTC.
+
+    Les réservations terminées archivées par reservations/nettoyage.py sont
+    lues avec les autres (UNION ALL) : une fenêtre passée garde ses heures.
+    """
+    # Dates lues telles que stockées (texte UTC sous SQLite) et converties
+    # d'un bloc par NumPy : pas de convertisseur datetime Django par ligne
+    colonnes = ('voiture_id', Cast('date_debut', CharField()), Cast('date_fin', CharField()))
+    archivees = ReservationHistorique.objects.filter(
+        voiture__isnull=False, date_fin__gte=debut, date_debut__lte=fin
+    ).values_list(*colonnes)
+    lignes = list(
+        Reservation.objects.chevauchant(debut, fin).values_list(*colonnes)
+        .union(archivees, all=True)
+    )
+    if not lignes:
+        vide = np.array([], dtype='datetime64[us]')
+        return np.array([], dtype=np.int64), vide, vide
+
+    voiture_ids, debuts, fins = zip(*lignes)
+    return (
+        np.searchsorted(ids, np.asarray(voiture_ids, dtype=np.int64)),
+        np.array(debuts, dtype='datetime64[us]'),
+        np.array(fins, dtype='datetime64[us]'),
+    )
+
+
+def remplir(nb_lignes, lignes, debuts, fins, origine, nb_creneaux, pas):
+    """
+    Matrice bool [lignes, créneaux] : un créneau de `pas` compté depuis
+    `origine` (datetime64) est occupé s'il chevauche un intervalle.
+    """
+    matrice = np.zeros((nb_lignes, nb_creneaux), dtype=bool)
+    if not len(lignes) or not nb_lignes:
+        return matrice
+
+    unite = np.timedelta64(pas)
+    debuts = (debuts - origine) / unite
+    fins = (fins - origine) / unite
+
+    # Créneaux [premier, dernier] touchés par chaque intervalle
+    premiers = np.floor(debuts).astype(np.int64)
+    derniers = np.maximum(np.ceil(fins).astype(np.int64) - 1, premiers)
+    premiers = np.maximum(premiers, 0)
+    derniers = np.minimum(derniers, nb_creneaux - 1)
+    garder = premiers <= derniers
+
+    differences = np.zeros((nb_lignes, nb_creneaux + 1), dtype=np.int32)
+    np.add.at(differences, (lignes[garder], premiers[garder]), 1)
+    np.add.at(differences, (lignes[garder], derniers[garder] + 1), -1)
+    np.cumsum(differences[:, :-1], axis=1, out=differences[:, :-1])
+    np.greater(differences[:, :-1], 0, out=matrice)
+    return matrice
+
+
+def occupation(debut, nb_creneaux, pas):
+    """
+    (ids des voitures, matrice bool [voitures, créneaux]) sur la fenêtre
+    [debut, debut + nb_creneaux × pas[.
+
+    Un créneau est occupé s'il chevauche une réservation. Deux requêtes :
+    les voitures, puis les intervalles de la fenêtre.
+    """
+    ids = np.fromiter(
+        Voiture.objects.order_by('id').values_list('id', flat=True), dtype=np.int64
+    )
+    if len(ids) * nb_creneaux > MAX_CELLULES:
+        raise CalendrierTropGrand(
+            f"Fenêtre trop grande : {len(ids)} voitures × {nb_creneaux} créneaux "
+            f"(maximum {MAX_CELLULES} cellules)."
+        )
+    lignes, debuts, fins = intervalles(ids, debut, debut + nb_creneaux * pas)
+    matrice = remplir(len(ids), lignes, debuts, fins, en_datetime64(debut), nb_creneaux, pas)
+    return ids, matrice
+
+
+def en_bitsets(matrice):
+    """Une chaîne base64 par ligne : créneau 0 = bit de poids fort du 1er octet."""
+    octets = np.packbits(matrice, axis=1)
+    return [base64.b64encode(ligne.tobytes()).decode('ascii') for ligne in octets]
+
+
+def plages(matrice):
+    """Suites de True de toute la matrice : (lignes, premiers créneaux, longueurs)."""
+    bords = np.diff(
+        np.pad(matrice.astype(np.int8), ((0, 0), (1, 1))), axis=1
+    )
+    lignes, debuts = np.nonzero(bords == 1)
+    _, fins = np.nonzero(bords == -1)
+    return lignes, debuts, fins - debuts
+
+
+def en_plages(matrice):
+    """Une liste de [premier créneau, longueur] occupés par ligne."""
+    lignes, debuts, longueurs = plages(matrice)
+    coupures = np.searchsorted(lignes, np.arange(1, len(matrice)))
+    return [
+        np.column_stack((d, l)).tolist()
+        for d, l in zip(np.split(debuts, coupures), np.split(longueurs, coupures))
+    ]
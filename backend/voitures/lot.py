@@ -0,0 +1,75 @@
+"""
+Modification en lot de la flotte (PATCH /api/voitures/bulk/) : passer
+de nombreuses voitures en maintenance, ou changer le prix d'un modèle,
+en une seule requête.
+
+Les voitures visées sont lues en une requête, les règles de
+VoitureSerializer.validate sont appliquées à chacune (prix_selon_statut),
+puis les changements sont écrits par UPDATE ensemblistes — un par couple
+(statut, prix_jour) résultant — dans une seule transaction. Le matricule
+n'est pas modifiable en lot : aucun contrôle d'unicité.
+"""
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from core.concurrence import reessayer_si_verrouillee
+from core.versions import incrementer
+from .models import Voiture
+from .serializers import prix_selon_statut
+
+VOITURE_INTROUVABLE = "Voiture introuvable."
+
+
+@reessayer_si_verrouillee
+def modifier_en_lot(modifications, ids=None, filtre=None):
+    """
+    `modifications` : {'statut', 'prix_jour'} validés (l'un ou les deux) ;
+    voitures visées par `ids` ou par `filtre` (critères d'égalité).
+
+    Retourne une ligne par voiture (ordre de la demande, sans doublon) :
+    id, modifiee et motif du refus éventuel. Les voitures refusées ne
+    bloquent pas les autres ; lecture et UPDATE dans la même transaction
+    (rejouée en cas de verrou).
+    """
+    voitures = Voiture.objects.all()
+    if ids is not None:
+        voitures = voitures.filter(pk__in=ids)
+    else:
+        voitures = voitures.filter(**filtre).order_by('pk')
+    actuelles = {
+        pk: (statut, prix_jour)
+        for pk, statut, prix_jour in voitures.values_list('pk', 'statut', 'prix_jour')
+    }
+
+    resultats = []
+    groupes = defaultdict(list)
+    for pk in dict.fromkeys(actuelles if ids is None else ids):
+        ligne = {'id': pk, 'modifiee': False, 'motif': None}
+        resultats.append(ligne)
+
+        if pk not in actuelles:
+            ligne['motif'] = VOITURE_INTROUVABLE
+            continue
+
+        statut, prix_jour = actuelles[pk]
+        nouveau_statut = modifications.get('statut', statut)
+        try:
+            nouveau_prix = prix_selon_statut(
+                nouveau_statut, modifications.get('prix_jour', prix_jour)
+            )
+        except serializers.ValidationError as e:
+            ligne['motif'] = str(e.detail[0])
+            continue
+
+        if (nouveau_statut, nouveau_prix) != (statut, prix_jour):
+            groupes[(nouveau_statut, nouveau_prix)].append(pk)
+            ligne['modifiee'] = True
+
+    for (statut, prix_jour), pks in groupes.items():
+        Voiture.objects.filter(pk__in=pks).update(statut=statut, prix_jour=prix_jour)
+    if groupes:
+        # update() ne déclenche pas post_save
+        incrementer(Voiture)
+
+    return resultats
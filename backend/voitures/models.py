@@ -1,4 +1,61 @@
 from django.db import models
+from django.db.models import Case, Exists, OuterRef, Value, When
+from django.utils.timezone import now
+
+
+class VoitureQuerySet(models.QuerySet):
+
+    def avec_statut_effectif(self, maintenant=None):
+        """
+        Annote `statut_effectif`, calculé en SQL au moment de la lecture :
+        maintenance reste maintenance, une réservation non terminée rend la
+        voiture louée, sinon elle est disponible.
+        """
+        from reservations.models import Reservation
+
+        en_cours = Reservation.objects.filter(
+            voiture=OuterRef('pk'),
+            date_fin__gt=maintenant or now()
+        )
+        return self.annotate(
+            statut_effectif=Case(
+                When(statut='maintenance', then=Value('maintenance')),
+                When(Exists(en_cours), then=Value('louee')),
+                default=Value('disponible'),
+                output_field=models.CharField(),
+            )
+        )
+
+    def prendre(self, pk):
+        """
+        Verrouille la voiture pour une réservation et la marque 'louee',
+        sauf si elle est en maintenance.
+
+        UPDATE ... WHERE statut <> 'maintenance' : première écriture de la
+        transaction, il sérialise les réservations d'une même voiture (verrou
+        de ligne, ou d'écriture sous SQLite) ; le contrôle de chevauchement
+        qui suit, dans la même transaction, fait foi pour les dates. Le statut
+        stocké ('louee' dès qu'une réservation existe, même future) n'entre
+        pas dans la décision. Retourne False si la voiture est en maintenance
+        (ou n'existe pas).
+        """
+        from core.versions import incrementer
+
+        prise = self.filter(pk=pk).exclude(statut='maintenance').update(statut='louee') == 1
+        if prise:
+            # update() ne déclenche pas post_save
+            incrementer(self.model)
+        return prise
+
+    def liberer(self, pk):
+        """Remet une voiture louée à 'disponible' (UPDATE conditionnel)."""
+        from core.versions import incrementer
+
+        liberee = self.filter(pk=pk, statut='louee').update(statut='disponible') == 1
+        if liberee:
+            incrementer(self.model)
+        return liberee
+
 
 class Voiture(models.Model):
     STATUS_CHOICES = [
@@ -21,5 +78,7 @@ class Voiture(models.Model):
     kilometrage = models.IntegerField()
     statut = models.CharField(max_length=20, choices=STATUS_CHOICES, default="disponible")
 
+    objects = VoitureQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.matricule} {self.marque}"
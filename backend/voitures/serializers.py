@@ -1,11 +1,41 @@
 from rest_framework import serializers
+from core.fast_serializers import FastListSerializer
 from .models import Voiture
 
+PRIX_OBLIGATOIRE = "Le prix de jour est obligatoire si la voiture est disponible ou louée"
+
+# Modification en lot (voir voitures/lot.py)
+MAX_LOT = 500
+MODIFIABLES = ("statut", "prix_jour")
+
+
+def prix_selon_statut(statut, prix):
+    """
+    Règles statut / prix d'une voiture (VoitureSerializer.validate et
+    modification en lot) : prix_jour retenu pour ce statut.
+    """
+    if statut == "maintenance":
+        return None
+
+    if statut in ["disponible", "louee"] and prix is None:
+        raise serializers.ValidationError(PRIX_OBLIGATOIRE)
+
+    return prix
+
+
 class VoitureSerializer(serializers.ModelSerializer):
     class Meta:
         model = Voiture
         fields = "__all__"
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Statut calculé à la lecture (voir VoitureQuerySet.avec_statut_effectif)
+        statut_effectif = getattr(instance, 'statut_effectif', None)
+        if statut_effectif is not None:
+            data['statut'] = statut_effectif
+        return data
+
     def validate_matricule(self, value):
         qs = Voiture.objects.filter(matricule=value)
 
@@ -23,13 +53,9 @@ class VoitureSerializer(serializers.ModelSerializer):
         statut = data.get("statut", self.instance.statut if self.instance else None)
         prix = data.get("prix_jour", self.instance.prix_jour if self.instance else None)
 
+        prix = prix_selon_statut(statut, prix)
         if statut == "maintenance":
-            data["prix_jour"] = None
-
-        if statut in ["disponible", "louee"] and prix is None:
-            raise serializers.ValidationError(
-                "Le prix de jour est obligatoire si la voiture est disponible ou louée"
-            )
+            data["prix_jour"] = prix
 
         return data
 
@@ -47,3 +73,44 @@ class VoitureSerializer(serializers.ModelSerializer):
             )
         return value
 
+
+class FiltreLotSerializer(serializers.Serializer):
+    """Voitures visées par PATCH /api/voitures/bulk/ (égalité exacte)"""
+    marque = serializers.CharField(required=False)
+    modele = serializers.CharField(required=False)
+    statut = serializers.ChoiceField(choices=Voiture.STATUS_CHOICES, required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("Le filtre doit contenir au moins un critère.")
+        return data
+
+
+class VoitureLotSerializer(serializers.Serializer):
+    """Corps de PATCH /api/voitures/bulk/ : voitures visées (ids ou filtre) et modifications"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=MAX_LOT
+    )
+    filtre = FiltreLotSerializer(required=False)
+
+    statut = serializers.ChoiceField(choices=Voiture.STATUS_CHOICES, required=False)
+    prix_jour = serializers.DecimalField(
+        max_digits=8, decimal_places=2, allow_null=True, required=False
+    )
+
+    def validate(self, data):
+        if ('ids' in data) == ('filtre' in data):
+            raise serializers.ValidationError("Indiquer soit 'ids', soit 'filtre'.")
+        if not any(champ in data for champ in MODIFIABLES):
+            raise serializers.ValidationError("Aucune modification : 'statut' et/ou 'prix_jour'.")
+        return data
+
+
+# 🔹 Lecture rapide des listes (values()) — même JSON que VoitureSerializer
+#    sur un queryset annoté par avec_statut_effectif()
+voiture_list_serializer = FastListSerializer(
+    VoitureSerializer,
+    custom={
+        'statut': (['statut_effectif'], lambda row: row['statut_effectif']),
+    },
+)
@@ -0,0 +1,63 @@
+"""
+Invalidation du cache d'utilisation (voitures/utilisation.py) : seuls les
+mois touchés par une réservation écrite, ou tous si la flotte change.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from reservations.models import Reservation
+from . import utilisation
+from .models import Voiture
+
+# Champs repris dans le rapport : un changement de statut ou de prix n'y entre pas
+IDENTITE = ('matricule', 'marque', 'modele')
+
+
+@receiver(pre_save, sender=Voiture)
+def memoriser_identite(sender, instance, raw=False, **kwargs):
+    """Valeurs stockées d'une voiture modifiée, comparées après l'enregistrement."""
+    instance._identite_precedente = None
+    if instance.pk and not raw:
+        instance._identite_precedente = Voiture.objects.filter(
+            pk=instance.pk
+        ).values_list(*IDENTITE).first()
+
+
+@receiver(post_save, sender=Voiture)
+def invalider_flotte_modifiee(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    identite = tuple(getattr(instance, champ) for champ in IDENTITE)
+    if created or getattr(instance, '_identite_precedente', None) != identite:
+        utilisation.invalider_flotte()
+
+
+@receiver(post_delete, sender=Voiture)
+def invalider_flotte_supprimee(sender, **kwargs):
+    utilisation.invalider_flotte()
+
+
+@receiver(pre_save, sender=Reservation)
+def memoriser_periode(sender, instance, raw=False, **kwargs):
+    """Période stockée d'une réservation modifiée : ses anciens mois changent aussi."""
+    instance._periode_precedente = None
+    if instance.pk and not raw:
+        instance._periode_precedente = Reservation.objects.filter(
+            pk=instance.pk
+        ).values_list('date_debut', 'date_fin').first()
+
+
+@receiver(post_save, sender=Reservation)
+def invalider_mois_reserves(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    periodes = [(instance.date_debut, instance.date_fin)]
+    precedente = getattr(instance, '_periode_precedente', None)
+    if precedente:
+        periodes.append(precedente)
+    utilisation.invalider_periodes(periodes)
+
+
+@receiver(post_delete, sender=Reservation)
+def invalider_mois_liberes(sender, instance, **kwargs):
+    utilisation.invalider_periodes([(instance.date_debut, instance.date_fin)])
@@ -1,3 +1,580 @@
+import base64
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from reservations.models import Reservation
+from reservations.nettoyage import nettoyer_reservations_expirees
+from transactions.models import DailyFinancialRollup, Transaction
+from transactions.rollups import rebuild
+from .models import Voiture
+from .views import voitures_disponibles
+
+
+class VoitureDisponiblesAPITest(APITestCase):
+    """Test de l'endpoint GET /api/voitures/disponibles/"""
+
+    def setUp(self):
+        """Deux voitures libres, une réservée, une en maintenance"""
+        self.debut = timezone.now() + timedelta(days=10)
+        self.fin = self.debut + timedelta(days=3)
+
+        self.libre = Voiture.objects.create(
+            matricule='DD100001', marque='Kia', modele='Rio',
+            prix_jour=Decimal('90.00'), kilometrage=12000
+        )
+        self.reservee = Voiture.objects.create(
+            matricule='DD100002', marque='Kia', modele='Picanto',
+            prix_jour=Decimal('80.00'), kilometrage=22000
+        )
+        self.maintenance = Voiture.objects.create(
+            matricule='DD100003', marque='Fiat', modele='Tipo',
+            kilometrage=90000, statut='maintenance'
+        )
+        Reservation.objects.create(
+            voiture=self.reservee,
+            nom_client='Client Test',
+            telephone='0600000000',
+            date_debut=self.debut + timedelta(days=1),
+            date_fin=self.debut + timedelta(days=2),
+        )
+
+    def test_voitures_libres_sur_la_periode(self):
+        """Seules les voitures sans chevauchement et hors maintenance sont listées"""
+        response = self.client.get('/api/voitures/disponibles/', {
+            'debut': self.debut.isoformat(),
+            'fin': self.fin.isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [v['id'] for v in response.json()['results']]
+        self.assertEqual(ids, [self.libre.id])
+
+    def test_periode_sans_chevauchement(self):
+        """Une voiture réservée est libre en dehors de sa réservation"""
+        debut = self.fin + timedelta(days=5)
+        response = self.client.get('/api/voitures/disponibles/', {
+            'debut': debut.date().isoformat(),
+            'fin': (debut + timedelta(days=1)).date().isoformat(),
+        })
+        ids = {v['id'] for v in response.json()['results']}
+        self.assertEqual(ids, {self.libre.id, self.reservee.id})
+
+    def test_parametres_obligatoires(self):
+        """debut et fin sont obligatoires et ordonnés"""
+        response = self.client.get('/api/voitures/disponibles/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get('/api/voitures/disponibles/', {
+            'debut': '2026-03-10', 'fin': '2026-03-01',
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_une_seule_requete(self):
+        """La disponibilité de toute la flotte est calculée en une requête"""
+        with self.assertNumQueries(1):
+            list(voitures_disponibles(self.debut, self.fin))
+
+
+class ReservationIntervalleIndexTest(TestCase):
+    """Le plan de requête utilise l'index d'intervalle à 1M de réservations"""
+
+    NB_VOITURES = 1000
+    NB_RESERVATIONS = 1_000_000
+
+    @classmethod
+    def setUpTestData(cls):
+        Voiture.objects.bulk_create([
+            Voiture(
+                matricule=f'IX{i:06d}', marque='Test', modele='Index',
+                prix_jour=Decimal('100.00'), kilometrage=0
+            )
+            for i in range(cls.NB_VOITURES)
+        ])
+        premier_id = Voiture.objects.order_by('id').values_list('id', flat=True)[0]
+
+        # Génération côté SQLite : une réservation de 2 jours tous les 3 jours
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                WITH RECURSIVE seq(n) AS (
+                    SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < %s
+                )
+                INSERT INTO reservations_reservation
+                    (voiture_id, nom_client, telephone, date_debut, date_fin,
+                     prix_total, created_at)
+                SELECT %s + n %% %s, 'client', '0600000000',
+                       datetime('2020-01-01', '+' || (n / %s * 3) || ' days'),
+                       datetime('2020-01-01', '+' || (n / %s * 3 + 2) || ' days'),
+                       200, datetime('now')
+                FROM seq
+                """,
+                [cls.NB_RESERVATIONS - 1, premier_id, cls.NB_VOITURES,
+                 cls.NB_VOITURES, cls.NB_VOITURES]
+            )
+            cursor.execute('ANALYZE')
+
+    def test_index_utilise(self):
+        self.assertEqual(Reservation.objects.count(), self.NB_RESERVATIONS)
+
+        debut = timezone.now() - timedelta(days=400)
+        plan = voitures_disponibles(debut, debut + timedelta(days=7)).explain()
+        self.assertIn('reservation_intervalle_idx', plan)
+
+
+class VoitureStatutEffectifTest(APITestCase):
+    """Le statut de la liste est dérivé à la lecture, sans écriture"""
+
+    def setUp(self):
+        """Une voiture marquée louée dont la réservation est terminée"""
+        maintenant = timezone.now()
+        self.voiture = Voiture.objects.create(
+            matricule='SE000001', marque='Seat', modele='Ibiza',
+            prix_jour=Decimal('110.00'), kilometrage=40000
+        )
+        Reservation.objects.create(
+            voiture=self.voiture,
+            nom_client='Client Test',
+            telephone='0600000000',
+            date_debut=maintenant - timedelta(days=4),
+            date_fin=maintenant - timedelta(days=1),
+        )
+        self.louee = Voiture.objects.create(
+            matricule='SE000002', marque='Seat', modele='Leon',
+            prix_jour=Decimal('130.00'), kilometrage=15000
+        )
+        Reservation.objects.create(
+            voiture=self.louee,
+            nom_client='Client Test',
+            telephone='0600000000',
+            date_debut=maintenant,
+            date_fin=maintenant + timedelta(days=2),
+        )
+
+    def test_liste_lecture_seule(self):
+        """Versions (ETag) puis un SELECT, statut calculé, rien n'est réécrit"""
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/voitures/')
+
+        statuts = {v['matricule']: v['statut'] for v in response.json()['results']}
+        self.assertEqual(statuts, {'SE000001': 'disponible', 'SE000002': 'louee'})
+
+        # Le statut stocké n'a pas été modifié par la lecture
+        self.voiture.refresh_from_db()
+        self.assertEqual(self.voiture.statut, 'louee')
+
+    def test_detail(self):
+        """Le détail expose aussi le statut effectif"""
+        response = self.client.get(f'/api/voitures/{self.voiture.pk}/')
+        self.assertEqual(response.json()['statut'], 'disponible')
+
+
+class VoiturePaginationTest(APITestCase):
+    """Pagination par curseur de GET /api/voitures/"""
+
+    def setUp(self):
+        for i in range(5):
+            Voiture.objects.create(
+                matricule=f'PG00000{i}', marque='Dacia', modele='Logan',
+                prix_jour=Decimal('70.00'), kilometrage=1000 * i
+            )
+
+    def test_parcours_des_pages(self):
+        """Les pages se suivent via 'next' sans doublon ni trou"""
+        url = '/api/voitures/?page_size=2'
+        matricules = []
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data['results']), 2)
+            matricules += [v['matricule'] for v in data['results']]
+            url = data['next']
+
+        self.assertEqual(matricules, [f'PG00000{i}' for i in range(5)])
+
+    def test_mode_all(self):
+        """?page_size=all renvoie la liste complète, sans enveloppe"""
+        data = self.client.get('/api/voitures/', {'page_size': 'all'}).json()
+        self.assertEqual(len(data), 5)
+
+
+class VoitureFastSerializerTest(TestCase):
+    """La lecture rapide produit le même JSON que VoitureSerializer"""
+
+    def test_json_identique(self):
+        from rest_framework.renderers import JSONRenderer
+        from .serializers import VoitureSerializer, voiture_list_serializer
+
+        Voiture.objects.create(
+            matricule='FS000001', marque='Renault', modele='Clio',
+            prix_jour=Decimal('99.90'), kilometrage=1200
+        )
+        Voiture.objects.create(
+            matricule='FS000002', marque='Renault', modele='Kangoo',
+            kilometrage=300000, statut='maintenance'
+        )
+        voitures = Voiture.objects.avec_statut_effectif().order_by('id')
+
+        attendu = JSONRenderer().render(VoitureSerializer(voitures, many=True).data)
+        obtenu = JSONRenderer().render(
+            voiture_list_serializer.serialize(voiture_list_serializer.values(voitures))
+        )
+        self.assertEqual(obtenu, attendu)
+
+
+class VoitureAsyncTest(TestCase):
+    """Lectures async : même JSON que les vues @api_view"""
+
+    def setUp(self):
+        for i in range(5):
+            Voiture.objects.create(
+                matricule=f'AS00000{i}', marque='Kia', modele='Rio',
+                prix_jour=Decimal('80.00'), kilometrage=1000 * i
+            )
+        self.voiture = Voiture.objects.order_by('id').first()
+        maintenant = timezone.now()
+        Reservation.objects.create(
+            voiture=self.voiture, nom_client='Async', telephone='0600000000',
+            date_debut=maintenant - timedelta(days=1), date_fin=maintenant + timedelta(days=1)
+        )
+
+    async def test_liste_complete_identique(self):
+        sync = await self.async_client.get('/api/voitures/', {'page_size': 'all'})
+        reponse = await self.async_client.get('/api/voitures/async/', {'page_size': 'all'})
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse.content, sync.content)
+
+    async def test_parcours_des_pages(self):
+        url = '/api/voitures/async/?page_size=2'
+        matricules = []
+        while url:
+            data = (await self.async_client.get(url)).json()
+            self.assertLessEqual(len(data['results']), 2)
+            matricules += [v['matricule'] for v in data['results']]
+            url = data['next']
+
+        self.assertEqual(matricules, [f'AS00000{i}' for i in range(5)])
+
+    async def test_detail(self):
+        sync = await self.async_client.get(f'/api/voitures/{self.voiture.pk}/')
+        reponse = await self.async_client.get(f'/api/voitures/async/{self.voiture.pk}/')
+        self.assertEqual(reponse.content, sync.content)
+        self.assertEqual(reponse.json()['statut'], 'louee')
+
+        absente = await self.async_client.get('/api/voitures/async/999999/')
+        self.assertEqual(absente.status_code, 404)
+
+    async def test_disponibles(self):
+        params = {'debut': timezone.localdate().isoformat(), 'fin': timezone.localdate().isoformat()}
+        sync = await self.async_client.get('/api/voitures/disponibles/', params)
+        reponse = await self.async_client.get('/api/voitures/async/disponibles/', params)
+        self.assertEqual(reponse.json()['results'], sync.json()['results'])
+        self.assertEqual(len(reponse.json()['results']), 4)
+
+        erreur = await self.async_client.get('/api/voitures/async/disponibles/')
+        self.assertEqual(erreur.status_code, 400)
+
+    async def test_lecture_seule(self):
+        reponse = await self.async_client.post('/api/voitures/async/', {})
+        self.assertEqual(reponse.status_code, 405)
+
+
+class VoitureCalendrierTest(APITestCase):
+    """GET /api/voitures/calendrier/ : matrice d'occupation voitures × créneaux"""
+
+    def setUp(self):
+        self.jour = timezone.localdate() + timedelta(days=30)
+        minuit = timezone.make_aware(datetime.combine(self.jour, time.min))
+        self.occupee = Voiture.objects.create(
+            matricule='CL000001', marque='Kia', modele='Rio',
+            prix_jour=Decimal('90.00'), kilometrage=1000
+        )
+        self.libre = Voiture.objects.create(
+            matricule='CL000002', marque='Kia', modele='Ceed',
+            prix_jour=Decimal('95.00'), kilometrage=2000
+        )
+        # Du jour 1 à 10h au jour 3 à 9h (fenêtre de 7 jours)
+        Reservation.objects.create(
+            voiture=self.occupee, nom_client='Client Test', telephone='0600000000',
+            date_debut=minuit + timedelta(days=1, hours=10),
+            date_fin=minuit + timedelta(days=3, hours=9),
+        )
+
+    def params(self, **kwargs):
+        return {
+            'from': self.jour.isoformat(),
+            'to': (self.jour + timedelta(days=6)).isoformat(),
+            **kwargs,
+        }
+
+    def test_bitsets_par_jour(self):
+        """Un bit par jour, 'to' inclus, une ligne par voiture dans l'ordre des id"""
+        data = self.client.get('/api/voitures/calendrier/', self.params()).json()
+
+        self.assertEqual(data['slots'], 7)
+        self.assertEqual([ligne['id'] for ligne in data['results']],
+                         [self.occupee.id, self.libre.id])
+        bits = [
+            format(base64.b64decode(ligne['occupation'])[0], '08b')[:7]
+            for ligne in data['results']
+        ]
+        self.assertEqual(bits, ['0111000', '0000000'])
+
+    def test_plages_par_heure(self):
+        """En RLE horaire : [premier créneau, longueur] de 10h à 9h (heure exclue)"""
+        data = self.client.get('/api/voitures/calendrier/', self.params(
+            granularity='hour', encoding='rle'
+        )).json()
+
+        self.assertEqual(data['slots'], 7 * 24)
+        self.assertEqual(data['results'][0]['occupation'], [[24 + 10, 47]])
+        self.assertEqual(data['results'][1]['occupation'], [])
+
+    def test_parametres_invalides(self):
+        """from/to obligatoires et ordonnés, granularité et encodage connus"""
+        for params in (
+            {},
+            self.params(granularity='week'),
+            self.params(encoding='json'),
+            {'from': '2026-03-10', 'to': '2026-03-01'},
+            {'from': '2026-13-01', 'to': '2026-14-01'},
+        ):
+            response = self.client.get('/api/voitures/calendrier/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_trois_requetes(self):
+        """Versions (ETag), voitures, intervalles : aucune requête par voiture"""
+        with self.assertNumQueries(3):
+            self.client.get('/api/voitures/calendrier/', self.params())
+
+
+class VoitureUtilisationTest(APITestCase):
+    """GET /api/voitures/utilisation/ : taux, revenu par jour et inactivité par mois"""
+
+    def setUp(self):
+        caches['analytics'].clear()
+        courant = timezone.localdate().replace(day=1)
+        self.mois = (courant - timedelta(days=1)).replace(day=1)
+        self.jours = (courant - self.mois).days
+        minuit = timezone.make_aware(datetime.combine(self.mois, time.min))
+
+        self.rio = Voiture.objects.create(
+            matricule='UT000001', marque='Kia', modele='Rio',
+            prix_jour=Decimal('90.00'), kilometrage=1000
+        )
+        self.rio_libre = Voiture.objects.create(
+            matricule='UT000002', marque='Kia', modele='Rio',
+            prix_jour=Decimal('90.00'), kilometrage=2000
+        )
+        self.clio = Voiture.objects.create(
+            matricule='UT000003', marque='Renault', modele='Clio',
+            prix_jour=Decimal('80.00'), kilometrage=3000
+        )
+        # 4 jours loués à partir du 5 du mois, plus une réservation à cheval
+        # sur le mois précédent (seul le 1er jour du mois compte)
+        Reservation.objects.bulk_create([
+            Reservation(
+                voiture=self.rio, nom_client='Client Test', telephone='0600000000',
+                date_debut=minuit + timedelta(days=4), date_fin=minuit + timedelta(days=8),
+            ),
+            Reservation(
+                voiture=self.clio, nom_client='Client Test', telephone='0600000000',
+                date_debut=minuit - timedelta(days=2), date_fin=minuit + timedelta(days=1),
+            ),
+        ])
+        DailyFinancialRollup.objects.create(
+            day=self.mois + timedelta(days=4), type='REVENU', voiture=self.rio,
+            total=Decimal('360.00'), count=1,
+        )
+
+    def get(self):
+        mois = f'{self.mois:%Y-%m}'
+        return self.client.get('/api/voitures/utilisation/', {'from': mois, 'to': mois})
+
+    def test_indicateurs_par_voiture_et_groupe(self):
+        data = self.get().json()
+        self.assertEqual(len(data['mois']), 1)
+        mois = data['mois'][0]
+        self.assertTrue(mois['clos'])
+        self.assertEqual([(g['marque'], g['modele']) for g in mois['groupes']],
+                         [('Kia', 'Rio'), ('Renault', 'Clio')])
+
+        rio, clio = mois['groupes']
+        heures = self.jours * 24
+        self.assertEqual(rio['heures_louees'], 96.0)
+        self.assertEqual(rio['heures_disponibles'], 2 * heures)
+        self.assertEqual(rio['taux_utilisation'], round(96 / (2 * heures), 4))
+        self.assertEqual(rio['revenu'], 360.0)
+        self.assertEqual(rio['revenu_par_jour_disponible'], round(360 / (2 * self.jours), 2))
+        # La voiture jamais louée est inactive tout le mois
+        self.assertEqual(rio['inactivite_max_jours'], self.jours)
+
+        loue, libre = rio['voitures']
+        self.assertEqual(loue['id'], self.rio.id)
+        self.assertEqual(loue['revenu_par_jour_disponible'], round(360 / self.jours, 2))
+        self.assertEqual(loue['inactivite_max_jours'], self.jours - 8)
+        self.assertEqual(libre['heures_louees'], 0.0)
+
+        # Réservation rognée au début du mois
+        self.assertEqual(clio['heures_louees'], 24.0)
+        self.assertEqual(clio['voitures'][0]['inactivite_max_jours'], self.jours - 1)
+
+    def test_mois_clos_en_cache(self):
+        """Un mois clos est calculé une fois, puis servi sans requête SQL"""
+        premiere = self.get().json()
+        with self.assertNumQueries(0):
+            seconde = self.get().json()
+        self.assertEqual(seconde, premiere)
+
+    def test_cache_invalide_par_les_ecritures(self):
+        """Réservation supprimée ou revenu ajouté : le mois clos est recalculé"""
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            Reservation.objects.filter(voiture=self.rio).delete()
+        rio = self.get().json()['mois'][0]['groupes'][0]
+        self.assertEqual(rio['heures_louees'], 0.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                type='REVENU', montant=Decimal('40.00'), voiture=self.rio,
+                description='Revenu antidaté',
+            )
+            Transaction.objects.filter(description='Revenu antidaté').update(
+                date=timezone.make_aware(datetime.combine(self.mois, time(12)))
+            )
+            rebuild()
+        rio = self.get().json()['mois'][0]['groupes'][0]
+        self.assertEqual(rio['revenu'], 40.0)
+
+    def test_ecritures_du_mois_courant(self):
+        """Réservation et revenu du mois courant : le mois clos reste en cache"""
+        premiere = self.get().json()
+        with self.captureOnCommitCallbacks(execute=True):
+            Reservation.objects.create(
+                voiture=self.rio_libre, nom_client='Client Neuf', telephone='0600000001',
+                date_debut=timezone.now() + timedelta(days=1),
+                date_fin=timezone.now() + timedelta(days=2),
+            )
+            Transaction.objects.create(
+                type='REVENU', montant=Decimal('90.00'), voiture=self.rio_libre,
+            )
+            Voiture.objects.filter(pk=self.clio.pk).update(statut='louee')
+            self.clio.kilometrage = 3500
+            self.clio.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().json(), premiere)
+
+        # Voiture renommée : tous les mois sont recalculés
+        with self.captureOnCommitCallbacks(execute=True):
+            self.clio.modele = 'Clio V'
+            self.clio.save()
+        groupes = self.get().json()['mois'][0]['groupes']
+        self.assertEqual(groupes[1]['modele'], 'Clio V')
+
+    def test_reservations_archivees(self):
+        """Le nettoyage archive les réservations terminées : les heures restent"""
+        premiere = self.get().json()
+        nettoyer_reservations_expirees()
+        self.assertFalse(Reservation.objects.exists())
+        caches['analytics'].clear()
+        self.assertEqual(self.get().json(), premiere)
+
+    def test_periode_invalide(self):
+        for params in (
+            {'from': '2026-13', 'to': '2026-12'},
+            {'from': '2026-05', 'to': '2026-01'},
+            {'to': f'{timezone.localdate() + timedelta(days=40):%Y-%m}'},
+            {'from': '2020-01', 'to': '2026-01'},
+        ):
+            response = self.client.get('/api/voitures/utilisation/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_douze_derniers_mois_par_defaut(self):
+        data = self.client.get('/api/voitures/utilisation/').json()
+        self.assertEqual(len(data['mois']), 12)
+        self.assertEqual(data['to'], f'{timezone.localdate():%Y-%m}')
+        self.assertFalse(data['mois'][-1]['clos'])
+
+
+class VoitureLotTest(APITestCase):
+    """Test de PATCH /api/voitures/bulk/"""
+
+    def setUp(self):
+        """Trois Yaris disponibles, une Rio en maintenance"""
+        self.yaris = [
+            Voiture.objects.create(
+                matricule=f'LT10000{i}', marque='Toyota', modele='Yaris',
+                prix_jour=Decimal('100.00'), kilometrage=10000
+            )
+            for i in range(3)
+        ]
+        self.rio = Voiture.objects.create(
+            matricule='LT200000', marque='Kia', modele='Rio',
+            kilometrage=50000, statut='maintenance'
+        )
+
+    def patch(self, corps):
+        return self.client.patch('/api/voitures/bulk/', corps, format='json')
+
+    def test_maintenance_par_ids(self):
+        """Mise en maintenance : prix_jour à null, un seul UPDATE, ETag modifié"""
+        etag = self.client.get('/api/voitures/')['ETag']
+        ids = [self.yaris[0].pk, self.yaris[1].pk, 999999]
+
+        with CaptureQueriesContext(connection) as requetes:
+            reponse = self.patch({'ids': ids, 'statut': 'maintenance'})
+        self.assertEqual(reponse.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(r['id'], r['modifiee'], r['motif']) for r in reponse.json()['resultats']],
+            [(ids[0], True, None), (ids[1], True, None), (999999, False, "Voiture introuvable.")]
+        )
+        self.assertEqual(
+            sum(q['sql'].startswith('UPDATE "voitures_voiture"') for q in requetes.captured_queries), 1
+        )
+
+        self.yaris[0].refresh_from_db()
+        self.assertEqual((self.yaris[0].statut, self.yaris[0].prix_jour), ('maintenance', None))
+        self.yaris[2].refresh_from_db()
+        self.assertEqual(self.yaris[2].statut, 'disponible')
+        self.assertNotEqual(self.client.get('/api/voitures/')['ETag'], etag)
+
+    def test_prix_par_filtre(self):
+        """Changement de prix de toute une gamme"""
+        reponse = self.patch({
+            'filtre': {'marque': 'Toyota', 'modele': 'Yaris'}, 'prix_jour': '120.00'
+        })
+        self.assertEqual(reponse.json()['modifiees'], 3)
+        self.assertEqual(
+            set(Voiture.objects.filter(prix_jour=Decimal('120.00')).values_list('pk', flat=True)),
+            {voiture.pk for voiture in self.yaris}
+        )
+
+    def test_regles_par_voiture(self):
+        """Règles de VoitureSerializer.validate appliquées voiture par voiture"""
+        # Prix ignoré en maintenance : la Rio est inchangée
+        reponse = self.patch({'ids': [self.rio.pk, self.yaris[0].pk], 'prix_jour': '90.00'})
+        self.assertEqual(
+            [r['modifiee'] for r in reponse.json()['resultats']], [False, True]
+        )
+
+        # Remise en service sans prix : refusée
+        reponse = self.patch({'ids': [self.rio.pk], 'statut': 'disponible'})
+        self.assertEqual(reponse.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('prix de jour est obligatoire', reponse.json()['resultats'][0]['motif'])
+        self.rio.refresh_from_db()
+        self.assertEqual(self.rio.statut, 'maintenance')
 
-# Create your tests here.
+    def test_corps_invalide(self):
+        ids = [self.yaris[0].pk]
+        for corps in (
+            {'ids': ids},
+            {'ids': ids, 'filtre': {'marque': 'Toyota'}, 'statut': 'maintenance'},
+            {'filtre': {}, 'statut': 'maintenance'},
+            {'ids': ids, 'statut': 'inconnu'},
+        ):
+            self.assertEqual(self.patch(corps).status_code, status.HTTP_400_BAD_REQUEST)
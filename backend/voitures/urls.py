@@ -1,9 +1,18 @@
 from django.urls import path
 from . import views
-from .views import voiture_list_api, voiture_detail_api
+from .views import voiture_list_api, voiture_detail_api, voiture_disponibles_api, voiture_calendrier_api, voiture_utilisation_api, voiture_bulk_api
+from .async_views import voiture_list_async, voiture_detail_async, voiture_disponibles_async
 
 urlpatterns = [
     
     path('', voiture_list_api),
+    path('disponibles/', voiture_disponibles_api),
+    path('calendrier/', voiture_calendrier_api),
+    path('utilisation/', voiture_utilisation_api),
+    path('bulk/', voiture_bulk_api),
     path('<int:pk>/', voiture_detail_api),
+    # Lectures async (ASGI)
+    path('async/', voiture_list_async),
+    path('async/disponibles/', voiture_disponibles_async),
+    path('async/<int:pk>/', voiture_detail_async),
 ]
@@ -0,0 +1,209 @@
+"""
+Utilisation de la flotte par voiture, par marque/modèle et par mois.
+
+- heures louées : intervalles de réservation rognés aux bornes de chaque
+  mois (matrice réservations × mois) et sommés par voiture, en NumPy ;
+- plus longue inactivité : plus longue suite de jours sans location, lue
+  sur la matrice d'occupation du calendrier ;
+- revenu : lignes REVENU de DailyFinancialRollup, par voiture et par mois.
+
+Un mois clos est gardé en cache sans expiration sous une clé qui ne
+contient que ce qui peut le changer, trois compteurs de génération :
+- la flotte : voiture ajoutée, supprimée ou renommée (voitures/signals.py) ;
+- les réservations du mois : réservation créée, déplacée ou supprimée
+  sur une période qui touche le mois (voitures/signals.py) ;
+- les agrégats du mois : écriture du rollup sur un de ses jours
+  (transactions/rollups.py, transactions.cache.bump_months).
+Une nouvelle réservation ou un revenu du jour n'évincent donc pas les
+mois clos ; une réservation corrigée ou un revenu antidaté rendent
+inaccessible la seule entrée de leur mois (elle sort ensuite du cache
+LRU). Le mois en cours (rogné à maintenant) est toujours recalculé.
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.cache import caches
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from transactions import cache as analytics_cache
+from transactions.models import DailyFinancialRollup
+from . import calendrier
+from .calendrier import np
+from .models import Voiture
+
+CACHE_ALIAS = 'analytics'
+PREFIXE_CLE = 'voitures:utilisation'
+CLE_FLOTTE = f'{PREFIXE_CLE}:flotte'
+CLE_RESERVATIONS = PREFIXE_CLE + ':reservations:{:%Y-%m}'
+MAX_MOIS = 36
+JOUR = timedelta(days=1)
+
+
+def mois_suivant(mois):
+    return (mois.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def mois_entre(premier, dernier):
+    """Premiers jours des mois de `premier` à `dernier` inclus."""
+    mois = []
+    while premier <= dernier:
+        mois.append(premier)
+        premier = mois_suivant(premier)
+    return mois
+
+
+def mois_de(moment):
+    """Premier jour du mois local de `moment`."""
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return timezone.localdate(moment).replace(day=1)
+
+
+def cles(mois):
+    """{mois: clé courante} (un get_many des compteurs, aucune requête SQL)."""
+    reservations = [CLE_RESERVATIONS.format(m) for m in mois]
+    revenus = analytics_cache.month_keys(mois)
+    generations = analytics_cache.generations([CLE_FLOTTE, *reservations, *revenus])
+    flotte = generations[CLE_FLOTTE]
+    return {
+        m: f'{PREFIXE_CLE}:{flotte}:{generations[r]}:{generations[v]}:{m:%Y-%m}'
+        for m, r, v in zip(mois, reservations, revenus)
+    }
+
+
+def invalider_flotte():
+    """Tous les mois : la liste des voitures a changé."""
+    analytics_cache.bump([CLE_FLOTTE])
+
+
+def invalider_periodes(periodes):
+    """Mois touchés par les périodes [debut, fin] de réservations écrites."""
+    mois = set()
+    for debut, fin in periodes:
+        mois.update(mois_entre(mois_de(debut), mois_de(fin)))
+    analytics_cache.bump(CLE_RESERVATIONS.format(m) for m in sorted(mois))
+
+
+def rapport(premier, dernier):
+    """[{'mois': 'YYYY-MM', 'clos': bool, 'groupes': [...]}] de `premier` à `dernier`."""
+    cache = caches[CACHE_ALIAS]
+    courant = timezone.localdate().replace(day=1)
+    mois = mois_entre(premier, dernier)
+
+    clos = [m for m in mois if m < courant]
+    cle = cles(clos)
+    en_cache = cache.get_many(list(cle.values()))
+    resultats = {m: en_cache[cle[m]] for m in clos if cle[m] in en_cache}
+
+    manquants = [m for m in mois if m not in resultats]
+    if manquants:
+        calcules = calculer(manquants[0], manquants[-1])
+        for m in manquants:
+            resultats[m] = calcules[m]
+        cache.set_many(
+            {cle[m]: calcules[m] for m in manquants if m < courant}, timeout=None
+        )
+
+    return [
+        {'mois': f'{m:%Y-%m}', 'clos': m < courant, 'groupes': resultats[m]}
+        for m in mois
+    ]
+
+
+def calculer(premier, dernier):
+    """{mois: groupes} pour tous les mois de `premier` à `dernier` (trois requêtes)."""
+    mois = mois_entre(premier, dernier)
+    voitures = list(
+        Voiture.objects.order_by('id').values_list('id', 'matricule', 'marque', 'modele')
+    )
+    if not voitures:
+        return {m: [] for m in mois}
+    ids = np.array([v[0] for v in voitures], dtype=np.int64)
+
+    # Bornes des mois (la dernière rognée à maintenant pour le mois en cours)
+    bornes = [timezone.make_aware(datetime.combine(m, time.min)) for m in mois]
+    bornes.append(min(
+        timezone.make_aware(datetime.combine(mois_suivant(dernier), time.min)),
+        timezone.now(),
+    ))
+    bornes64 = np.array([calendrier.en_datetime64(b) for b in bornes])
+    lignes, debuts, fins = calendrier.intervalles(ids, bornes[0], bornes[-1])
+
+    # Heures louées : chaque réservation rognée à chaque mois
+    heure = np.timedelta64(1, 'h')
+    chevauchement = (
+        np.minimum(fins[:, None], bornes64[None, 1:])
+        - np.maximum(debuts[:, None], bornes64[None, :-1])
+    )
+    louees = np.zeros((len(ids), len(mois)))
+    np.add.at(louees, lignes, np.clip(chevauchement / heure, 0, None))
+    disponibles = np.maximum(np.diff(bornes64) / heure, 0)
+
+    # Plus longue inactivité : suites de jours libres, mois par mois
+    colonnes = np.ceil((bornes64 - bornes64[0]) / np.timedelta64(JOUR)).astype(np.int64)
+    occupe = calendrier.remplir(
+        len(ids), lignes, debuts, fins, bornes64[0], int(colonnes[-1]), JOUR
+    )
+    inactivite = np.zeros((len(ids), len(mois)), dtype=np.int64)
+    for k in range(len(mois)):
+        libres_lignes, _, longueurs = calendrier.plages(~occupe[:, colonnes[k]:colonnes[k + 1]])
+        np.maximum.at(inactivite[:, k], libres_lignes, longueurs)
+
+    # Revenu par voiture et par mois (rollup quotidien)
+    revenus = np.zeros((len(ids), len(mois)))
+    index_mois = {m: k for k, m in enumerate(mois)}
+    for ligne in DailyFinancialRollup.objects.filter(
+        type='REVENU', voiture__isnull=False,
+        day__gte=mois[0], day__lt=mois_suivant(dernier),
+    ).annotate(mois=TruncMonth('day')).values('voiture_id', 'mois').annotate(total=Sum('total')):
+        rang = np.searchsorted(ids, ligne['voiture_id'])
+        if rang < len(ids) and ids[rang] == ligne['voiture_id']:
+            revenus[rang, index_mois[ligne['mois']]] = float(ligne['total'])
+
+    # Groupes marque/modèle
+    groupes = sorted({(marque, modele) for _, _, marque, modele in voitures})
+    rang_groupe = {groupe: g for g, groupe in enumerate(groupes)}
+    groupe_de = np.array([rang_groupe[(marque, modele)] for _, _, marque, modele in voitures])
+    membres = [np.flatnonzero(groupe_de == g) for g in range(len(groupes))]
+    effectifs = np.bincount(groupe_de, minlength=len(groupes))
+
+    resultats = {}
+    for k, m in enumerate(mois):
+        heures_groupe = np.bincount(groupe_de, weights=louees[:, k], minlength=len(groupes))
+        revenu_groupe = np.bincount(groupe_de, weights=revenus[:, k], minlength=len(groupes))
+        inactivite_groupe = np.zeros(len(groupes), dtype=np.int64)
+        np.maximum.at(inactivite_groupe, groupe_de, inactivite[:, k])
+
+        resultats[m] = [
+            {
+                'marque': marque,
+                'modele': modele,
+                **indicateurs(
+                    heures_groupe[g], disponibles[k] * effectifs[g],
+                    revenu_groupe[g], inactivite_groupe[g],
+                ),
+                'voitures': [
+                    {
+                        'id': voitures[i][0],
+                        'matricule': voitures[i][1],
+                        **indicateurs(louees[i, k], disponibles[k], revenus[i, k], inactivite[i, k]),
+                    }
+                    for i in membres[g]
+                ],
+            }
+            for g, (marque, modele) in enumerate(groupes)
+        ]
+    return resultats
+
+
+def indicateurs(louees, disponibles, revenu, inactivite):
+    jours = disponibles / 24
+    return {
+        'heures_louees': round(float(louees), 1),
+        'heures_disponibles': round(float(disponibles), 1),
+        'taux_utilisation': round(float(louees / disponibles), 4) if disponibles else 0.0,
+        'revenu': round(float(revenu), 2),
+        'revenu_par_jour_disponible': round(float(revenu / jours), 2) if jours else 0.0,
+        'inactivite_max_jours': int(inactivite),
+    }
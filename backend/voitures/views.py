@@ -1,27 +1,38 @@
+import math
+from datetime import date, datetime, time
+
+from django.db.models import Exists, OuterRef
 from django.shortcuts import render, redirect, get_object_or_404
-from django.utils.timezone import now
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from reservations.models import Reservation
 from .models import Voiture
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import VoitureSerializer
+from core.pagination import paginer
+from core.versions import liste_conditionnelle
+from . import calendrier, lot, utilisation
+from .serializers import MODIFIABLES, VoitureLotSerializer, VoitureSerializer, voiture_list_serializer
+
+
+def derniere_echeance():
+    """
+    Dernière fin de réservation déjà passée : le statut effectif change à
+    chaque échéance, sans aucune écriture (lecture via reservation_date_fin_idx).
+    """
+    return Reservation.objects.filter(
+        date_fin__lte=timezone.now()
+    ).order_by('-date_fin').values_list('date_fin', flat=True)
 
 
+@liste_conditionnelle(Voiture, Reservation, horloge=derniere_echeance)
 @api_view(['GET', 'POST'])
 def voiture_list_api(request):
     if request.method == 'GET':
-        current_time = now()
-
-        for r in Reservation.objects.all():
-            if r.date_fin <= current_time:
-                voiture = r.voiture
-                voiture.statut = "disponible"
-                voiture.save()
-
-        voitures = Voiture.objects.all()
-        serializer = VoitureSerializer(voitures, many=True)
-        return Response(serializer.data)
+        # Lecture seule : le statut est dérivé en SQL, aucune écriture
+        voitures = Voiture.objects.avec_statut_effectif()
+        return paginer(request, voitures, voiture_list_serializer, ordering='id')
 
     if request.method == 'POST':
         serializer = VoitureSerializer(data=request.data)
@@ -31,9 +42,226 @@ def voiture_list_api(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _parse_moment(valeur, fin=False):
+    """Accepte une date (YYYY-MM-DD) ou une date-heure ISO."""
+    # La date seule d'abord : parse_datetime l'accepte aussi (minuit), ce qui
+    # exclurait le dernier jour d'une période 'fin'
+    try:
+        jour = parse_date(valeur)
+        moment = None if jour else parse_datetime(valeur)
+    except ValueError:  # bien formée mais invalide (ex. 2026-13-01)
+        return None
+    if jour is not None:
+        moment = datetime.combine(jour, time.max if fin else time.min)
+    elif moment is None:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def voitures_disponibles(debut, fin):
+    """
+    Voitures libres sur toute la période [debut, fin].
+
+    Anti-jointure (NOT EXISTS) sur les réservations qui chevauchent la
+    période : une seule requête, servie par reservation_intervalle_idx.
+    """
+    chevauchements = Reservation.objects.filter(
+        voiture=OuterRef('pk')
+    ).chevauchant(debut, fin)
+
+    return Voiture.objects.exclude(statut='maintenance').filter(
+        ~Exists(chevauchements)
+    )
+
+
+def lire_periode(params):
+    """(debut, fin, erreur) à partir des paramètres 'debut' et 'fin'."""
+    debut = params.get('debut')
+    fin = params.get('fin')
+
+    if not debut or not fin:
+        return None, None, "Les paramètres 'debut' et 'fin' sont obligatoires."
+
+    debut = _parse_moment(debut)
+    fin = _parse_moment(fin, fin=True)
+
+    if debut is None or fin is None:
+        return None, None, "Format de date invalide (YYYY-MM-DD ou ISO 8601)."
+
+    if fin < debut:
+        return None, None, "La date de fin doit être après la date de début."
+
+    return debut, fin, None
+
+
+@api_view(['GET'])
+def voiture_disponibles_api(request):
+    debut, fin, erreur = lire_periode(request.query_params)
+    if erreur:
+        return Response({'error': erreur}, status=status.HTTP_400_BAD_REQUEST)
+
+    return paginer(
+        request, voitures_disponibles(debut, fin), VoitureSerializer, ordering='id'
+    )
+
+
+@liste_conditionnelle(Voiture, Reservation)
+@api_view(['GET'])
+def voiture_calendrier_api(request):
+    """
+    GET /api/voitures/calendrier/?from=&to=&granularity=day|hour&encoding=bitset|rle
+
+    Occupation de toute la flotte, une ligne par voiture (ordre des id) :
+    - bitset : chaîne base64, un bit par créneau (bit de poids fort en premier)
+    - rle : liste de [premier créneau, nombre de créneaux] occupés
+
+    'to' est inclus quand c'est une date (YYYY-MM-DD).
+    """
+    if calendrier.np is None:
+        return Response({'error': "NumPy est requis pour le calendrier."},
+                        status=status.HTTP_501_NOT_IMPLEMENTED)
+
+    params = request.query_params
+    granularite = params.get('granularity', 'day')
+    encodage = params.get('encoding', 'bitset')
+    if granularite not in calendrier.GRANULARITES:
+        return Response({'error': "granularity doit valoir 'day' ou 'hour'."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if encodage not in calendrier.ENCODAGES:
+        return Response({'error': "encoding doit valoir 'bitset' ou 'rle'."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    if not params.get('from') or not params.get('to'):
+        return Response({'error': "Les paramètres 'from' et 'to' sont obligatoires."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    debut = _parse_moment(params['from'])
+    fin = _parse_moment(params['to'], fin=True)
+    if debut is None or fin is None:
+        return Response({'error': "Format de date invalide (YYYY-MM-DD ou ISO 8601)."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if fin < debut:
+        return Response({'error': "La date de fin doit être après la date de début."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    pas = calendrier.GRANULARITES[granularite]
+    debut = calendrier.debut_de_creneau(debut, granularite)
+    nb_creneaux = max(1, math.ceil((fin - debut) / pas))
+
+    try:
+        ids, matrice = calendrier.occupation(debut, nb_creneaux, pas)
+    except calendrier.CalendrierTropGrand as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if encodage == 'rle':
+        lignes = calendrier.en_plages(matrice)
+    else:
+        lignes = calendrier.en_bitsets(matrice)
+
+    return Response({
+        'from': debut,
+        'to': debut + nb_creneaux * pas,
+        'granularity': granularite,
+        'slots': nb_creneaux,
+        'encoding': encodage,
+        'results': [
+            {'id': voiture_id, 'occupation': ligne}
+            for voiture_id, ligne in zip(ids.tolist(), lignes)
+        ],
+    })
+
+
+def _parse_mois(valeur):
+    """'YYYY-MM' -> premier jour du mois, ou None."""
+    try:
+        return parse_date(f'{valeur}-01')
+    except ValueError:
+        return None
+
+
+@api_view(['GET'])
+def voiture_utilisation_api(request):
+    """
+    GET /api/voitures/utilisation/?from=YYYY-MM&to=YYYY-MM
+
+    Par mois, puis par marque/modèle et par voiture : heures louées /
+    heures disponibles, revenu par jour disponible et plus longue
+    inactivité (jours). Par défaut, les 12 derniers mois (mois en cours inclus).
+    """
+    if calendrier.np is None:
+        return Response({'error': "NumPy est requis pour l'utilisation de la flotte."},
+                        status=status.HTTP_501_NOT_IMPLEMENTED)
+
+    courant = timezone.localdate().replace(day=1)
+    dernier = _parse_mois(request.query_params['to']) if request.query_params.get('to') else courant
+    if request.query_params.get('from'):
+        premier = _parse_mois(request.query_params['from'])
+    elif dernier:
+        premier = date(dernier.year - (dernier.month < 12), dernier.month % 12 + 1, 1)
+    else:
+        premier = None
+
+    if premier is None or dernier is None:
+        return Response({'error': "Format de mois invalide (YYYY-MM)."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if dernier < premier or dernier > courant:
+        return Response({'error': "Période invalide : 'from' <= 'to' <= mois en cours."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if len(utilisation.mois_entre(premier, dernier)) > utilisation.MAX_MOIS:
+        return Response({'error': f"{utilisation.MAX_MOIS} mois au maximum."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'from': f'{premier:%Y-%m}',
+        'to': f'{dernier:%Y-%m}',
+        'mois': utilisation.rapport(premier, dernier),
+    })
+
+
+@api_view(['PATCH'])
+def voiture_bulk_api(request):
+    """
+    PATCH /api/voitures/bulk/
+
+    Corps : {"ids": [...]} (500 au plus) ou {"filtre": {"marque", "modele",
+    "statut"}}, plus les modifications "statut" et/ou "prix_jour".
+
+    Mêmes règles que PUT /api/voitures/<pk>/ (prix_jour mis à null en
+    maintenance, obligatoire sinon), voiture par voiture. Renvoie une
+    ligne par voiture : id, modifiee, motif.
+    """
+    serializer = VoitureLotSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    donnees = serializer.validated_data
+    resultats = lot.modifier_en_lot(
+        {champ: donnees[champ] for champ in MODIFIABLES if champ in donnees},
+        ids=donnees.get('ids'),
+        filtre=donnees.get('filtre'),
+    )
+    refusees = sum(1 for ligne in resultats if ligne['motif'])
+
+    return Response(
+        {
+            'modifiees': sum(1 for ligne in resultats if ligne['modifiee']),
+            'refusees': refusees,
+            'resultats': resultats,
+        },
+        # 400 seulement si aucune voiture n'a pu être traitée
+        status=status.HTTP_400_BAD_REQUEST if resultats and refusees == len(resultats)
+        else status.HTTP_200_OK
+    )
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
 def voiture_detail_api(request, pk):
-    voiture = get_object_or_404(Voiture, pk=pk)
+    # Statut effectif pour la lecture ; les écritures renvoient le statut stocké
+    voitures = Voiture.objects.all()
+    if request.method == 'GET':
+        voitures = voitures.avec_statut_effectif()
+    voiture = get_object_or_404(voitures, pk=pk)
 
     if request.method == 'GET':
         serializer = VoitureSerializer(voiture)
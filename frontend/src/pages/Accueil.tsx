@@ -9,6 +9,9 @@ import {
   Legend,
 } from "chart.js";
 import { Line } from "react-chartjs-2";
+import { useEffect, useState } from "react";
+import { getDashboard } from "../services/dashboardService";
+import type { Dashboard } from "../types/Dashboard";
 import "./style.css";
 ChartJS.register(
   CategoryScale,
@@ -21,9 +24,18 @@ ChartJS.register(
 );
 
 function Accueil() {
-  const revenus = 12000;
-  const depenses = 5000;
-  const profit = revenus - depenses;
+  const [dashboard, setDashboard] = useState<Dashboard | null>(null);
+  const [erreur, setErreur] = useState("");
+
+  useEffect(() => {
+    getDashboard()
+      .then(setDashboard)
+      .catch((e: Error) => setErreur(e.message));
+  }, []);
+
+  const revenus = dashboard?.revenus ?? 0;
+  const depenses = dashboard?.depenses ?? 0;
+  const profit = dashboard?.profit ?? 0;
 
   const data = {
     labels: ["Jan", "Feb", "Mar"],
@@ -62,6 +74,8 @@ function Accueil() {
         </p>
       </div>
 
+      {erreur && <div className="alert alert-danger">{erreur}</div>}
+
       {/* STATS CARDS */}
       <div className="row g-4 mb-5">
         <div className="col-md-4">
@@ -95,6 +109,42 @@ function Accueil() {
         </div>
       </div>
 
+      {/* FLOTTE */}
+      {dashboard && (
+        <div className="row g-4 mb-5">
+          <div className="col-md-4">
+            <div className="dashboard-card primary">
+              <div className="icon">🚗</div>
+              <div>
+                <span>Voitures</span>
+                <h4>
+                  {dashboard.voitures_disponibles} / {dashboard.total_voitures} disponibles
+                </h4>
+              </div>
+            </div>
+          </div>
+
+          <div className="col-md-4">
+            <div className="dashboard-card success">
+              <div className="icon">📅</div>
+              <div>
+                <span>Réservations ce mois</span>
+                <h4>{dashboard.reservations_mois}</h4>
+              </div>
+            </div>
+          </div>
+
+          <div className="col-md-4">
+            <div className="dashboard-card danger">
+              <div className="icon">🔑</div>
+              <div>
+                <span>Locations en cours</span>
+                <h4>{dashboard.reservations_en_cours}</h4>
+              </div>
+            </div>
+          </div>
+        </div>
+      )}
 
       {/* CHART */}
       <div className="chart-card">
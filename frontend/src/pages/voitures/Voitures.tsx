@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import type { Voiture } from "../../types/Voiture";
+import { getVoitures } from "../../services/voitureService";
 import "./Voitures.css";
 import {
   FaCar,
@@ -17,8 +18,7 @@ function Voitures() {
 
   const fetchVoitures = () => {
     setLoading(true);
-    fetch("http://127.0.0.1:8000/api/voitures/")
-      .then((res) => res.json())
+    getVoitures()
       .then((data) => {
         setVoitures(data);
         setLoading(false);
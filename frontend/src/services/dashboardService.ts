@@ -0,0 +1,13 @@
+import type { Dashboard } from "../types/Dashboard";
+
+const API_URL = "http://127.0.0.1:8000/api/dashboard/";
+
+export async function getDashboard(): Promise<Dashboard> {
+  const res = await fetch(API_URL);
+
+  if (!res.ok) {
+    throw new Error("Erreur lors du chargement du tableau de bord");
+  }
+
+  return res.json();
+}
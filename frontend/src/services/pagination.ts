@@ -0,0 +1,30 @@
+/* 🔹 Réponse d'une liste paginée par curseur (API Django) */
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+/* 🔹 Parcourt toutes les pages en suivant le lien "next" */
+export async function fetchAllPages<T>(
+  url: string,
+  errorMessage: string
+): Promise<T[]> {
+  const items: T[] = [];
+  let next: string | null = url;
+
+  while (next) {
+    // Revalidation ETag : une liste inchangée revient en 304 depuis le cache HTTP
+    const res = await fetch(next, { cache: "no-cache" });
+
+    if (!res.ok) {
+      throw new Error(errorMessage);
+    }
+
+    const page: CursorPage<T> = await res.json();
+    items.push(...page.results);
+    next = page.next;
+  }
+
+  return items;
+}
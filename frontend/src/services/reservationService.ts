@@ -1,4 +1,5 @@
 import type { Reservation, ReservationCreate } from "../types/Reservation";
+import { fetchAllPages } from "./pagination";
 
 const API_URL = "http://127.0.0.1:8000/api/reservations/";
 
@@ -19,13 +20,7 @@ export async function createReservation(
 }
 
 export async function getReservations(): Promise<Reservation[]> {
-  const res = await fetch(API_URL);
-
-  if (!res.ok) {
-    throw new Error("Erreur lors du chargement");
-  }
-
-  return res.json();
+  return fetchAllPages<Reservation>(API_URL, "Erreur lors du chargement");
 }
 
 /* ✅ ICI LA CORRECTION IMPORTANTE */
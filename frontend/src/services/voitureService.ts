@@ -1,17 +1,13 @@
 import type { Voiture } from "../types/Voiture";
+import { fetchAllPages } from "./pagination";
 
 
 
 const API_URL = "http://127.0.0.1:8000/api/voitures/";
 
 export async function getVoitures(): Promise<Voiture[]> {
-  const res = await fetch(API_URL);
-
-  if (!res.ok) {
-    throw new Error("Erreur lors du chargement des voitures");
-  }
-
-  return res.json(); // ⬅️ يرجع Array مباشرة
-  const data = await res.json();
-  return data as Voiture[]; // cast explicite
+  return fetchAllPages<Voiture>(
+    API_URL,
+    "Erreur lors du chargement des voitures"
+  );
 }
@@ -0,0 +1,25 @@
+/* 🔹 Indicateurs retournés par /api/dashboard/ */
+export interface DerniereReservation {
+  id: number;
+  nom_client: string;
+  voiture: string;
+  date_debut: string;
+  date_fin: string;
+  prix_total: number | null;
+}
+
+export interface Dashboard {
+  revenus: number;
+  depenses: number;
+  profit: number;
+  nb_transactions: number;
+  total_voitures: number;
+  voitures_disponibles: number;
+  voitures_louees: number;
+  voitures_maintenance: number;
+  reservations_total: number;
+  reservations_mois: number;
+  reservations_en_cours: number;
+  dernieres_reservations: DerniereReservation[];
+  devise: string;
+}